@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Database migration to add trade_count and win_rate columns to backtest_results table.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.database import get_engine
+
+def run_migration():
+    """Add denormalized filter columns to backtest_results table."""
+    engine = get_engine()
+
+    print("Adding trade_count and win_rate fields to backtest_results table...")
+
+    try:
+        with engine.connect() as conn:
+            migration_sql = """
+            -- Add trade_count column (mirrors performance->>'total_trades')
+            ALTER TABLE backtest_results
+            ADD COLUMN IF NOT EXISTS trade_count INTEGER;
+
+            -- Add win_rate column (mirrors performance->>'win_rate')
+            ALTER TABLE backtest_results
+            ADD COLUMN IF NOT EXISTS win_rate DOUBLE PRECISION;
+
+            -- Backfill existing records from their JSONB payloads
+            UPDATE backtest_results
+            SET trade_count = jsonb_array_length(trades),
+                win_rate = (performance->>'win_rate')::DOUBLE PRECISION
+            WHERE trade_count IS NULL OR win_rate IS NULL;
+
+            -- Indexes for history filtering
+            CREATE INDEX IF NOT EXISTS idx_backtest_results_trade_count ON backtest_results(trade_count);
+            CREATE INDEX IF NOT EXISTS idx_backtest_results_win_rate ON backtest_results(win_rate);
+            """
+
+            conn.execute(text(migration_sql))
+            conn.commit()
+
+            print("✅ Migration completed successfully!")
+            print("✅ Added trade_count column (INTEGER)")
+            print("✅ Added win_rate column (DOUBLE PRECISION)")
+            print("✅ Backfilled existing records")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+    return True
+
+def verify_migration():
+    """Verify that the migration was successful."""
+    engine = get_engine()
+
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT column_name, data_type
+                FROM information_schema.columns
+                WHERE table_name = 'backtest_results'
+                AND column_name IN ('trade_count', 'win_rate')
+                ORDER BY column_name;
+            """))
+
+            columns = result.fetchall()
+
+            print(f"\n📊 Verification Results:")
+            for column in columns:
+                print(f"   ✅ {column[0]} ({column[1]})")
+
+            if len(columns) == 2:
+                print(f"\n✅ All 2 new columns added successfully!")
+                return True
+            else:
+                print(f"\n❌ Expected 2 columns, found {len(columns)}")
+                return False
+
+    except Exception as e:
+        print(f"❌ Verification failed: {e}")
+        return False
+
+def main():
+    """Run the migration and verification."""
+    print("Backtest Filter Columns Migration")
+    print("=" * 40)
+
+    if run_migration():
+        if verify_migration():
+            print(f"\n🎉 Migration completed successfully!")
+            print(f"🎉 Backtest history filters now run in the database")
+        else:
+            print(f"\n⚠️  Migration completed but verification failed")
+    else:
+        print(f"\n❌ Migration failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Database migration to add the total_return column to backtest_results table.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.database import get_engine
+
+def run_migration():
+    """Add denormalized total_return column to backtest_results table."""
+    engine = get_engine()
+
+    print("Adding total_return field to backtest_results table...")
+
+    try:
+        with engine.connect() as conn:
+            migration_sql = """
+            -- Add total_return column (mirrors performance->>'total_return')
+            ALTER TABLE backtest_results
+            ADD COLUMN IF NOT EXISTS total_return DOUBLE PRECISION;
+
+            -- Backfill existing records from their JSONB payloads
+            UPDATE backtest_results
+            SET total_return = (performance->>'total_return')::DOUBLE PRECISION
+            WHERE total_return IS NULL;
+
+            -- Index for statistics and ranking
+            CREATE INDEX IF NOT EXISTS idx_backtest_results_total_return ON backtest_results(total_return);
+            """
+
+            conn.execute(text(migration_sql))
+            conn.commit()
+
+            print("✅ Migration completed successfully!")
+            print("✅ Added total_return column (DOUBLE PRECISION)")
+            print("✅ Backfilled existing records")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+    return True
+
+def verify_migration():
+    """Verify that the migration was successful."""
+    engine = get_engine()
+
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT column_name, data_type
+                FROM information_schema.columns
+                WHERE table_name = 'backtest_results'
+                AND column_name = 'total_return';
+            """))
+
+            columns = result.fetchall()
+
+            print(f"\n📊 Verification Results:")
+            for column in columns:
+                print(f"   ✅ {column[0]} ({column[1]})")
+
+            if len(columns) == 1:
+                print(f"\n✅ total_return column added successfully!")
+                return True
+            else:
+                print(f"\n❌ Expected 1 column, found {len(columns)}")
+                return False
+
+    except Exception as e:
+        print(f"❌ Verification failed: {e}")
+        return False
+
+def main():
+    """Run the migration and verification."""
+    print("Backtest Total Return Column Migration")
+    print("=" * 40)
+
+    if run_migration():
+        if verify_migration():
+            print(f"\n🎉 Migration completed successfully!")
+            print(f"🎉 Backtest statistics no longer parse performance JSON")
+        else:
+            print(f"\n⚠️  Migration completed but verification failed")
+    else:
+        print(f"\n❌ Migration failed")
+
+if __name__ == "__main__":
+    main()
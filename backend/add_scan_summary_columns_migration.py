@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Database migration to add comparison summary columns to scan_results table.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.database import get_engine
+
+SUMMARY_COLUMNS = ('symbols_count', 'signals_count', 'success_rate', 'memory_usage_mb', 'api_requests_made')
+
+def run_migration():
+    """Add precomputed scan summary columns to scan_results table."""
+    engine = get_engine()
+
+    print("Adding comparison summary fields to scan_results table...")
+
+    try:
+        with engine.connect() as conn:
+            migration_sql = """
+            -- Summaries computed when a scan is saved
+            ALTER TABLE scan_results
+            ADD COLUMN IF NOT EXISTS symbols_count INTEGER,
+            ADD COLUMN IF NOT EXISTS signals_count INTEGER,
+            ADD COLUMN IF NOT EXISTS success_rate DOUBLE PRECISION,
+            ADD COLUMN IF NOT EXISTS memory_usage_mb DOUBLE PRECISION,
+            ADD COLUMN IF NOT EXISTS api_requests_made INTEGER;
+
+            -- Backfill existing records from their JSONB payloads
+            UPDATE scan_results
+            SET symbols_count = jsonb_array_length(symbols_scanned),
+                signals_count = jsonb_array_length(signals_found),
+                success_rate = CASE
+                    WHEN enhanced_diagnostics IS NULL THEN NULL
+                    WHEN jsonb_array_length(symbols_scanned) = 0 THEN 0.0
+                    ELSE jsonb_array_length(enhanced_diagnostics->'symbols_with_data')::DOUBLE PRECISION
+                         / jsonb_array_length(symbols_scanned)
+                END,
+                memory_usage_mb = (enhanced_diagnostics#>>'{performance_metrics,memory_usage_mb}')::DOUBLE PRECISION,
+                api_requests_made = (enhanced_diagnostics#>>'{performance_metrics,api_requests_made}')::INTEGER
+            WHERE symbols_count IS NULL;
+            """
+
+            conn.execute(text(migration_sql))
+            conn.commit()
+
+            print("✅ Migration completed successfully!")
+            for column in SUMMARY_COLUMNS:
+                print(f"✅ Added {column} column")
+            print("✅ Backfilled existing records")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+    return True
+
+def verify_migration():
+    """Verify that the migration was successful."""
+    engine = get_engine()
+
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT column_name, data_type
+                FROM information_schema.columns
+                WHERE table_name = 'scan_results'
+                AND column_name IN ('symbols_count', 'signals_count', 'success_rate',
+                                    'memory_usage_mb', 'api_requests_made')
+                ORDER BY column_name;
+            """))
+
+            columns = result.fetchall()
+
+            print(f"\n📊 Verification Results:")
+            for column in columns:
+                print(f"   ✅ {column[0]} ({column[1]})")
+
+            if len(columns) == len(SUMMARY_COLUMNS):
+                print(f"\n✅ All {len(SUMMARY_COLUMNS)} new columns added successfully!")
+                return True
+            else:
+                print(f"\n❌ Expected {len(SUMMARY_COLUMNS)} columns, found {len(columns)}")
+                return False
+
+    except Exception as e:
+        print(f"❌ Verification failed: {e}")
+        return False
+
+def main():
+    """Run the migration and verification."""
+    print("Scan Summary Columns Migration")
+    print("=" * 40)
+
+    if run_migration():
+        if verify_migration():
+            print(f"\n🎉 Migration completed successfully!")
+            print(f"🎉 Scan comparisons now read precomputed summaries")
+        else:
+            print(f"\n⚠️  Migration completed but verification failed")
+    else:
+        print(f"\n❌ Migration failed")
+
+if __name__ == "__main__":
+    main()
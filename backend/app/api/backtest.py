@@ -1,7 +1,8 @@
 """
 Backtest API endpoints for historical analysis.
 """
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 from datetime import datetime, date
@@ -121,17 +122,8 @@ async def run_backtest(request: BacktestRequest, http_request: Request):
                 settings=settings
             )
             
-            # Convert to response format
-            return BacktestResponse(
-                id=result.id,
-                timestamp=result.timestamp,
-                start_date=result.start_date,
-                end_date=result.end_date,
-                symbols=result.symbols,
-                trades=[trade.to_dict() for trade in result.trades],
-                performance=result.performance.to_dict(),
-                settings_used=result.settings_used.to_dict()
-            )
+            # Stream straight from the dataclasses; the shape matches BacktestResponse
+            return StreamingResponse(result.iter_json_bytes(), media_type="application/json")
             
     except ValidationError as exc:
         # Handle validation errors with 422 status
@@ -168,7 +160,8 @@ async def get_backtest_history(
     min_trades: Optional[int] = Query(None, description="Minimum number of trades", ge=0),
     min_win_rate: Optional[float] = Query(None, description="Minimum win rate", ge=0.0, le=1.0),
     limit: int = Query(100, description="Maximum number of results", ge=1, le=1000),
-    offset: int = Query(0, description="Number of results to skip", ge=0)
+    offset: int = Query(0, description="Number of results to skip", ge=0),
+    include_trades: bool = Query(False, description="Include individual trades in each result")
 ):
     """
     Retrieve backtest history with optional filtering.
@@ -180,6 +173,7 @@ async def get_backtest_history(
     - **min_win_rate**: Minimum win rate (0.0-1.0)
     - **limit**: Maximum results (1-1000)
     - **offset**: Results to skip for pagination
+    - **include_trades**: Include individual trades in each result
     """
     try:
         # Parse filters
@@ -197,22 +191,13 @@ async def get_backtest_history(
         backtest_service = BacktestService()
         
         # Get backtest history
-        results = await backtest_service.get_backtest_history(filters)
+        results = await backtest_service.get_backtest_history(filters, include_trades=include_trades)
         
-        # Convert to response format
-        return [
-            BacktestResponse(
-                id=result.id,
-                timestamp=result.timestamp,
-                start_date=result.start_date,
-                end_date=result.end_date,
-                symbols=result.symbols,
-                trades=[trade.to_dict() for trade in result.trades],
-                performance=result.performance.to_dict(),
-                settings_used=result.settings_used.to_dict()
-            )
-            for result in results
-        ]
+        # Encode straight from the dataclasses; the shape matches BacktestResponse
+        return Response(
+            content=BacktestResult.list_to_json_bytes(results),
+            media_type="application/json"
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve backtest history: {str(e)}")
\ No newline at end of file
@@ -20,7 +20,7 @@ from ..services.export_service import ExportService
 from ..services.comparison_service import ComparisonService
 from ..models.pydantic_models import (
     EnhancedScanResultModel, ScanComparisonModel, ExportRequestModel, 
-    HistoryFiltersModel, ExportFormat, ScanStatus
+    HistoryFiltersModel, ExportFormat, ScanStatus, construct_trusted
 )
 from ..models.enhanced_diagnostics import HistoryFilters, ExportRequest
 from ..utils.validation import GeneralValidator
@@ -169,7 +169,8 @@ async def get_enhanced_scan_history(
                 if quality_score is not None and quality_score > 1.0:
                     quality_score = quality_score / 100.0  # Convert from 0-100 to 0-1 scale
                 
-                enhanced_result = EnhancedScanResultModel(
+                # Data comes from the history service, so skip re-validation here
+                enhanced_result = construct_trusted(EnhancedScanResultModel, dict(
                     id=result.id,
                     timestamp=result.timestamp,
                     symbols_scanned=result.symbols_scanned,
@@ -180,7 +181,7 @@ async def get_enhanced_scan_history(
                     scan_status=result.scan_status,
                     error_message=result.error_message,
                     data_quality_score=quality_score
-                )
+                ))
                 enhanced_results.append(enhanced_result)
             
             return EnhancedHistoryResponse(
@@ -277,6 +278,63 @@ async def get_scan_diagnostics(
         )
 
 
+@router.get("/scan-history/{scan_id}/diagnostics/stream")
+async def stream_scan_diagnostics(
+    scan_id: str,
+    request: Request
+):
+    """
+    Stream the enhanced diagnostics of a specific scan as JSON.
+
+    - **scan_id**: Unique identifier of the scan
+
+    The body is written one symbol at a time, so large scans are sent
+    without building the full diagnostic document in memory first.
+    """
+    request_id = str(uuid.uuid4())
+
+    try:
+        with ErrorContext("stream_scan_diagnostics", request_id=request_id, scan_id=scan_id):
+            # Validate scan ID format
+            try:
+                uuid.UUID(scan_id)
+            except ValueError:
+                raise ValidationError(
+                    message="Invalid scan ID format",
+                    recovery_suggestions=["Provide a valid UUID format scan ID"]
+                )
+
+            history_service = HistoryService()
+            diagnostics = await history_service.get_scan_diagnostics(scan_id)
+
+            if not diagnostics or not diagnostics.enhanced_diagnostics:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Scan with ID {scan_id} not found or has no diagnostic data"
+                )
+
+            return StreamingResponse(
+                diagnostics.enhanced_diagnostics.iter_json(),
+                media_type="application/json"
+            )
+
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except HTTPException:
+        raise
+    except Exception as exc:
+        error = ErrorHandler.handle_exception(exc, {
+            "operation": "stream_scan_diagnostics",
+            "request_id": request_id,
+            "scan_id": scan_id
+        })
+        ErrorHandler.log_error(error, request_id)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to stream scan diagnostics: {str(exc)}"
+        )
+
+
 class ComparisonRequest(BaseModel):
     """Request model for scan comparison."""
     scan_ids: List[str] = Field(..., min_length=2, max_length=10, description="Scan IDs to compare")
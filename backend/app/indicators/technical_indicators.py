@@ -3,9 +3,12 @@ Technical indicators calculation engine for the stock scanner.
 Implements EMA and ATR calculations with proper error handling.
 """
 
+import math
+
 import pandas as pd
 import numpy as np
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Sequence
 import logging
 from ..models.market_data import TechnicalIndicators
 
@@ -22,6 +25,23 @@ class IndicatorCalculationError(Exception):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class IndicatorState:
+    """
+    Running indicator values after one bar.
+    
+    Holds everything needed to extend the EMAs and ATR by the next bar
+    without revisiting earlier bars.
+    """
+    ema5: float
+    ema8: float
+    ema13: float
+    ema21: float
+    ema50: float
+    atr: float
+    close: float
+
+
 class TechnicalIndicatorEngine:
     """Engine for calculating technical indicators"""
     
@@ -101,8 +121,8 @@ class TechnicalIndicatorEngine:
             
             for i in range(1, len(close_prices)):
                 high_low = high_prices[i] - low_prices[i]
-                high_close_prev = abs(high_prices[i] - close_prices[i-1])
-                low_close_prev = abs(low_prices[i] - close_prices[i-1])
+                high_close_prev = math.fabs(high_prices[i] - close_prices[i-1])
+                low_close_prev = math.fabs(low_prices[i] - close_prices[i-1])
                 
                 true_range = max(high_low, high_close_prev, low_close_prev)
                 true_ranges.append(true_range)
@@ -227,4 +247,183 @@ class TechnicalIndicatorEngine:
             raise
         except Exception as e:
             logger.error(f"Indicator calculation failed: {str(e)}")
-            raise IndicatorCalculationError(f"Indicator calculation failed: {str(e)}")
\ No newline at end of file
+            raise IndicatorCalculationError(f"Indicator calculation failed: {str(e)}")
+    
+    def calculate_all_indicators_series(self, high_prices: Sequence[float], low_prices: Sequence[float],
+                                        close_prices: Sequence[float],
+                                        atr_multiplier: float = 2.0,
+                                        dtype: np.dtype = np.float64) -> Dict[str, np.ndarray]:
+        """
+        Calculate every indicator for every bar in a single pass.
+        
+        EMAs and ATR are recursive, so the value at bar ``i`` equals what
+        ``calculate_all_indicators`` returns for the first ``i + 1`` bars.
+        Use ``indicators_at`` to read a validated snapshot for one bar.
+        
+        The recurrences always run in float64. Pass ``dtype=np.float32`` to
+        get float32 output for vectorized evaluation over long series; values
+        then agree with the float64 output to about 1e-6 relative.
+        
+        Args:
+            high_prices: High prices (most recent last)
+            low_prices: Low prices
+            close_prices: Close prices
+            atr_multiplier: Multiplier for ATR lines (default 2.0)
+            dtype: Floating dtype of the returned arrays (default float64)
+            
+        Returns:
+            Dictionary of ``dtype`` arrays keyed by ``TechnicalIndicators``
+            field name; ``atr`` and the ATR lines are NaN for the first bar
+            
+        Raises:
+            InsufficientDataError: If not enough data points
+            IndicatorCalculationError: If array lengths differ
+        """
+        high = np.asarray(high_prices, dtype=np.float64)
+        low = np.asarray(low_prices, dtype=np.float64)
+        close = np.asarray(close_prices, dtype=np.float64)
+        
+        if not (len(high) == len(low) == len(close)):
+            raise IndicatorCalculationError("Price arrays must have same length")
+        if atr_multiplier <= 0:
+            raise IndicatorCalculationError("Invalid input values for ATR lines calculation")
+        
+        self.validate_data_sufficiency(len(close))
+        
+        close_series = pd.Series(close)
+        series = {
+            f'ema{period}': close_series.ewm(span=period, adjust=False).mean().to_numpy()
+            for period in (5, 8, 13, 21, 50)
+        }
+        
+        # True range for bars 1..n-1, then ATR as its EMA
+        true_range = np.maximum.reduce([
+            high[1:] - low[1:],
+            np.abs(high[1:] - close[:-1]),
+            np.abs(low[1:] - close[:-1]),
+        ])
+        atr = np.empty_like(close)
+        atr[0] = np.nan
+        atr[1:] = pd.Series(true_range).ewm(span=self.required_periods['atr'], adjust=False).mean().to_numpy()
+        
+        series['atr'] = atr
+        series['atr_long_line'] = close - atr * atr_multiplier
+        series['atr_short_line'] = close + atr * atr_multiplier
+        if dtype != np.float64:
+            series = {name: column.astype(dtype) for name, column in series.items()}
+        return series
+    
+    def indicators_at(self, series: Dict[str, np.ndarray], index: int,
+                      close_price: float) -> TechnicalIndicators:
+        """
+        Build a validated ``TechnicalIndicators`` snapshot for one bar of a series.
+        
+        Args:
+            series: Output of ``calculate_all_indicators_series``
+            index: Bar index (negative indices count from the end)
+            close_price: Close price of that bar
+            
+        Returns:
+            TechnicalIndicators for the bar
+            
+        Raises:
+            IndicatorCalculationError: If any value at ``index`` is invalid
+        """
+        values = {name: float(column[index]) for name, column in series.items()}
+        
+        if not all(np.isfinite(value) for value in values.values()):
+            raise IndicatorCalculationError(f"Invalid indicator values at bar {index}")
+        if values['atr'] < 0 or close_price <= 0:
+            raise IndicatorCalculationError("Invalid input values for ATR lines calculation")
+        
+        return TechnicalIndicators(**values)
+    
+    def state_at(self, series: Dict[str, np.ndarray], index: int,
+                 close_price: float) -> IndicatorState:
+        """
+        Capture the running indicator state for one bar of a series.
+        
+        Args:
+            series: Output of ``calculate_all_indicators_series``
+            index: Bar index (negative indices count from the end)
+            close_price: Close price of that bar
+            
+        Returns:
+            IndicatorState for the bar
+        """
+        return IndicatorState(
+            ema5=float(series['ema5'][index]),
+            ema8=float(series['ema8'][index]),
+            ema13=float(series['ema13'][index]),
+            ema21=float(series['ema21'][index]),
+            ema50=float(series['ema50'][index]),
+            atr=float(series['atr'][index]),
+            close=float(close_price)
+        )
+    
+    def advance_state(self, state: IndicatorState, high: float, low: float,
+                      close: float) -> IndicatorState:
+        """
+        Extend an indicator state by one bar in O(1).
+        
+        Uses the same recurrences as ``calculate_all_indicators_series``, so
+        the result equals the series value for the new bar.
+        
+        Args:
+            state: State after the previous bar
+            high: High price of the new bar
+            low: Low price of the new bar
+            close: Close price of the new bar
+            
+        Returns:
+            IndicatorState after the new bar
+        """
+        def ema(previous: float, value: float, period: int) -> float:
+            alpha = 2.0 / (period + 1)
+            return (1.0 - alpha) * previous + alpha * value
+        
+        true_range = max(high - low, math.fabs(high - state.close), math.fabs(low - state.close))
+        return IndicatorState(
+            ema5=ema(state.ema5, close, 5),
+            ema8=ema(state.ema8, close, 8),
+            ema13=ema(state.ema13, close, 13),
+            ema21=ema(state.ema21, close, 21),
+            ema50=ema(state.ema50, close, 50),
+            atr=ema(state.atr, true_range, self.required_periods['atr']),
+            close=close
+        )
+    
+    def indicators_from_state(self, state: IndicatorState,
+                              atr_multiplier: float = 2.0) -> TechnicalIndicators:
+        """
+        Build a validated ``TechnicalIndicators`` snapshot from a running state.
+        
+        Args:
+            state: Indicator state for the bar
+            atr_multiplier: Multiplier for ATR lines (default 2.0)
+            
+        Returns:
+            TechnicalIndicators for the bar
+            
+        Raises:
+            IndicatorCalculationError: If any value is invalid
+        """
+        if atr_multiplier <= 0 or state.atr < 0 or state.close <= 0:
+            raise IndicatorCalculationError("Invalid input values for ATR lines calculation")
+        
+        indicators = TechnicalIndicators(
+            ema5=state.ema5,
+            ema8=state.ema8,
+            ema13=state.ema13,
+            ema21=state.ema21,
+            ema50=state.ema50,
+            atr=state.atr,
+            atr_long_line=state.close - state.atr * atr_multiplier,
+            atr_short_line=state.close + state.atr * atr_multiplier
+        )
+        if not all(map(math.isfinite, (
+            indicators.ema5, indicators.ema8, indicators.ema13, indicators.ema21,
+            indicators.ema50, indicators.atr, indicators.atr_long_line, indicators.atr_short_line
+        ))):
+            raise IndicatorCalculationError("Invalid indicator values")
+        return indicators
@@ -1,3 +1,4 @@
+import asyncio
 import signal
 import sys
 from contextlib import asynccontextmanager
@@ -9,7 +10,7 @@ from .api import scan, backtest, history, market_data
 from .api import settings as settings_router
 from .config import get_settings
 from .logging_config import setup_logging, get_logger
-from .monitoring import MetricsMiddleware, metrics_collector, get_health_status
+from .monitoring import MetricsMiddleware, metrics_collector, get_health_status, run_system_sampler
 
 
 # Set up logging
@@ -41,10 +42,14 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Debug mode: {settings.debug}")
     
+    # Sample system metrics in the background so /metrics and /health stay cheap
+    sampler_task = asyncio.create_task(run_system_sampler())
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Stock Scanner API...")
+    sampler_task.cancel()
     # Add any cleanup logic here (close database connections, etc.)
 
 
@@ -1,8 +1,8 @@
 """
 Models package for the stock scanner application.
 """
-from .market_data import MarketData, TechnicalIndicators
-from .signals import Signal, AlgorithmSettings
+from .market_data import MarketData, MarketDataBuffer, TechnicalIndicators
+from .signals import Signal, SignalArray, AlgorithmSettings
 from .results import ScanResult, BacktestResult, Trade, PerformanceMetrics
 from .database_models import ScanResultDB, BacktestResultDB, TradeDB
 from .enhanced_diagnostics import (
@@ -35,8 +35,10 @@ from .pydantic_models import (
 __all__ = [
     # Data models
     "MarketData",
+    "MarketDataBuffer",
     "TechnicalIndicators",
     "Signal",
+    "SignalArray",
     "AlgorithmSettings",
     "ScanResult",
     "BacktestResult",
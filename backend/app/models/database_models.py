@@ -1,7 +1,7 @@
 """
 SQLAlchemy database models for PostgreSQL storage.
 """
-from sqlalchemy import Column, String, DateTime, Date, Text, Numeric, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Date, Text, Numeric, Integer, Float, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -29,6 +29,13 @@ class ScanResultDB(Base):
     signal_analysis = Column(JSONB, nullable=True)  # Signal generation analysis
     data_quality_score = Column(Numeric(3, 2), nullable=True)  # Overall quality score (0.00-1.00)
     
+    # Summaries computed when the scan is saved, so comparisons select scalars
+    symbols_count = Column(Integer, nullable=True)
+    signals_count = Column(Integer, nullable=True)
+    success_rate = Column(Float, nullable=True)  # Symbols with data / scanned; enhanced scans only
+    memory_usage_mb = Column(Float, nullable=True)
+    api_requests_made = Column(Integer, nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -48,11 +55,20 @@ class BacktestResultDB(Base):
     trades = Column(JSONB, nullable=False)
     performance = Column(JSONB, nullable=False)
     settings_used = Column(JSONB, nullable=False)
+    
+    # Denormalized from performance so history filters and statistics run
+    # in SQL without reading the JSONB payload
+    trade_count = Column(Integer, nullable=True)
+    win_rate = Column(Float, nullable=True)
+    total_return = Column(Float, nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    # Relationship to individual trades
-    trade_records = relationship("TradeDB", back_populates="backtest", cascade="all, delete-orphan")
+    # Relationship to individual trades; the database cascades deletes
+    trade_records = relationship(
+        "TradeDB", back_populates="backtest", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<BacktestResult(id={self.id}, start_date={self.start_date}, end_date={self.end_date})>"
@@ -1,13 +1,24 @@
 """
 Enhanced diagnostic models for comprehensive scan analysis.
 """
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional
 import json
+
+import numpy as np
+import orjson
+
 from .signals import AlgorithmSettings
+from .serialization import fast_serializable
+
+
+# Lower bounds of the "medium" and "high" confidence buckets
+CONFIDENCE_BUCKET_EDGES = np.array([0.6, 0.8])
+CONFIDENCE_BUCKET_LABELS = ("low", "medium", "high")
 
 
+@fast_serializable
 @dataclass
 class SymbolDiagnostic:
     """Detailed diagnostic information for a single symbol."""
@@ -19,17 +30,9 @@ class SymbolDiagnostic:
     error_message: Optional[str]
     fetch_time: float
     processing_time: float
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        return asdict(self)
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'SymbolDiagnostic':
-        """Create instance from dictionary."""
-        return cls(**data)
 
 
+@fast_serializable
 @dataclass
 class PerformanceMetrics:
     """System performance metrics during scan execution."""
@@ -39,17 +42,9 @@ class PerformanceMetrics:
     cache_hit_rate: float
     concurrent_requests: int
     bottleneck_phase: Optional[str]
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        return asdict(self)
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'PerformanceMetrics':
-        """Create instance from dictionary."""
-        return cls(**data)
 
 
+@fast_serializable
 @dataclass
 class SignalAnalysis:
     """Analysis of signal generation during scan."""
@@ -57,17 +52,34 @@ class SignalAnalysis:
     symbols_meeting_partial_criteria: Dict[str, List[str]]  # symbol -> list of criteria met
     rejection_reasons: Dict[str, List[str]]  # reason -> list of symbols
     confidence_distribution: Dict[str, int]  # confidence_range -> count
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        return asdict(self)
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'SignalAnalysis':
-        """Create instance from dictionary."""
-        return cls(**data)
+    def from_confidences(
+        cls,
+        confidences: np.ndarray,
+        symbols_meeting_partial_criteria: Dict[str, List[str]],
+        rejection_reasons: Dict[str, List[str]]
+    ) -> 'SignalAnalysis':
+        """
+        Create instance from an array of signal confidences.
+
+        Confidences are bucketed into low (< 0.6), medium (< 0.8) and high
+        in a single vectorized pass.
+        """
+        confidences = np.asarray(confidences, dtype=float)
+        bucket_indices = np.searchsorted(CONFIDENCE_BUCKET_EDGES, confidences, side="right")
+        counts = np.bincount(bucket_indices, minlength=len(CONFIDENCE_BUCKET_LABELS))
+        return cls(
+            signals_found=int(confidences.size),
+            symbols_meeting_partial_criteria=symbols_meeting_partial_criteria,
+            rejection_reasons=rejection_reasons,
+            confidence_distribution={
+                label: int(count) for label, count in zip(CONFIDENCE_BUCKET_LABELS, counts)
+            }
+        )
 
 
+@fast_serializable
 @dataclass
 class DataQualityMetrics:
     """Data quality assessment metrics."""
@@ -76,17 +88,9 @@ class DataQualityMetrics:
     average_fetch_time: float
     data_completeness: float
     quality_score: float
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        return asdict(self)
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'DataQualityMetrics':
-        """Create instance from dictionary."""
-        return cls(**data)
 
 
+@fast_serializable
 @dataclass
 class EnhancedScanDiagnostics:
     """Comprehensive diagnostic information for a scan operation."""
@@ -106,46 +110,33 @@ class EnhancedScanDiagnostics:
     data_quality_metrics: DataQualityMetrics
     settings_snapshot: AlgorithmSettings
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        data = asdict(self)
-        # Convert nested objects
-        data['symbol_details'] = {k: v.to_dict() for k, v in self.symbol_details.items()}
-        data['performance_metrics'] = self.performance_metrics.to_dict()
-        data['signal_analysis'] = self.signal_analysis.to_dict()
-        data['data_quality_metrics'] = self.data_quality_metrics.to_dict()
-        data['settings_snapshot'] = self.settings_snapshot.to_dict()
-        return data
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'EnhancedScanDiagnostics':
-        """Create instance from dictionary."""
-        data = data.copy()
-        
-        # Convert nested objects
-        if 'symbol_details' in data:
-            data['symbol_details'] = {
-                k: SymbolDiagnostic.from_dict(v) 
-                for k, v in data['symbol_details'].items()
-            }
-        
-        if 'performance_metrics' in data:
-            data['performance_metrics'] = PerformanceMetrics.from_dict(data['performance_metrics'])
-        
-        if 'signal_analysis' in data:
-            data['signal_analysis'] = SignalAnalysis.from_dict(data['signal_analysis'])
-        
-        if 'data_quality_metrics' in data:
-            data['data_quality_metrics'] = DataQualityMetrics.from_dict(data['data_quality_metrics'])
-        
-        if 'settings_snapshot' in data:
-            data['settings_snapshot'] = AlgorithmSettings.from_dict(data['settings_snapshot'])
-        
-        return cls(**data)
+    def iter_json(self) -> Iterator[str]:
+        """
+        Yield the JSON encoding of this object in chunks.
+
+        ``symbol_details`` is emitted one symbol at a time, so only a single
+        symbol's dictionary is materialized at once. The concatenated output
+        is identical to ``json.dumps(self.to_dict())``.
+        """
+        yield "{"
+        for index, field_ in enumerate(fields(self)):
+            name = field_.name
+            value = getattr(self, name)
+            yield f"{', ' if index else ''}{json.dumps(name)}: "
+            if name == "symbol_details":
+                yield "{"
+                for position, (symbol, detail) in enumerate(value.items()):
+                    yield f"{', ' if position else ''}{json.dumps(symbol)}: {json.dumps(detail.to_dict())}"
+                yield "}"
+            elif hasattr(value, "to_dict"):
+                yield json.dumps(value.to_dict())
+            else:
+                yield json.dumps(value)
+        yield "}"
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict())
+        return "".join(self.iter_json())
 
     @classmethod
     def from_json(cls, json_str: str) -> 'EnhancedScanDiagnostics':
@@ -153,6 +144,7 @@ class EnhancedScanDiagnostics:
         return cls.from_dict(json.loads(json_str))
 
 
+@fast_serializable
 @dataclass
 class EnhancedScanResult:
     """Enhanced scan result with comprehensive diagnostics."""
@@ -167,38 +159,26 @@ class EnhancedScanResult:
     error_message: Optional[str] = None
     data_quality_score: Optional[float] = None
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        # signals_found will be handled by the calling code
-        data['settings_used'] = self.settings_used.to_dict()
-        if self.enhanced_diagnostics:
-            data['enhanced_diagnostics'] = self.enhanced_diagnostics.to_dict()
-        return data
+    def to_json_bytes(self) -> bytes:
+        """
+        Convert to UTF-8 encoded JSON bytes.
 
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'EnhancedScanResult':
-        """Create instance from dictionary."""
-        data = data.copy()
-        if isinstance(data['timestamp'], str):
-            data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-        if isinstance(data['settings_used'], dict):
-            data['settings_used'] = AlgorithmSettings.from_dict(data['settings_used'])
-        if 'enhanced_diagnostics' in data and data['enhanced_diagnostics']:
-            data['enhanced_diagnostics'] = EnhancedScanDiagnostics.from_dict(data['enhanced_diagnostics'])
-        return cls(**data)
+        orjson walks the nested diagnostics dataclasses directly, so no
+        intermediate dictionary tree is built.
+        """
+        return orjson.dumps(self, option=orjson.OPT_SERIALIZE_NUMPY)
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict())
+        return self.to_json_bytes().decode()
 
     @classmethod
     def from_json(cls, json_str: str) -> 'EnhancedScanResult':
         """Create instance from JSON string."""
-        return cls.from_dict(json.loads(json_str))
+        return cls.from_dict(orjson.loads(json_str))
 
 
+@fast_serializable
 @dataclass
 class ScanComparison:
     """Comparison result between multiple scans."""
@@ -207,17 +187,9 @@ class ScanComparison:
     performance_trends: Dict[str, List[float]]  # metric_name -> values_by_scan
     symbol_status_changes: Dict[str, Dict[str, str]]  # symbol -> scan_id -> status
     insights: List[str]  # Generated insights about differences
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        return asdict(self)
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'ScanComparison':
-        """Create instance from dictionary."""
-        return cls(**data)
 
 
+@fast_serializable
 @dataclass
 class ExportRequest:
     """Request parameters for exporting scan data."""
@@ -228,27 +200,9 @@ class ExportRequest:
     include_errors: bool = True
     date_range_start: Optional[datetime] = None
     date_range_end: Optional[datetime] = None
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        data = asdict(self)
-        if self.date_range_start:
-            data['date_range_start'] = self.date_range_start.isoformat()
-        if self.date_range_end:
-            data['date_range_end'] = self.date_range_end.isoformat()
-        return data
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'ExportRequest':
-        """Create instance from dictionary."""
-        data = data.copy()
-        if 'date_range_start' in data and data['date_range_start']:
-            data['date_range_start'] = datetime.fromisoformat(data['date_range_start'])
-        if 'date_range_end' in data and data['date_range_end']:
-            data['date_range_end'] = datetime.fromisoformat(data['date_range_end'])
-        return cls(**data)
 
 
+@fast_serializable
 @dataclass
 class HistoryFilters:
     """Filters for scan history queries."""
@@ -262,22 +216,3 @@ class HistoryFilters:
     min_quality_score: Optional[float] = None
     max_quality_score: Optional[float] = None
     search_text: Optional[str] = None
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
-        data = asdict(self)
-        if self.date_range_start:
-            data['date_range_start'] = self.date_range_start.isoformat()
-        if self.date_range_end:
-            data['date_range_end'] = self.date_range_end.isoformat()
-        return data
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'HistoryFilters':
-        """Create instance from dictionary."""
-        data = data.copy()
-        if 'date_range_start' in data and data['date_range_start']:
-            data['date_range_start'] = datetime.fromisoformat(data['date_range_start'])
-        if 'date_range_end' in data and data['date_range_end']:
-            data['date_range_end'] = datetime.fromisoformat(data['date_range_end'])
-        return cls(**data)
\ No newline at end of file
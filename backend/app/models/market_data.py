@@ -3,11 +3,13 @@ Market data models for the stock scanner application.
 """
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence
 import json
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class MarketData:
     """Represents market data for a single stock at a specific time."""
     symbol: str
@@ -42,7 +44,7 @@ class MarketData:
         return cls.from_dict(json.loads(json_str))
 
 
-@dataclass
+@dataclass(slots=True)
 class TechnicalIndicators:
     """Technical indicators calculated from market data."""
     ema5: float
@@ -70,4 +72,90 @@ class TechnicalIndicators:
     @classmethod
     def from_json(cls, json_str: str) -> 'TechnicalIndicators':
         """Create instance from JSON string."""
-        return cls.from_dict(json.loads(json_str))
\ No newline at end of file
+        return cls.from_dict(json.loads(json_str))
+
+
+class MarketDataBuffer:
+    """
+    Struct-of-arrays price history for a single symbol.
+
+    OHLC values are kept in contiguous ``float64`` columns that grow by
+    doubling, so appending a bar is a handful of scalar stores and reading
+    the history is a zero-copy slice.
+    """
+
+    __slots__ = ('opens', 'highs', 'lows', 'closes', 'timestamps', '_size')
+
+    def __init__(self, capacity: int = 256):
+        capacity = max(int(capacity), 1)
+        self.opens = np.empty(capacity, dtype=np.float64)
+        self.highs = np.empty(capacity, dtype=np.float64)
+        self.lows = np.empty(capacity, dtype=np.float64)
+        self.closes = np.empty(capacity, dtype=np.float64)
+        self.timestamps: List[datetime] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int) -> None:
+        """Grow the columns to hold at least ``size`` bars."""
+        capacity = len(self.closes)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        n = self._size
+        for name in ('opens', 'highs', 'lows', 'closes'):
+            column = np.empty(capacity, dtype=np.float64)
+            column[:n] = getattr(self, name)[:n]
+            setattr(self, name, column)
+
+    def _write(self, index: int, data: MarketData) -> None:
+        self.opens[index] = data.open
+        self.highs[index] = data.high
+        self.lows[index] = data.low
+        self.closes[index] = data.close
+
+    def append(self, data: MarketData) -> None:
+        """Append one bar to the end of the buffer."""
+        n = self._size
+        self._reserve(n + 1)
+        self._write(n, data)
+        self.timestamps.append(data.timestamp)
+        self._size = n + 1
+
+    def clear(self) -> None:
+        """Drop all bars while keeping the allocated capacity."""
+        self.timestamps.clear()
+        self._size = 0
+
+    def sync(self, data: Sequence[MarketData], count: Optional[int] = None) -> None:
+        """
+        Make the buffer hold exactly ``data[:count]`` (all of ``data`` by default).
+
+        When the bars extend the ones already buffered (same first and last
+        cached timestamps) only the last cached bar is rewritten, since it may
+        have been a partial bar, and the new bars are appended. Any other
+        input rebuilds the buffer. ``data`` itself is never copied.
+        """
+        if count is None:
+            count = len(data)
+        n = self._size
+        if (
+            0 < n <= count
+            and data[0].timestamp == self.timestamps[0]
+            and data[n - 1].timestamp == self.timestamps[n - 1]
+        ):
+            self._write(n - 1, data[n - 1])
+            start = n
+        else:
+            self.clear()
+            start = 0
+        self._reserve(count)
+        timestamps = self.timestamps
+        for index in range(start, count):
+            bar = data[index]
+            self._write(index, bar)
+            timestamps.append(bar.timestamp)
+        self._size = count
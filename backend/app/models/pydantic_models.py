@@ -3,7 +3,7 @@ Pydantic models for data validation and API serialization.
 """
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Type, TypeVar, Union, get_args, get_origin
 from enum import Enum
 
 
@@ -294,4 +294,50 @@ class HistoryFiltersModel(BaseModel):
                 raise ValueError("End date must be after start date")
         return v
 
-    model_config = ConfigDict(use_enum_values=True)
\ No newline at end of file
+    model_config = ConfigDict(use_enum_values=True)
+
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+
+def _is_model_class(annotation: Any) -> bool:
+    """Check whether an annotation is a Pydantic model class."""
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _construct_value(annotation: Any, value: Any) -> Any:
+    """Build nested models for a trusted field value without validation."""
+    if value is None:
+        return None
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            annotation = args[0]
+    if _is_model_class(annotation) and isinstance(value, dict):
+        return construct_trusted(annotation, value)
+    if get_origin(annotation) is dict and isinstance(value, dict):
+        value_type = get_args(annotation)[1]
+        if _is_model_class(value_type):
+            return {
+                key: construct_trusted(value_type, item) if isinstance(item, dict) else item
+                for key, item in value.items()
+            }
+    return value
+
+
+def construct_trusted(model_cls: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+    """
+    Build a response model from trusted in-process data without validation.
+
+    Use this only at the service -> API boundary, for data that services have
+    just produced from domain dataclasses. Untrusted input (request bodies,
+    query parameters) must still go through the validating constructor.
+    Nested model fields are built with ``model_construct`` as well, so the
+    result serializes the same way as a validated instance.
+    """
+    values = {
+        name: _construct_value(model_cls.model_fields[name].annotation, value)
+        for name, value in data.items()
+        if name in model_cls.model_fields
+    }
+    return model_cls.model_construct(**values)
@@ -1,13 +1,85 @@
 """
 Result models for scan and backtest operations.
 """
-from dataclasses import dataclass, asdict
+import math
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, date
-from typing import List, Dict, Any, Optional
-import json
+from typing import Iterator, List, Dict, Any, Optional
+import numpy as np
+import orjson
+
 from .signals import Signal, AlgorithmSettings
+from .serialization import fast_deserializable
+from ..utils.jit import njit, NUMBA_AVAILABLE
+
+
+@njit(cache=True)
+def _max_drawdown_kernel(returns: np.ndarray) -> float:
+    """Peak-to-trough loop over the cumulative return, starting at 0."""
+    cumulative = 0.0
+    peak = 0.0
+    max_drawdown = 0.0
+    for r in returns:
+        cumulative += r
+        if cumulative > peak:
+            peak = cumulative
+        if peak - cumulative > max_drawdown:
+            max_drawdown = peak - cumulative
+    return max_drawdown
+
+
+@njit(cache=True)
+def _sharpe_ratio_kernel(returns: np.ndarray) -> float:
+    """Mean over sample standard deviation in one pass (Welford); 0 if undefined."""
+    n = returns.shape[0]
+    if n < 2:
+        return 0.0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        delta = returns[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (returns[i] - mean)
+    if m2 <= 0.0:
+        return 0.0
+    return mean / math.sqrt(m2 / (n - 1))
+
+
+def max_drawdown(returns: np.ndarray) -> float:
+    """
+    Largest fall of the cumulative return from its running peak.
+
+    ``returns`` are float64 trade returns in exit-date order; the cumulative
+    return starts at 0, so a first losing trade counts as drawdown.
+    """
+    if NUMBA_AVAILABLE:
+        return float(_max_drawdown_kernel(returns))
+    # Interpreted, the kernel loop boxes every float; NumPy reduces in C
+    if not returns.shape[0]:
+        return 0.0
+    cumulative = np.cumsum(returns)
+    return float((np.maximum.accumulate(np.maximum(cumulative, 0.0)) - cumulative).max())
+
+
+def sharpe_ratio(returns: np.ndarray) -> float:
+    """
+    Mean over sample standard deviation of float64 returns (risk-free rate 0).
 
+    Returns 0.0 for fewer than two returns or zero spread.
+    """
+    if NUMBA_AVAILABLE:
+        return float(_sharpe_ratio_kernel(returns))
+    if returns.shape[0] < 2:
+        return 0.0
+    # Shifting by the first return keeps a constant series at exactly zero spread
+    shifted = returns - returns[0]
+    std_return = float(shifted.std(ddof=1))
+    if std_return <= 0:
+        return 0.0
+    return (float(shifted.mean()) + float(returns[0])) / std_return
 
+
+@fast_deserializable
 @dataclass
 class ScanDiagnostics:
     """Detailed diagnostics for a scan operation."""
@@ -23,13 +95,10 @@ class ScanDiagnostics:
         """Convert to dictionary for JSON serialization."""
         return asdict(self)
 
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'ScanDiagnostics':
-        """Create instance from dictionary."""
-        return cls(**data)
 
 
-@dataclass
+@fast_deserializable
+@dataclass(slots=True)
 class ScanResult:
     """Result of a stock scanning operation."""
     id: str
@@ -44,39 +113,32 @@ class ScanResult:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        data['signals_found'] = [signal.to_dict() for signal in self.signals_found]
-        data['settings_used'] = self.settings_used.to_dict()
-        if self.diagnostics:
-            data['diagnostics'] = self.diagnostics.to_dict()
-        return data
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'ScanResult':
-        """Create instance from dictionary."""
-        data = data.copy()
-        if isinstance(data['timestamp'], str):
-            data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-        if isinstance(data['signals_found'], list):
-            data['signals_found'] = [Signal.from_dict(signal) for signal in data['signals_found']]
-        if isinstance(data['settings_used'], dict):
-            data['settings_used'] = AlgorithmSettings.from_dict(data['settings_used'])
-        if 'diagnostics' in data and data['diagnostics']:
-            data['diagnostics'] = ScanDiagnostics.from_dict(data['diagnostics'])
-        return cls(**data)
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp.isoformat(),
+            'symbols_scanned': list(self.symbols_scanned),
+            'signals_found': [signal.to_dict() for signal in self.signals_found],
+            'settings_used': self.settings_used.to_dict(),
+            'execution_time': self.execution_time,
+            'diagnostics': self.diagnostics.to_dict() if self.diagnostics else None,
+            'scan_status': self.scan_status,
+            'error_message': self.error_message,
+        }
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict())
+        # orjson walks nested dataclasses and datetimes natively, skipping to_dict;
+        # values computed with NumPy arrive as NumPy scalars
+        return orjson.dumps(self, option=orjson.OPT_SERIALIZE_NUMPY).decode()
 
     @classmethod
     def from_json(cls, json_str: str) -> 'ScanResult':
         """Create instance from JSON string."""
-        return cls.from_dict(json.loads(json_str))
+        return cls.from_dict(orjson.loads(json_str))
 
 
-@dataclass
+@fast_deserializable
+@dataclass(slots=True)
 class Trade:
     """Represents a single trade from backtesting."""
     symbol: str
@@ -90,32 +152,47 @@ class Trade:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        data = asdict(self)
-        data['entry_date'] = self.entry_date.isoformat()
-        data['exit_date'] = self.exit_date.isoformat()
-        return data
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Trade':
-        """Create instance from dictionary."""
-        data = data.copy()
-        if isinstance(data['entry_date'], str):
-            data['entry_date'] = datetime.fromisoformat(data['entry_date'])
-        if isinstance(data['exit_date'], str):
-            data['exit_date'] = datetime.fromisoformat(data['exit_date'])
-        return cls(**data)
+        return {
+            'symbol': self.symbol,
+            'entry_date': self.entry_date.isoformat(),
+            'entry_price': self.entry_price,
+            'exit_date': self.exit_date.isoformat(),
+            'exit_price': self.exit_price,
+            'trade_type': self.trade_type,
+            'pnl': self.pnl,
+            'pnl_percent': self.pnl_percent,
+        }
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict())
+        # orjson walks nested dataclasses and datetimes natively, skipping to_dict;
+        # values computed with NumPy arrive as NumPy scalars
+        return orjson.dumps(self, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    @staticmethod
+    def to_arrays(trades: List['Trade']) -> Dict[str, np.ndarray]:
+        """
+        Convert a list of trades into column arrays.
+
+        Returns ``pnl`` and ``pnl_percent`` as float64 arrays and
+        ``entry_date``/``exit_date`` as datetime64 arrays, all in list order.
+        """
+        count = len(trades)
+        return {
+            'pnl': np.fromiter((t.pnl for t in trades), dtype=np.float64, count=count),
+            'pnl_percent': np.fromiter((t.pnl_percent for t in trades), dtype=np.float64, count=count),
+            'entry_date': np.array([t.entry_date for t in trades], dtype='datetime64[us]'),
+            'exit_date': np.array([t.exit_date for t in trades], dtype='datetime64[us]'),
+        }
 
     @classmethod
     def from_json(cls, json_str: str) -> 'Trade':
         """Create instance from JSON string."""
-        return cls.from_dict(json.loads(json_str))
+        return cls.from_dict(orjson.loads(json_str))
 
 
-@dataclass
+@fast_deserializable
+@dataclass(slots=True)
 class PerformanceMetrics:
     """Performance metrics calculated from backtest results."""
     total_trades: int
@@ -126,27 +203,98 @@ class PerformanceMetrics:
     average_return: float
     max_drawdown: float
     sharpe_ratio: float
+    # Cumulative return after each trade in exit order
+    equity_curve: np.ndarray = field(default_factory=lambda: np.zeros(0), compare=False, repr=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        return asdict(self)
-
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'PerformanceMetrics':
-        """Create instance from dictionary."""
-        return cls(**data)
+        return {
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'win_rate': self.win_rate,
+            'total_return': self.total_return,
+            'average_return': self.average_return,
+            'max_drawdown': self.max_drawdown,
+            'sharpe_ratio': self.sharpe_ratio,
+        }
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict())
+        # The equity curve is left out of to_dict and the stored metrics;
+        # orjson writes it here straight from the array buffer
+        return orjson.dumps(self, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    @classmethod
+    def from_trades(cls, trades: List[Trade]) -> 'PerformanceMetrics':
+        """
+        Calculate metrics from a list of trades using column arrays.
+
+        Returns are trade ``pnl_percent`` values. Drawdown is measured on the
+        cumulative return in exit-date order, starting from zero, and the
+        Sharpe ratio is mean over sample standard deviation (risk-free rate 0).
+        """
+        total_trades = len(trades)
+        if not total_trades:
+            return cls(
+                total_trades=0,
+                winning_trades=0,
+                losing_trades=0,
+                win_rate=0.0,
+                total_return=0.0,
+                average_return=0.0,
+                max_drawdown=0.0,
+                sharpe_ratio=0.0
+            )
+
+        if total_trades == 1:
+            # Nothing to sort or spread; the only drawdown is the trade's own loss
+            trade = trades[0]
+            ret = float(trade.pnl_percent)
+            won = trade.pnl > 0
+            return cls(
+                total_trades=1,
+                winning_trades=int(won),
+                losing_trades=int(not won),
+                win_rate=float(won),
+                total_return=ret,
+                average_return=ret,
+                max_drawdown=max(0.0, -ret),
+                sharpe_ratio=0.0,
+                equity_curve=np.array([ret])
+            )
+
+        arrays = Trade.to_arrays(trades)
+        pnl = arrays['pnl']
+        returns = arrays['pnl_percent']
+
+        winning_trades = int(np.count_nonzero(pnl > 0))
+        total_return = float(returns.sum())
+
+        # Stable sort keeps list order for trades closed at the same time
+        order = np.argsort(arrays['exit_date'], kind='stable')
+        exit_ordered = returns[order]
+
+        return cls(
+            total_trades=total_trades,
+            winning_trades=winning_trades,
+            losing_trades=total_trades - winning_trades,
+            win_rate=winning_trades / total_trades,
+            total_return=total_return,
+            average_return=total_return / total_trades,
+            max_drawdown=max_drawdown(exit_ordered),
+            sharpe_ratio=sharpe_ratio(returns),
+            equity_curve=np.cumsum(exit_ordered)
+        )
 
     @classmethod
     def from_json(cls, json_str: str) -> 'PerformanceMetrics':
         """Create instance from JSON string."""
-        return cls.from_dict(json.loads(json_str))
+        return cls.from_dict(orjson.loads(json_str))
 
 
-@dataclass
+@fast_deserializable
+@dataclass(slots=True)
 class BacktestResult:
     """Result of a backtesting operation."""
     id: str
@@ -160,38 +308,66 @@ class BacktestResult:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        data['start_date'] = self.start_date.isoformat()
-        data['end_date'] = self.end_date.isoformat()
-        data['trades'] = [trade.to_dict() for trade in self.trades]
-        data['performance'] = self.performance.to_dict()
-        data['settings_used'] = self.settings_used.to_dict()
-        return data
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp.isoformat(),
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat(),
+            'symbols': list(self.symbols),
+            'trades': [trade.to_dict() for trade in self.trades],
+            'performance': self.performance.to_dict(),
+            'settings_used': self.settings_used.to_dict(),
+        }
 
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'BacktestResult':
-        """Create instance from dictionary."""
-        data = data.copy()
-        if isinstance(data['timestamp'], str):
-            data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-        if isinstance(data['start_date'], str):
-            data['start_date'] = date.fromisoformat(data['start_date'])
-        if isinstance(data['end_date'], str):
-            data['end_date'] = date.fromisoformat(data['end_date'])
-        if isinstance(data['trades'], list):
-            data['trades'] = [Trade.from_dict(trade) for trade in data['trades']]
-        if isinstance(data['performance'], dict):
-            data['performance'] = PerformanceMetrics.from_dict(data['performance'])
-        if isinstance(data['settings_used'], dict):
-            data['settings_used'] = AlgorithmSettings.from_dict(data['settings_used'])
-        return cls(**data)
+    def to_json_bytes(self) -> bytes:
+        """
+        Convert to UTF-8 encoded JSON bytes.
+
+        orjson walks the trades, metrics and settings dataclasses in a single
+        pass without building intermediate dictionaries; NumPy scalars left
+        in the metrics by the backtest engine are encoded natively.
+        """
+        return orjson.dumps(self, option=orjson.OPT_SERIALIZE_NUMPY)
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict())
+        return self.to_json_bytes().decode()
+
+    def iter_json_bytes(self, trades_per_chunk: int = 500) -> Iterator[bytes]:
+        """
+        Yield the JSON encoding of this result in chunks.
+
+        Trades are encoded ``trades_per_chunk`` at a time, so peak memory is
+        bounded by one chunk rather than the whole document. The concatenated
+        output is identical to ``to_json_bytes()``.
+        """
+        dumps = orjson.dumps
+        option = orjson.OPT_SERIALIZE_NUMPY
+        yield (
+            b'{"id":' + dumps(self.id)
+            + b',"timestamp":' + dumps(self.timestamp)
+            + b',"start_date":' + dumps(self.start_date)
+            + b',"end_date":' + dumps(self.end_date)
+            + b',"symbols":' + dumps(self.symbols)
+            + b',"trades":['
+        )
+        trades = self.trades
+        for start in range(0, len(trades), trades_per_chunk):
+            # Strip the array brackets so chunks splice into one array
+            chunk = dumps(trades[start:start + trades_per_chunk], option=option)[1:-1]
+            yield b',' + chunk if start else chunk
+        yield (
+            b'],"performance":' + dumps(self.performance, option=option)
+            + b',"settings_used":' + dumps(self.settings_used, option=option)
+            + b'}'
+        )
+
+    @classmethod
+    def list_to_json_bytes(cls, results: List['BacktestResult']) -> bytes:
+        """Encode several results as one JSON array in a single orjson call."""
+        return orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY)
 
     @classmethod
     def from_json(cls, json_str: str) -> 'BacktestResult':
         """Create instance from JSON string."""
-        return cls.from_dict(json.loads(json_str))
\ No newline at end of file
+        return cls.from_dict(orjson.loads(json_str))
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Code-generated serialization helpers for dataclass models.
+
+``dataclasses.asdict`` walks ``fields()`` and deep-copies every value on each
+call. The ``fast_serializable`` decorator instead builds a specialized
+``to_dict``/``from_dict`` pair once per class, at import time, by generating
+source text and ``exec``-ing it.
+"""
+from dataclasses import MISSING, asdict, fields, is_dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Union, get_args, get_origin, get_type_hints
+
+import numpy as np
+
+try:
+    from ciso8601 import parse_datetime
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+    parse_datetime = datetime.fromisoformat
+
+
+def _unwrap_optional(tp: Any) -> Any:
+    """Return ``X`` for ``Optional[X]``, otherwise ``tp`` unchanged."""
+    if get_origin(tp) is Union:
+        args = [arg for arg in get_args(tp) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return tp
+
+
+def _is_model(tp: Any) -> bool:
+    """Check whether a type is a dataclass with its own to_dict/from_dict."""
+    return (
+        isinstance(tp, type)
+        and is_dataclass(tp)
+        and hasattr(tp, 'to_dict')
+        and hasattr(tp, 'from_dict')
+    )
+
+
+def _copy_value(value: Any) -> Any:
+    """Fallback conversion for untyped values, matching ``asdict`` semantics."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, list):
+        return [_copy_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy_value(v) for k, v in value.items()}
+    return value
+
+
+def _encode_expr(expr: str, tp: Any, namespace: Dict[str, Any]) -> str:
+    """Build the source expression that serializes ``expr`` of type ``tp``."""
+    inner = _unwrap_optional(tp)
+    optional = inner is not tp
+    origin = get_origin(inner)
+    args = get_args(inner)
+
+    if inner in (datetime, date):
+        code = f"{expr}.isoformat()"
+    elif inner is np.ndarray:
+        code = f"{expr}.tolist()"
+    elif _is_model(inner):
+        code = f"{expr}.to_dict()"
+    elif origin is dict and args and _is_model(args[1]):
+        code = f"{{k: v.to_dict() for k, v in {expr}.items()}}"
+    elif origin is list and args and _is_model(args[0]):
+        code = f"[v.to_dict() for v in {expr}]"
+    elif origin is dict and args and get_origin(args[1]) is list:
+        code = f"{{k: list(v) for k, v in {expr}.items()}}"
+    elif origin is dict and args and args[1] is not Any:
+        code = f"dict({expr})"
+    elif origin is list and args and args[0] is not Any:
+        code = f"list({expr})"
+    elif inner in (str, int, float, bool):
+        return expr
+    else:
+        namespace['_copy_value'] = _copy_value
+        return f"_copy_value({expr})"
+
+    if optional:
+        return f"({code} if {expr} is not None else None)"
+    return code
+
+
+def _decode_expr(expr: str, tp: Any, namespace: Dict[str, Any]) -> str:
+    """Build the source expression that deserializes ``expr`` of type ``tp``."""
+    inner = _unwrap_optional(tp)
+    origin = get_origin(inner)
+    args = get_args(inner)
+
+    if inner is datetime:
+        # ciso8601 parses ISO timestamps in C without the stdlib's dispatch
+        namespace['_parse_datetime'] = parse_datetime
+        return f"(_parse_datetime({expr}) if isinstance({expr}, str) else {expr})"
+    if inner is date:
+        namespace['_date'] = date
+        return f"(_date.fromisoformat({expr}) if isinstance({expr}, str) else {expr})"
+    if inner is np.ndarray:
+        namespace['_asarray'] = np.asarray
+        return f"_asarray({expr}, dtype=float)"
+    if _is_model(inner):
+        name = f"_{inner.__name__}"
+        namespace[name] = inner
+        return f"({name}.from_dict({expr}) if isinstance({expr}, dict) else {expr})"
+    if origin is dict and args and _is_model(args[1]):
+        name = f"_{args[1].__name__}"
+        namespace[name] = args[1]
+        return (
+            f"{{k: ({name}.from_dict(v) if isinstance(v, dict) else v) "
+            f"for k, v in {expr}.items()}}"
+        )
+    if origin is list and args and _is_model(args[0]):
+        name = f"_{args[0].__name__}"
+        namespace[name] = args[0]
+        return f"[({name}.from_dict(v) if isinstance(v, dict) else v) for v in {expr}]"
+    return expr
+
+
+def _build_to_dict(cls, hints: Dict[str, Any]):
+    """Generate a ``to_dict`` function specialized for ``cls``."""
+    namespace: Dict[str, Any] = {}
+    items = []
+    for f in fields(cls):
+        items.append(f"{f.name!r}: {_encode_expr('self.' + f.name, hints[f.name], namespace)}")
+    source = (
+        "def to_dict(self):\n"
+        f"    return {{{', '.join(items)}}}\n"
+    )
+    exec(source, namespace)
+
+    to_dict = namespace['to_dict']
+    to_dict.__qualname__ = f"{cls.__qualname__}.to_dict"
+    to_dict.__doc__ = "Convert to dictionary for JSON serialization."
+    return to_dict
+
+
+def _reject_keys(cls, data: Dict[str, Any], names: frozenset) -> None:
+    """Raise the ``TypeError`` that ``cls(**data)`` raises for unknown or missing keys."""
+    for key in data:
+        if key not in names:
+            raise TypeError(f"{cls.__name__}.__init__() got an unexpected keyword argument {key!r}")
+    missing = [
+        f.name for f in fields(cls)
+        if f.init and f.name not in data and f.default is MISSING and f.default_factory is MISSING
+    ]
+    raise TypeError(
+        f"{cls.__name__}.__init__() missing required argument(s): {', '.join(map(repr, missing))}"
+    )
+
+
+def _build_from_dict(cls, hints: Dict[str, Any]):
+    """Generate a ``from_dict`` function specialized for ``cls``."""
+    init_fields = [f for f in fields(cls) if f.init]
+    required = [
+        f.name for f in init_fields if f.default is MISSING and f.default_factory is MISSING
+    ]
+    namespace: Dict[str, Any] = {
+        '_names': frozenset(f.name for f in init_fields),
+        '_reject_keys': _reject_keys,
+    }
+    # Reject what cls(**data) would: unknown keys, or a required field missing
+    checks = ["not _names.issuperset(data)"]
+    checks.extend(f"{name!r} not in data" for name in required)
+    lines = [
+        "def from_dict(cls, data):",
+        f"    if {' or '.join(checks)}:",
+        "        _reject_keys(cls, data, _names)",
+    ]
+    kwargs = []
+    for f in init_fields:
+        local = f"_v_{f.name}"
+        if f.default is not MISSING:
+            default_name = f"_default_{f.name}"
+            namespace[default_name] = f.default
+            lines.append(f"    {local} = data.get({f.name!r}, {default_name})")
+        elif f.default_factory is not MISSING:
+            factory_name = f"_factory_{f.name}"
+            namespace[factory_name] = f.default_factory
+            lines.append(
+                f"    {local} = data[{f.name!r}] if {f.name!r} in data else {factory_name}()"
+            )
+        else:
+            lines.append(f"    {local} = data[{f.name!r}]")
+        decoded = _decode_expr(local, hints[f.name], namespace)
+        if decoded != local:
+            lines.append(f"    {local} = {decoded}")
+        kwargs.append(f"{f.name}={local}")
+    lines.append(f"    return cls({', '.join(kwargs)})")
+    exec("\n".join(lines) + "\n", namespace)
+
+    from_dict = namespace['from_dict']
+    from_dict.__qualname__ = f"{cls.__qualname__}.from_dict"
+    from_dict.__doc__ = "Create instance from dictionary."
+    return from_dict
+
+
+def fast_serializable(cls):
+    """
+    Class decorator that generates specialized ``to_dict``/``from_dict`` methods.
+
+    Each field is serialized with a branch chosen at decoration time from its
+    type annotation: datetimes become ISO strings, nested models call their
+    own ``to_dict``, and containers are shallow-copied instead of deep-copied.
+    ``from_dict`` accepts both raw and already-converted values and falls back
+    to field defaults for missing keys. Like the constructor, it raises
+    ``TypeError`` for unknown keys or a missing required field.
+    """
+    hints = get_type_hints(cls)
+    cls.to_dict = _build_to_dict(cls, hints)
+    cls.from_dict = classmethod(_build_from_dict(cls, hints))
+    return cls
+
+
+def fast_deserializable(cls):
+    """
+    Class decorator that generates only a specialized ``from_dict`` method.
+
+    Use this for classes that keep a hand-written ``to_dict``. The generated
+    function reads fields straight from the input mapping, so the input is
+    never copied or mutated.
+    """
+    cls.from_dict = classmethod(_build_from_dict(cls, get_type_hints(cls)))
+    return cls
@@ -1,10 +1,14 @@
 """
 Signal and algorithm settings models for the stock scanner.
 """
-from dataclasses import dataclass, asdict
-from datetime import datetime
-from typing import Dict, Any
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, tzinfo
+from typing import Dict, Any, ClassVar, List, Optional
 import json
+
+import numpy as np
+import pandas as pd
+
 from .market_data import TechnicalIndicators
 
 
@@ -45,6 +49,67 @@ class Signal:
         return cls.from_dict(json.loads(json_str))
 
 
+@dataclass(slots=True)
+class SignalArray:
+    """
+    Columnar batch of signals for one symbol.
+    
+    Each column holds one entry per signal, ordered by bar. ``Signal``
+    objects are only built when ``to_signals`` is called.
+    """
+    LONG: ClassVar[int] = 0
+    SHORT: ClassVar[int] = 1
+    
+    symbol: str
+    bar_indices: np.ndarray  # int64 position of the bar in the input history
+    timestamps: np.ndarray  # int64 nanoseconds since the epoch (UTC if tz is set)
+    prices: np.ndarray  # float64 close prices
+    confidences: np.ndarray  # float64
+    types: np.ndarray  # int8, LONG or SHORT
+    indicators: Dict[str, np.ndarray]  # float64 columns keyed by TechnicalIndicators field
+    tz: Optional[tzinfo] = None
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @classmethod
+    def empty(cls, symbol: str) -> 'SignalArray':
+        """Create a batch with no signals."""
+        return cls(
+            symbol=symbol,
+            bar_indices=np.empty(0, dtype=np.int64),
+            timestamps=np.empty(0, dtype=np.int64),
+            prices=np.empty(0, dtype=np.float64),
+            confidences=np.empty(0, dtype=np.float64),
+            types=np.empty(0, dtype=np.int8),
+            indicators={f.name: np.empty(0, dtype=np.float64) for f in fields(TechnicalIndicators)}
+        )
+
+    def to_signals(self) -> List[Signal]:
+        """Materialize the batch as ``Signal`` objects."""
+        if not len(self):
+            return []
+        index = pd.to_datetime(self.timestamps, unit='ns', utc=self.tz is not None)
+        if self.tz is not None:
+            index = index.tz_convert(self.tz)
+        timestamps = index.to_pydatetime()
+        prices = self.prices.tolist()
+        confidences = self.confidences.tolist()
+        types = self.types.tolist()
+        columns = {name: column.tolist() for name, column in self.indicators.items()}
+        return [
+            Signal(
+                symbol=self.symbol,
+                signal_type='long' if types[i] == self.LONG else 'short',
+                timestamp=timestamps[i],
+                price=prices[i],
+                indicators=TechnicalIndicators(**{name: values[i] for name, values in columns.items()}),
+                confidence=confidences[i]
+            )
+            for i in range(len(types))
+        ]
+
+
 @dataclass
 class AlgorithmSettings:
     """Configuration settings for the trading algorithm."""
@@ -1,18 +1,86 @@
 """
 Monitoring and metrics collection for the Stock Scanner application.
 """
+import asyncio
+import threading
 import time
 import psutil
-from typing import Dict, Any
-from datetime import datetime, timedelta
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .logging_config import get_logger
 
 
 logger = get_logger(__name__)
 
+# Seconds a system resource snapshot stays valid
+SYSTEM_SNAPSHOT_TTL = 1.0
+
+# Requests taking longer than this are logged as slow
+SLOW_REQUEST_SECONDS = 5.0
+
+
+@dataclass
+class SystemSnapshot:
+    """Point-in-time system resource usage."""
+    cpu_percent: float
+    memory_total: int
+    memory_available: int
+    memory_percent: float
+    disk_total: int
+    disk_used: int
+    disk_free: int
+    disk_percent: float
+    expires_at: float
+
+
+_system_snapshot: Optional[SystemSnapshot] = None
+
+
+def _take_system_snapshot(ttl: float = SYSTEM_SNAPSHOT_TTL) -> SystemSnapshot:
+    """Read system resource usage from psutil."""
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    return SystemSnapshot(
+        cpu_percent=psutil.cpu_percent(interval=None),
+        memory_total=memory.total,
+        memory_available=memory.available,
+        memory_percent=memory.percent,
+        disk_total=disk.total,
+        disk_used=disk.used,
+        disk_free=disk.free,
+        disk_percent=disk.percent,
+        expires_at=time.monotonic() + ttl,
+    )
+
+
+def get_system_snapshot() -> SystemSnapshot:
+    """
+    Get the cached system snapshot, refreshing it once it has expired.
+
+    While ``run_system_sampler`` is running the snapshot is kept fresh in the
+    background, so callers never pay for the psutil calls themselves.
+    """
+    global _system_snapshot
+    snapshot = _system_snapshot
+    if snapshot is None or time.monotonic() >= snapshot.expires_at:
+        snapshot = _system_snapshot = _take_system_snapshot()
+    return snapshot
+
+
+async def run_system_sampler(interval: float = SYSTEM_SNAPSHOT_TTL) -> None:
+    """Refresh the system snapshot every ``interval`` seconds until cancelled."""
+    global _system_snapshot
+    while True:
+        try:
+            # Valid for two intervals so reads never race the next refresh
+            _system_snapshot = _take_system_snapshot(ttl=interval * 2)
+        except Exception:
+            logger.error("System metrics sampling failed", exc_info=True)
+        await asyncio.sleep(interval)
+
 
 class MetricsCollector:
     """Collect application metrics."""
@@ -22,102 +90,144 @@ class MetricsCollector:
         self.request_duration_sum = 0.0
         self.error_count = 0
         self.start_time = datetime.utcnow()
+        self._start_monotonic = time.monotonic()
+        # (expires_at, metrics) for the current snapshot window
+        self._metrics_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        # Requests can be recorded from threadpool workers as well as the event loop
+        self._lock = threading.Lock()
     
     def record_request(self, duration: float, status_code: int):
         """Record a request metric."""
-        self.request_count += 1
-        self.request_duration_sum += duration
-        
-        if status_code >= 400:
-            self.error_count += 1
+        is_error = status_code >= 400
+        with self._lock:
+            self.request_count += 1
+            self.request_duration_sum += duration
+            self.error_count += is_error
+    
+    def get_counts(self) -> Tuple[int, int, float]:
+        """Get a consistent (request_count, error_count, duration_sum) triple."""
+        with self._lock:
+            return self.request_count, self.error_count, self.request_duration_sum
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get current metrics."""
-        uptime = datetime.utcnow() - self.start_time
+        """
+        Get current metrics.
+
+        The result is reused for ``SYSTEM_SNAPSHOT_TTL`` seconds, the same
+        window as the system snapshot, so repeated scrapes and health checks
+        share one computation.
+        """
+        now = time.monotonic()
+        cached = self._metrics_cache
+        if cached is not None and now < cached[0]:
+            return cached[1]
         
         # System metrics
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        system = get_system_snapshot()
         
-        return {
+        request_count, error_count, duration_sum = self.get_counts()
+        inverse_count = 1.0 / request_count if request_count else 0.0
+        
+        metrics = {
             "timestamp": datetime.utcnow().isoformat(),
-            "uptime_seconds": uptime.total_seconds(),
+            "uptime_seconds": now - self._start_monotonic,
             "requests": {
-                "total": self.request_count,
-                "errors": self.error_count,
-                "error_rate": self.error_count / max(self.request_count, 1),
-                "avg_duration": self.request_duration_sum / max(self.request_count, 1),
+                "total": request_count,
+                "errors": error_count,
+                "error_rate": error_count * inverse_count,
+                "avg_duration": duration_sum * inverse_count,
             },
             "system": {
-                "cpu_percent": cpu_percent,
+                "cpu_percent": system.cpu_percent,
                 "memory": {
-                    "total": memory.total,
-                    "available": memory.available,
-                    "percent": memory.percent,
+                    "total": system.memory_total,
+                    "available": system.memory_available,
+                    "percent": system.memory_percent,
                 },
                 "disk": {
-                    "total": disk.total,
-                    "used": disk.used,
-                    "free": disk.free,
-                    "percent": (disk.used / disk.total) * 100,
+                    "total": system.disk_total,
+                    "used": system.disk_used,
+                    "free": system.disk_free,
+                    "percent": (system.disk_used / system.disk_total) * 100,
                 },
             },
         }
+        self._metrics_cache = (now + SYSTEM_SNAPSHOT_TTL, metrics)
+        return metrics
 
 
 # Global metrics collector
 metrics_collector = MetricsCollector()
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware for collecting request metrics."""
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware for collecting request metrics.
+
+    Unlike ``BaseHTTPMiddleware`` this does not wrap each request in a task
+    or route bodies through memory streams, so streaming responses pass
+    straight through.
+    """
     
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Bind hot lookups once; method and path are only read when logging
+        perf_counter = time.perf_counter
+        record_request = metrics_collector.record_request
+        start_time = perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
         try:
-            response = await call_next(request)
-            duration = time.time() - start_time
-            
-            # Record metrics
-            metrics_collector.record_request(duration, response.status_code)
-            
-            # Log slow requests
-            if duration > 5.0:  # Log requests taking more than 5 seconds
-                logger.warning(
-                    f"Slow request: {request.method} {request.url.path} took {duration:.2f}s"
-                )
-            
-            return response
-            
-        except Exception as e:
-            duration = time.time() - start_time
-            metrics_collector.record_request(duration, 500)
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            duration = perf_counter() - start_time
+            record_request(duration, 500)
             
             logger.error(
-                f"Request failed: {request.method} {request.url.path}",
+                f"Request failed: {scope['method']} {scope['path']}",
                 exc_info=True
             )
             raise
+        
+        duration = perf_counter() - start_time
+        
+        # Record metrics
+        record_request(duration, status_code)
+        
+        # Log slow requests
+        if duration > SLOW_REQUEST_SECONDS:
+            logger.warning(
+                f"Slow request: {scope['method']} {scope['path']} took {duration:.2f}s"
+            )
 
 
 def get_health_status() -> Dict[str, Any]:
     """Get application health status."""
     try:
         # Check system resources
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        system = get_system_snapshot()
         
         # Determine health status
         status = "healthy"
         issues = []
         
-        if memory.percent > 90:
+        if system.memory_percent > 90:
             status = "unhealthy"
             issues.append("High memory usage")
         
-        if disk.percent > 90:
+        if system.disk_percent > 90:
             status = "unhealthy"
             issues.append("High disk usage")
         
@@ -133,8 +243,8 @@ def get_health_status() -> Dict[str, Any]:
             "version": "1.0.0",
             "issues": issues,
             "checks": {
-                "memory_usage": memory.percent,
-                "disk_usage": disk.percent,
+                "memory_usage": system.memory_percent,
+                "disk_usage": system.disk_percent,
                 "error_rate": metrics["requests"]["error_rate"],
             }
         }
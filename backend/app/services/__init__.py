@@ -1,15 +1,32 @@
 """
 Services module for the stock scanner application.
 Contains business logic and algorithm implementations.
+
+Services are imported lazily on first attribute access, so importing one
+service does not pull in the dependencies of all the others.
 """
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .algorithm_engine import AlgorithmEngine
+    from .data_service import DataService
+    from .diagnostic_service import DiagnosticService
+    from .scanner_service import ScannerService
+    from .history_service import HistoryService
+    from .comparison_service import ComparisonService
+    from .export_service import ExportService
 
-from .algorithm_engine import AlgorithmEngine
-from .data_service import DataService
-from .diagnostic_service import DiagnosticService
-from .scanner_service import ScannerService
-from .history_service import HistoryService
-from .comparison_service import ComparisonService
-from .export_service import ExportService
+# Exported name -> submodule that defines it
+_LAZY_IMPORTS = {
+    'AlgorithmEngine': 'algorithm_engine',
+    'DataService': 'data_service',
+    'DiagnosticService': 'diagnostic_service',
+    'ScannerService': 'scanner_service',
+    'HistoryService': 'history_service',
+    'ComparisonService': 'comparison_service',
+    'ExportService': 'export_service',
+}
 
 __all__ = [
     'AlgorithmEngine', 
@@ -19,4 +36,19 @@ __all__ = [
     'HistoryService',
     'ComparisonService',
     'ExportService'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """Import a service class on first access and cache it on the package."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Include lazily imported services in ``dir()`` output."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,98 @@
+"""
+Loop kernels for vectorized signal evaluation, with an ahead-of-time build.
+
+The functions here are plain Python and can be called directly, but they are
+written in the subset Numba compiles. Running this module builds them into
+the ``algorithm_kernels`` extension next to it:
+
+    python -m app.services._algorithm_kernels
+
+``AlgorithmEngine`` uses the compiled extension when it can be imported, so
+neither JIT warm-up nor the Numba runtime is needed at run time.
+"""
+import os
+
+import numpy as np
+
+# Export signature shared by both kernels: ten float64 arrays (close, open,
+# ema5, ema8, ema21, atr, ATR line, previous ema5/8/21) and five float64
+# scalars (fomo multiplier, minimum ATR, three EMA thresholds).
+KERNEL_SIGNATURE = 'i1[:](' + ', '.join(['f8[:]'] * 10 + ['f8'] * 5) + ')'
+# Same kernels over float32 inputs, exported with an ``_f32`` suffix
+KERNEL_SIGNATURE_F32 = 'i1[:](' + ', '.join(['f4[:]'] * 10 + ['f4'] * 5) + ')'
+
+
+def long_condition_counts(close, open_, ema5, ema8, ema21, atr, atr_long_line,
+                          ema5_prev, ema8_prev, ema21_prev,
+                          fomo_mult, inv_vol_filter, t5, t8, t21):
+    """Count the met long conditions (excluding HTF) for every bar."""
+    n = close.shape[0]
+    counts = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        c = close[i]
+        met = 0
+        if c > open_[i] and c > ema8[i] and c > ema21[i]:
+            met += 1
+        if ema5[i] < atr_long_line[i]:
+            met += 1
+        if (ema5_prev[i] != 0.0 and ema8_prev[i] != 0.0 and ema21_prev[i] != 0.0
+                and (ema5[i] - ema5_prev[i]) / ema5_prev[i] >= t5
+                and (ema8[i] - ema8_prev[i]) / ema8_prev[i] >= t8
+                and (ema21[i] - ema21_prev[i]) / ema21_prev[i] >= t21):
+            met += 1
+        max_distance = atr[i] * fomo_mult
+        if abs(c - ema8[i]) <= max_distance and abs(c - ema21[i]) <= max_distance:
+            met += 1
+        if atr[i] >= inv_vol_filter:
+            met += 1
+        counts[i] = met
+    return counts
+
+
+def short_condition_counts(close, open_, ema5, ema8, ema21, atr, atr_short_line,
+                           ema5_prev, ema8_prev, ema21_prev,
+                           fomo_mult, inv_vol_filter, t5, t8, t21):
+    """Count the met short conditions (excluding HTF) for every bar."""
+    n = close.shape[0]
+    counts = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        c = close[i]
+        met = 0
+        if c < open_[i] and c < ema8[i] and c < ema21[i]:
+            met += 1
+        if ema5[i] > atr_short_line[i]:
+            met += 1
+        if (ema5_prev[i] != 0.0 and ema8_prev[i] != 0.0 and ema21_prev[i] != 0.0
+                and (ema5[i] - ema5_prev[i]) / ema5_prev[i] <= -t5
+                and (ema8[i] - ema8_prev[i]) / ema8_prev[i] <= -t8
+                and (ema21[i] - ema21_prev[i]) / ema21_prev[i] <= -t21):
+            met += 1
+        max_distance = atr[i] * fomo_mult
+        if abs(c - ema8[i]) <= max_distance and abs(c - ema21[i]) <= max_distance:
+            met += 1
+        if atr[i] >= inv_vol_filter:
+            met += 1
+        counts[i] = met
+    return counts
+
+
+# The loops are dtype-generic; these names mirror the float32 exports
+long_condition_counts_f32 = long_condition_counts
+short_condition_counts_f32 = short_condition_counts
+
+
+def build(output_dir: str = None) -> None:
+    """Compile the kernels into the ``algorithm_kernels`` extension module."""
+    from numba.pycc import CC
+
+    cc = CC('algorithm_kernels')
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+    cc.export('long_condition_counts', KERNEL_SIGNATURE)(long_condition_counts)
+    cc.export('short_condition_counts', KERNEL_SIGNATURE)(short_condition_counts)
+    cc.export('long_condition_counts_f32', KERNEL_SIGNATURE_F32)(long_condition_counts)
+    cc.export('short_condition_counts_f32', KERNEL_SIGNATURE_F32)(short_condition_counts)
+    cc.compile()
+
+
+if __name__ == '__main__':
+    build()
@@ -4,22 +4,320 @@ Implements the core trading logic with polar formation, EMA positioning, and hig
 """
 
 import logging
-from typing import List, Optional, Tuple
+import math
+from math import fabs
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 
-from ..models.market_data import MarketData, TechnicalIndicators
-from ..models.signals import Signal, AlgorithmSettings
-from ..indicators.technical_indicators import TechnicalIndicatorEngine, InsufficientDataError, IndicatorCalculationError
+import numpy as np
+import pandas as pd
+
+from ..models.market_data import MarketData, MarketDataBuffer, TechnicalIndicators
+from ..models.signals import Signal, SignalArray, AlgorithmSettings
+from ..indicators.technical_indicators import (
+    TechnicalIndicatorEngine, IndicatorState, InsufficientDataError, IndicatorCalculationError
+)
+from ..utils.jit import njit
+
+try:
+    # Built ahead of time by ``python -m app.services._algorithm_kernels``
+    from . import algorithm_kernels as _aot_kernels
+    AOT_KERNELS_AVAILABLE = True
+except ImportError:
+    _aot_kernels = None
+    AOT_KERNELS_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Most bars a cached indicator state is advanced through one at a time before
+# a full recomputation is cheaper
+_MAX_CATCH_UP_BARS = 32
+
+
+# Scalar condition predicates. These hold the strategy arithmetic and are
+# compiled with Numba when it is installed; the AlgorithmEngine methods only
+# unpack model attributes and call them.
+
+@njit(cache=True)
+def _polar_long(close: float, open_: float, ema8: float, ema21: float) -> bool:
+    """Bullish polar formation: close > open, close > ema8, close > ema21."""
+    return close > open_ and close > ema8 and close > ema21
+
+
+@njit(cache=True)
+def _polar_short(close: float, open_: float, ema8: float, ema21: float) -> bool:
+    """Bearish polar formation: close < open, close < ema8, close < ema21."""
+    return close < open_ and close < ema8 and close < ema21
+
+
+@njit(cache=True)
+def _ema_pos_long(ema5: float, atr_long_line: float) -> bool:
+    """EMA5 is below the ATR long line."""
+    return ema5 < atr_long_line
+
+
+@njit(cache=True)
+def _ema_pos_short(ema5: float, atr_short_line: float) -> bool:
+    """EMA5 is above the ATR short line."""
+    return ema5 > atr_short_line
+
+
+@njit(cache=True)
+def _rising_emas(e5c: float, e5p: float, e8c: float, e8p: float, e21c: float, e21p: float,
+                 t5: float, t8: float, t21: float) -> bool:
+    """Percentage change of EMA5/8/21 is at least the rising thresholds."""
+    return (
+        (e5c - e5p) / e5p >= t5
+        and (e8c - e8p) / e8p >= t8
+        and (e21c - e21p) / e21p >= t21
+    )
+
+
+@njit(cache=True)
+def _falling_emas(e5c: float, e5p: float, e8c: float, e8p: float, e21c: float, e21p: float,
+                  neg_t5: float, neg_t8: float, neg_t21: float) -> bool:
+    """Percentage change of EMA5/8/21 is at most the negated thresholds."""
+    return (
+        (e5c - e5p) / e5p <= neg_t5
+        and (e8c - e8p) / e8p <= neg_t8
+        and (e21c - e21p) / e21p <= neg_t21
+    )
+
+
+@njit(cache=True)
+def _fomo(close: float, ema8: float, ema21: float, atr: float, multiplier: float) -> bool:
+    """Close is within ``atr * multiplier`` of both EMA8 and EMA21."""
+    max_distance = atr * multiplier
+    return fabs(close - ema8) <= max_distance and fabs(close - ema21) <= max_distance
+
+
+@njit(cache=True)
+def _vol(atr: float, inv_vol_filter: float) -> bool:
+    """ATR is at least ``1 / volatility_filter``, passed precomputed."""
+    return atr >= inv_vol_filter
+
+
+@njit(cache=True)
+def _htf_long(ema5: float, ema8: float, close: float, open_: float) -> bool:
+    """HTF EMA5 above EMA8 on a bullish candle."""
+    return ema5 > ema8 and close > open_
+
+
+@njit(cache=True)
+def _htf_short(ema5: float, ema8: float, close: float, open_: float) -> bool:
+    """HTF EMA5 below EMA8 on a bearish candle."""
+    return ema5 < ema8 and close < open_
+
+
+@dataclass(frozen=True, slots=True)
+class _SettingsCache:
+    """Values derived from ``AlgorithmSettings`` that stay fixed across bars."""
+    inv_vol_filter: float
+    fomo_mult: float
+    t5: float
+    t8: float
+    t21: float
+    neg_t5: float
+    neg_t8: float
+    neg_t21: float
+
+    @classmethod
+    def of(cls, settings: Union[AlgorithmSettings, '_SettingsCache']) -> '_SettingsCache':
+        """Return ``settings`` if already derived, otherwise derive it."""
+        if isinstance(settings, cls):
+            return settings
+        volatility_filter = settings.volatility_filter
+        return cls(
+            # A zero filter can never be met, matching the failed division before
+            inv_vol_filter=1.0 / volatility_filter if volatility_filter else math.inf,
+            fomo_mult=settings.fomo_filter,
+            t5=settings.ema5_rising_threshold,
+            t8=settings.ema8_rising_threshold,
+            t21=settings.ema21_rising_threshold,
+            neg_t5=-settings.ema5_rising_threshold,
+            neg_t8=-settings.ema8_rising_threshold,
+            neg_t21=-settings.ema21_rising_threshold,
+        )
+
+
+# (passed, failed) labels per condition bit, in evaluation order
+_LONG_CONDITION_LABELS = (
+    ("Bullish polar formation", "Failed bullish polar formation"),
+    ("EMA5 below ATR long line", "EMA5 not below ATR long line"),
+    ("Rising EMAs", "EMAs not rising sufficiently"),
+    ("FOMO filter passed", "Failed FOMO filter (price too extended)"),
+    ("Volatility filter passed", "Failed volatility filter"),
+    ("HTF confirmation", "Failed HTF confirmation"),
+)
+_SHORT_CONDITION_LABELS = (
+    ("Bearish polar formation", "Failed bearish polar formation"),
+    ("EMA5 above ATR short line", "EMA5 not above ATR short line"),
+    ("Falling EMAs", "EMAs not falling sufficiently"),
+    ("FOMO filter passed", "Failed FOMO filter (price too extended)"),
+    ("Volatility filter passed", "Failed volatility filter"),
+    ("HTF confirmation", "Failed HTF confirmation"),
+)
+_HTF_BIT = 5
+# Mask with every non-HTF condition met
+_NO_HTF_FULL_MASK = (1 << _HTF_BIT) - 1
+
+
+def _build_mask_labels(labels):
+    """Precompute (partial_criteria, rejection_reasons) for every mask, with and without HTF."""
+    table = {}
+    for has_htf in (False, True):
+        for mask in range(1 << len(labels)):
+            passed, failed = [], []
+            for bit, (passed_label, failed_label) in enumerate(labels):
+                if bit == _HTF_BIT and not has_htf:
+                    failed.append("No HTF data available")
+                elif mask >> bit & 1:
+                    passed.append(passed_label)
+                else:
+                    failed.append(failed_label)
+            table[has_htf, mask] = (tuple(passed), tuple(failed))
+    return table
+
+
+_MASK_TO_LABELS = {
+    'long': _build_mask_labels(_LONG_CONDITION_LABELS),
+    'short': _build_mask_labels(_SHORT_CONDITION_LABELS),
+}
+
+
+def _decode_analysis(signal_type: str, mask: int, has_htf: bool) -> dict:
+    """Expand a condition bitmask into the diagnostics dictionary."""
+    partial_criteria, rejection_reasons = _MASK_TO_LABELS[signal_type][has_htf, mask]
+    conditions_met = mask.bit_count()
+    total_conditions = 6 if has_htf else 5
+    return {
+        'signal_type': signal_type,
+        'conditions_met': conditions_met,
+        'total_conditions': total_conditions,
+        'rejection_reasons': list(rejection_reasons),
+        'partial_criteria': list(partial_criteria),
+        'confidence': conditions_met / total_conditions,
+        'signal_valid': conditions_met == total_conditions
+    }
+
 
 class AlgorithmEngine:
     """Core algorithm engine for generating trading signals."""
     
-    def __init__(self):
+    def __init__(self, collect_diagnostics: bool = True):
+        """
+        Args:
+            collect_diagnostics: Evaluate every condition so that
+                ``get_last_analysis`` can report each one. When False,
+                evaluation stops at the first failed condition and returns
+                ``(False, 0.0)`` with no analysis kept. Either way the
+                analysis dictionary is only built when it is requested.
+        """
         self.indicator_engine = TechnicalIndicatorEngine()
+        # Minimum bars for a full indicator set, including ATR's previous close
+        self._min_points = max(self.indicator_engine.required_periods.values()) + 1
+        self._diagnostics_enabled = collect_diagnostics
         self._last_analysis = None  # Store detailed analysis for diagnostics
+        self._pending_analysis = None  # (signal_type, mask, has_htf) awaiting decode
+        # Per-symbol price columns, kept in sync with the history passed in
+        self._buffers: Dict[str, MarketDataBuffer] = {}
+        self._htf_buffers: Dict[str, MarketDataBuffer] = {}
+        # symbol -> ((history key, state), (history + current bar key, state))
+        self._state_cache: Dict[str, Tuple[Tuple[tuple, IndicatorState], Tuple[tuple, IndicatorState]]] = {}
+        self._htf_state_cache: Dict[str, Tuple[Tuple[tuple, IndicatorState], Tuple[tuple, IndicatorState]]] = {}
+    
+    @property
+    def collect_diagnostics(self) -> bool:
+        """Whether evaluations keep the per-condition analysis."""
+        return self._diagnostics_enabled
+    
+    @staticmethod
+    def _sync_buffer(buffers: Dict[str, MarketDataBuffer], symbol: str,
+                     data: Sequence[MarketData], count: Optional[int] = None) -> MarketDataBuffer:
+        """Return the symbol's price buffer updated to hold exactly ``data[:count]``."""
+        if count is None:
+            count = len(data)
+        buffer = buffers.get(symbol)
+        if buffer is None:
+            buffer = buffers[symbol] = MarketDataBuffer(capacity=count)
+        buffer.sync(data, count)
+        return buffer
+    
+    @staticmethod
+    def _history_key(first: MarketData, count: int, last: MarketData) -> tuple:
+        """Identify a price history by its length, first bar and last bar's values."""
+        return (count, first.timestamp, last.timestamp, last.high, last.low, last.close)
+    
+    def _indicator_states(self, market_data: MarketData, historical_data: Sequence[MarketData],
+                          atr_multiplier: float,
+                          count: Optional[int] = None,
+                          htf: bool = False) -> Tuple[IndicatorState, IndicatorState]:
+        """
+        Return the indicator states for the last historical bar and the current bar.
+        
+        The history is the first ``count`` bars of ``historical_data`` (all of
+        them by default). When it matches the one seen on the previous call
+        for this symbol (same bars, or extended by the previous current bar)
+        the current bar is applied to the cached state in O(1); a history
+        that extends a cached one by a few bars is caught up bar by bar.
+        Otherwise every indicator is recomputed from the full history.
+        ``htf`` selects the higher timeframe buffers and cache.
+        """
+        symbol = market_data.symbol
+        indicator_engine = self.indicator_engine
+        buffers, state_cache = (
+            (self._htf_buffers, self._htf_state_cache) if htf else (self._buffers, self._state_cache)
+        )
+        if count is None:
+            count = len(historical_data)
+        previous_state = history_key = None
+        if count:
+            first = historical_data[0]
+            last = historical_data[count - 1]
+            history_key = self._history_key(first, count, last)
+            cached = state_cache.get(symbol, ())
+            for key, state in cached:
+                if key == history_key:
+                    previous_state = state
+                    break
+            else:
+                for key, state in cached:
+                    known = key[0] if key is not None else 0
+                    if (0 < known < count and count - known <= _MAX_CATCH_UP_BARS
+                            and key == self._history_key(first, known, historical_data[known - 1])):
+                        for position in range(known, count):
+                            bar = historical_data[position]
+                            state = indicator_engine.advance_state(state, bar.high, bar.low, bar.close)
+                        previous_state = state
+                        break
+        
+        if previous_state is not None:
+            current_state = indicator_engine.advance_state(
+                previous_state, market_data.high, market_data.low, market_data.close
+            )
+        else:
+            if count < len(historical_data) and historical_data[count] is market_data:
+                # Indexed call: the current bar already follows the history
+                buffer = self._sync_buffer(buffers, symbol, historical_data, count + 1)
+            else:
+                buffer = self._sync_buffer(
+                    buffers, symbol, list(historical_data[:count]) + [market_data]
+                )
+            n = len(buffer)
+            # Indicator values for every bar in one pass; EMAs and ATR are
+            # recursive, so each bar's value matches a recomputation on its prefix
+            series = indicator_engine.calculate_all_indicators_series(
+                buffer.highs[:n], buffer.lows[:n], buffer.closes[:n], atr_multiplier
+            )
+            previous_state = indicator_engine.state_at(series, -2, last.close)
+            current_state = indicator_engine.state_at(series, -1, market_data.close)
+        
+        state_cache[symbol] = (
+            (history_key, previous_state),
+            (self._history_key(first, count + 1, market_data), current_state),
+        )
+        return previous_state, current_state
     
     def _check_polar_formation_long(self, market_data: MarketData, indicators: TechnicalIndicators) -> bool:
         """
@@ -32,17 +330,8 @@ class AlgorithmEngine:
         Returns:
             True if bullish polar formation is present
         """
-        try:
-            # Bullish polar formation: close > open, close > ema8, close > ema21
-            close_above_open = market_data.close > market_data.open
-            close_above_ema8 = market_data.close > indicators.ema8
-            close_above_ema21 = market_data.close > indicators.ema21
-            
-            return close_above_open and close_above_ema8 and close_above_ema21
-            
-        except Exception as e:
-            logger.error(f"Error checking bullish polar formation: {str(e)}")
-            return False
+        return _polar_long(market_data.close, market_data.open,
+                           indicators.ema8, indicators.ema21)
     
     def _check_polar_formation_short(self, market_data: MarketData, indicators: TechnicalIndicators) -> bool:
         """
@@ -55,17 +344,8 @@ class AlgorithmEngine:
         Returns:
             True if bearish polar formation is present
         """
-        try:
-            # Bearish polar formation: close < open, close < ema8, close < ema21
-            close_below_open = market_data.close < market_data.open
-            close_below_ema8 = market_data.close < indicators.ema8
-            close_below_ema21 = market_data.close < indicators.ema21
-            
-            return close_below_open and close_below_ema8 and close_below_ema21
-            
-        except Exception as e:
-            logger.error(f"Error checking bearish polar formation: {str(e)}")
-            return False
+        return _polar_short(market_data.close, market_data.open,
+                            indicators.ema8, indicators.ema21)
     
     def _check_ema_positioning_long(self, indicators: TechnicalIndicators) -> bool:
         """
@@ -77,11 +357,7 @@ class AlgorithmEngine:
         Returns:
             True if EMA5 is below ATR long line
         """
-        try:
-            return indicators.ema5 < indicators.atr_long_line
-        except Exception as e:
-            logger.error(f"Error checking long EMA positioning: {str(e)}")
-            return False
+        return _ema_pos_long(indicators.ema5, indicators.atr_long_line)
     
     def _check_ema_positioning_short(self, indicators: TechnicalIndicators) -> bool:
         """
@@ -93,86 +369,88 @@ class AlgorithmEngine:
         Returns:
             True if EMA5 is above ATR short line
         """
-        try:
-            return indicators.ema5 > indicators.atr_short_line
-        except Exception as e:
-            logger.error(f"Error checking short EMA positioning: {str(e)}")
-            return False
+        return _ema_pos_short(indicators.ema5, indicators.atr_short_line)
+    
+    @staticmethod
+    def _trend_emas(historical_indicators: List[TechnicalIndicators]) -> Optional[Tuple[float, ...]]:
+        """
+        Read the EMA values the trend checks compare.
+        
+        Args:
+            historical_indicators: Indicators (most recent last); only the
+                ``ema5``/``ema8``/``ema21`` of the last two entries are read
+            
+        Returns:
+            ``(ema5, ema5_prev, ema8, ema8_prev, ema21, ema21_prev)``, or None
+            when fewer than two entries are available
+        """
+        if len(historical_indicators) < 2:
+            logger.warning("Insufficient historical data for EMA trend check")
+            return None
+        
+        current = historical_indicators[-1]
+        previous = historical_indicators[-2]
+        return (current.ema5, previous.ema5, current.ema8, previous.ema8,
+                current.ema21, previous.ema21)
     
-    def _check_rising_emas(self, historical_indicators: List[TechnicalIndicators], 
-                          settings: AlgorithmSettings) -> bool:
+    def _check_rising_emas(self, ema5_curr: float, ema5_prev: float,
+                           ema8_curr: float, ema8_prev: float,
+                           ema21_curr: float, ema21_prev: float,
+                           settings: Union[AlgorithmSettings, _SettingsCache]) -> bool:
         """
         Check if EMAs are rising based on configurable thresholds.
         
         Args:
-            historical_indicators: List of indicators (most recent last)
+            ema5_curr, ema5_prev: Current and previous EMA5
+            ema8_curr, ema8_prev: Current and previous EMA8
+            ema21_curr, ema21_prev: Current and previous EMA21
             settings: Algorithm settings with thresholds
             
         Returns:
             True if EMAs are rising above thresholds
         """
-        try:
-            if len(historical_indicators) < 2:
-                logger.warning("Insufficient historical data for EMA rising check")
-                return False
-            
-            current = historical_indicators[-1]
-            previous = historical_indicators[-2]
-            
-            # Calculate percentage changes
-            ema5_change = (current.ema5 - previous.ema5) / previous.ema5
-            ema8_change = (current.ema8 - previous.ema8) / previous.ema8
-            ema21_change = (current.ema21 - previous.ema21) / previous.ema21
-            
-            # Check if changes exceed thresholds
-            ema5_rising = ema5_change >= settings.ema5_rising_threshold
-            ema8_rising = ema8_change >= settings.ema8_rising_threshold
-            ema21_rising = ema21_change >= settings.ema21_rising_threshold
-            
-            return ema5_rising and ema8_rising and ema21_rising
-            
-        except Exception as e:
-            logger.error(f"Error checking rising EMAs: {str(e)}")
+        # Percentage changes are undefined from a zero EMA
+        if not (ema5_prev and ema8_prev and ema21_prev):
             return False
+        
+        derived = _SettingsCache.of(settings)
+        return _rising_emas(
+            ema5_curr, ema5_prev,
+            ema8_curr, ema8_prev,
+            ema21_curr, ema21_prev,
+            derived.t5, derived.t8, derived.t21
+        )
     
-    def _check_falling_emas(self, historical_indicators: List[TechnicalIndicators], 
-                           settings: AlgorithmSettings) -> bool:
+    def _check_falling_emas(self, ema5_curr: float, ema5_prev: float,
+                            ema8_curr: float, ema8_prev: float,
+                            ema21_curr: float, ema21_prev: float,
+                            settings: Union[AlgorithmSettings, _SettingsCache]) -> bool:
         """
         Check if EMAs are falling based on configurable thresholds.
         
         Args:
-            historical_indicators: List of indicators (most recent last)
+            ema5_curr, ema5_prev: Current and previous EMA5
+            ema8_curr, ema8_prev: Current and previous EMA8
+            ema21_curr, ema21_prev: Current and previous EMA21
             settings: Algorithm settings with thresholds
             
         Returns:
             True if EMAs are falling below negative thresholds
         """
-        try:
-            if len(historical_indicators) < 2:
-                logger.warning("Insufficient historical data for EMA falling check")
-                return False
-            
-            current = historical_indicators[-1]
-            previous = historical_indicators[-2]
-            
-            # Calculate percentage changes
-            ema5_change = (current.ema5 - previous.ema5) / previous.ema5
-            ema8_change = (current.ema8 - previous.ema8) / previous.ema8
-            ema21_change = (current.ema21 - previous.ema21) / previous.ema21
-            
-            # Check if changes are below negative thresholds
-            ema5_falling = ema5_change <= -settings.ema5_rising_threshold
-            ema8_falling = ema8_change <= -settings.ema8_rising_threshold
-            ema21_falling = ema21_change <= -settings.ema21_rising_threshold
-            
-            return ema5_falling and ema8_falling and ema21_falling
-            
-        except Exception as e:
-            logger.error(f"Error checking falling EMAs: {str(e)}")
+        # Percentage changes are undefined from a zero EMA
+        if not (ema5_prev and ema8_prev and ema21_prev):
             return False
+        
+        derived = _SettingsCache.of(settings)
+        return _falling_emas(
+            ema5_curr, ema5_prev,
+            ema8_curr, ema8_prev,
+            ema21_curr, ema21_prev,
+            derived.neg_t5, derived.neg_t8, derived.neg_t21
+        )
     
     def _check_fomo_filter(self, market_data: MarketData, indicators: TechnicalIndicators, 
-                          settings: AlgorithmSettings) -> bool:
+                          settings: Union[AlgorithmSettings, _SettingsCache]) -> bool:
         """
         Check FOMO filter condition.
         
@@ -184,24 +462,13 @@ class AlgorithmEngine:
         Returns:
             True if FOMO filter passes (no FOMO condition detected)
         """
-        try:
-            # FOMO filter: check if price is not too far from EMAs
-            # Using ATR as a measure of acceptable distance
-            max_distance = indicators.atr * settings.fomo_filter
-            
-            # Check distance from key EMAs
-            distance_from_ema8 = abs(market_data.close - indicators.ema8)
-            distance_from_ema21 = abs(market_data.close - indicators.ema21)
-            
-            # Pass filter if distances are within acceptable range
-            return distance_from_ema8 <= max_distance and distance_from_ema21 <= max_distance
-            
-        except Exception as e:
-            logger.error(f"Error checking FOMO filter: {str(e)}")
-            return False
+        # FOMO filter: price must not be too far from EMAs, using ATR as
+        # the measure of acceptable distance
+        return _fomo(market_data.close, indicators.ema8, indicators.ema21,
+                     indicators.atr, _SettingsCache.of(settings).fomo_mult)
     
     def _check_volatility_filter(self, indicators: TechnicalIndicators, 
-                                settings: AlgorithmSettings) -> bool:
+                                settings: Union[AlgorithmSettings, _SettingsCache]) -> bool:
         """
         Check volatility filter condition.
         
@@ -212,16 +479,9 @@ class AlgorithmEngine:
         Returns:
             True if volatility is acceptable
         """
-        try:
-            # Simple volatility check using ATR
-            # ATR should be above a minimum threshold (e.g., 1.0 for reasonable volatility)
-            min_atr_threshold = 1.0 / settings.volatility_filter
-            return indicators.atr >= min_atr_threshold
-            
-        except Exception as e:
-            logger.error(f"Error checking volatility filter: {str(e)}")
-            return False   
- 
+        # ATR should be above a minimum threshold of 1 / volatility_filter
+        return _vol(indicators.atr, _SettingsCache.of(settings).inv_vol_filter)
+    
     def _check_higher_timeframe_confirmation_long(self, htf_market_data: MarketData, 
                                                  htf_indicators: TechnicalIndicators) -> bool:
         """
@@ -234,16 +494,8 @@ class AlgorithmEngine:
         Returns:
             True if higher timeframe confirms long signal
         """
-        try:
-            # HTF confirmation: HTF EMA5 > HTF EMA8, close > open (bullish candle)
-            ema5_above_ema8 = htf_indicators.ema5 > htf_indicators.ema8
-            bullish_candle = htf_market_data.close > htf_market_data.open
-            
-            return ema5_above_ema8 and bullish_candle
-            
-        except Exception as e:
-            logger.error(f"Error checking HTF confirmation for long: {str(e)}")
-            return False
+        return _htf_long(htf_indicators.ema5, htf_indicators.ema8,
+                         htf_market_data.close, htf_market_data.open)
     
     def _check_higher_timeframe_confirmation_short(self, htf_market_data: MarketData, 
                                                   htf_indicators: TechnicalIndicators) -> bool:
@@ -257,95 +509,179 @@ class AlgorithmEngine:
         Returns:
             True if higher timeframe confirms short signal
         """
-        try:
-            # HTF confirmation: HTF EMA5 < HTF EMA8, close < open (bearish candle)
-            ema5_below_ema8 = htf_indicators.ema5 < htf_indicators.ema8
-            bearish_candle = htf_market_data.close < htf_market_data.open
-            
-            return ema5_below_ema8 and bearish_candle
-            
-        except Exception as e:
-            logger.error(f"Error checking HTF confirmation for short: {str(e)}")
-            return False
+        return _htf_short(htf_indicators.ema5, htf_indicators.ema8,
+                          htf_market_data.close, htf_market_data.open)
+    
+    def _store_analysis(self, signal_type: str, mask: int, has_htf: bool) -> None:
+        """Record the last evaluation; the dictionary is built by ``get_last_analysis``."""
+        self._pending_analysis = (signal_type, mask, has_htf)
+        self._last_analysis = None
+    
+    def _evaluate_long_no_htf(self, market_data: MarketData, indicators: TechnicalIndicators,
+                              trend_emas: Optional[Tuple[float, ...]],
+                              settings: _SettingsCache, fomo_ok: Optional[bool],
+                              vol_ok: Optional[bool]) -> Optional[int]:
+        """
+        Build the long condition mask when no HTF data is available.
+        
+        Returns:
+            Bitmask of the five met conditions, or None when diagnostics are
+            off and a check fails
+        """
+        if not self._diagnostics_enabled:
+            # Cheapest checks first, stopping at the first failure
+            if (
+                self._check_polar_formation_long(market_data, indicators)
+                and self._check_ema_positioning_long(indicators)
+                and (vol_ok if vol_ok is not None
+                     else self._check_volatility_filter(indicators, settings))
+                and trend_emas is not None
+                and self._check_rising_emas(*trend_emas, settings)
+                and (fomo_ok if fomo_ok is not None
+                     else self._check_fomo_filter(market_data, indicators, settings))
+            ):
+                return _NO_HTF_FULL_MASK
+            return None
+        
+        if fomo_ok is None:
+            fomo_ok = self._check_fomo_filter(market_data, indicators, settings)
+        if vol_ok is None:
+            vol_ok = self._check_volatility_filter(indicators, settings)
+        return (
+            self._check_polar_formation_long(market_data, indicators)
+            | self._check_ema_positioning_long(indicators) << 1
+            | (trend_emas is not None and self._check_rising_emas(*trend_emas, settings)) << 2
+            | fomo_ok << 3
+            | vol_ok << 4
+        )
+    
+    def _evaluate_long_with_htf(self, market_data: MarketData, indicators: TechnicalIndicators,
+                                trend_emas: Optional[Tuple[float, ...]],
+                                htf_market_data: MarketData, htf_indicators: TechnicalIndicators,
+                                settings: _SettingsCache, fomo_ok: Optional[bool],
+                                vol_ok: Optional[bool]) -> Optional[int]:
+        """
+        Build the long condition mask including HTF confirmation.
+        
+        Returns:
+            Bitmask of the six met conditions, or None when diagnostics are
+            off and a check fails
+        """
+        mask = self._evaluate_long_no_htf(market_data, indicators, trend_emas,
+                                          settings, fomo_ok, vol_ok)
+        if mask is None:
+            return None
+        htf_ok = self._check_higher_timeframe_confirmation_long(htf_market_data, htf_indicators)
+        if not (htf_ok or self._diagnostics_enabled):
+            return None
+        return mask | htf_ok << _HTF_BIT
+    
+    def _evaluate_short_no_htf(self, market_data: MarketData, indicators: TechnicalIndicators,
+                               trend_emas: Optional[Tuple[float, ...]],
+                               settings: _SettingsCache, fomo_ok: Optional[bool],
+                               vol_ok: Optional[bool]) -> Optional[int]:
+        """
+        Build the short condition mask when no HTF data is available.
+        
+        Returns:
+            Bitmask of the five met conditions, or None when diagnostics are
+            off and a check fails
+        """
+        if not self._diagnostics_enabled:
+            # Cheapest checks first, stopping at the first failure
+            if (
+                self._check_polar_formation_short(market_data, indicators)
+                and self._check_ema_positioning_short(indicators)
+                and (vol_ok if vol_ok is not None
+                     else self._check_volatility_filter(indicators, settings))
+                and trend_emas is not None
+                and self._check_falling_emas(*trend_emas, settings)
+                and (fomo_ok if fomo_ok is not None
+                     else self._check_fomo_filter(market_data, indicators, settings))
+            ):
+                return _NO_HTF_FULL_MASK
+            return None
+        
+        if fomo_ok is None:
+            fomo_ok = self._check_fomo_filter(market_data, indicators, settings)
+        if vol_ok is None:
+            vol_ok = self._check_volatility_filter(indicators, settings)
+        return (
+            self._check_polar_formation_short(market_data, indicators)
+            | self._check_ema_positioning_short(indicators) << 1
+            | (trend_emas is not None and self._check_falling_emas(*trend_emas, settings)) << 2
+            | fomo_ok << 3
+            | vol_ok << 4
+        )
+    
+    def _evaluate_short_with_htf(self, market_data: MarketData, indicators: TechnicalIndicators,
+                                 trend_emas: Optional[Tuple[float, ...]],
+                                 htf_market_data: MarketData, htf_indicators: TechnicalIndicators,
+                                 settings: _SettingsCache, fomo_ok: Optional[bool],
+                                 vol_ok: Optional[bool]) -> Optional[int]:
+        """
+        Build the short condition mask including HTF confirmation.
+        
+        Returns:
+            Bitmask of the six met conditions, or None when diagnostics are
+            off and a check fails
+        """
+        mask = self._evaluate_short_no_htf(market_data, indicators, trend_emas,
+                                           settings, fomo_ok, vol_ok)
+        if mask is None:
+            return None
+        htf_ok = self._check_higher_timeframe_confirmation_short(htf_market_data, htf_indicators)
+        if not (htf_ok or self._diagnostics_enabled):
+            return None
+        return mask | htf_ok << _HTF_BIT
     
     def evaluate_long_conditions(self, market_data: MarketData, indicators: TechnicalIndicators,
                                historical_indicators: List[TechnicalIndicators],
                                htf_market_data: Optional[MarketData],
                                htf_indicators: Optional[TechnicalIndicators],
-                               settings: AlgorithmSettings) -> Tuple[bool, float]:
+                               settings: Union[AlgorithmSettings, _SettingsCache],
+                               fomo_ok: Optional[bool] = None,
+                               vol_ok: Optional[bool] = None) -> Tuple[bool, float]:
         """
         Evaluate all long signal conditions.
         
         Args:
             market_data: Current market data
             indicators: Current technical indicators
-            historical_indicators: Historical indicators for trend analysis
+            historical_indicators: Recent indicators (most recent last); the trend
+                check reads the EMAs of the last two
             htf_market_data: Higher timeframe market data (optional)
             htf_indicators: Higher timeframe indicators (optional)
             settings: Algorithm settings
+            fomo_ok: Precomputed FOMO filter result (computed if None)
+            vol_ok: Precomputed volatility filter result (computed if None)
             
         Returns:
             Tuple of (signal_valid, confidence_score)
         """
         try:
-            conditions_met = 0
-            total_conditions = 5  # Will be 6 if HTF data is available
-            rejection_reasons = []
-            partial_criteria = []
-            
-            # Check polar formation
-            if self._check_polar_formation_long(market_data, indicators):
-                conditions_met += 1
-                partial_criteria.append("Bullish polar formation")
-                logger.debug(f"Long polar formation check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("Failed bullish polar formation")
-            
-            # Check EMA positioning
-            if self._check_ema_positioning_long(indicators):
-                conditions_met += 1
-                partial_criteria.append("EMA5 below ATR long line")
-                logger.debug(f"Long EMA positioning check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("EMA5 not below ATR long line")
-            
-            # Check rising EMAs
-            if self._check_rising_emas(historical_indicators, settings):
-                conditions_met += 1
-                partial_criteria.append("Rising EMAs")
-                logger.debug(f"Rising EMAs check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("EMAs not rising sufficiently")
-            
-            # Check FOMO filter
-            if self._check_fomo_filter(market_data, indicators, settings):
-                conditions_met += 1
-                partial_criteria.append("FOMO filter passed")
-                logger.debug(f"FOMO filter check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("Failed FOMO filter (price too extended)")
-            
-            # Check volatility filter
-            if self._check_volatility_filter(indicators, settings):
-                conditions_met += 1
-                partial_criteria.append("Volatility filter passed")
-                logger.debug(f"Volatility filter check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("Failed volatility filter")
-            
-            # Check higher timeframe confirmation if available
-            htf_confirmed = True
+            settings = _SettingsCache.of(settings)
+            trend_emas = self._trend_emas(historical_indicators)
+            # Pick the HTF or no-HTF variant once instead of testing per check
             if htf_market_data and htf_indicators:
-                total_conditions = 6
-                if self._check_higher_timeframe_confirmation_long(htf_market_data, htf_indicators):
-                    conditions_met += 1
-                    partial_criteria.append("HTF confirmation")
-                    logger.debug(f"HTF confirmation check passed for {market_data.symbol}")
-                else:
-                    htf_confirmed = False
-                    rejection_reasons.append("Failed HTF confirmation")
+                has_htf = True
+                mask = self._evaluate_long_with_htf(
+                    market_data, indicators, trend_emas,
+                    htf_market_data, htf_indicators, settings, fomo_ok, vol_ok
+                )
             else:
-                rejection_reasons.append("No HTF data available")
+                has_htf = False
+                mask = self._evaluate_long_no_htf(
+                    market_data, indicators, trend_emas,
+                    settings, fomo_ok, vol_ok
+                )
+            if mask is None:
+                self._pending_analysis = None
+                self._last_analysis = None
+                return False, 0.0
+            
+            total_conditions = 6 if has_htf else 5
+            conditions_met = mask.bit_count()
             
             # Calculate confidence score
             confidence = conditions_met / total_conditions
@@ -354,23 +690,21 @@ class AlgorithmEngine:
             signal_valid = conditions_met == total_conditions
             
             # Store analysis for diagnostics
-            self._last_analysis = {
-                'signal_type': 'long',
-                'conditions_met': conditions_met,
-                'total_conditions': total_conditions,
-                'rejection_reasons': rejection_reasons,
-                'partial_criteria': partial_criteria,
-                'confidence': confidence,
-                'signal_valid': signal_valid
-            }
+            self._store_analysis('long', mask, has_htf)
+            if logger.isEnabledFor(logging.DEBUG):
+                passed = _MASK_TO_LABELS['long'][has_htf, mask][0]
+                logger.debug("Long checks passed for %s: %s", market_data.symbol,
+                             ", ".join(passed) or "none")
             
             if signal_valid:
-                logger.info(f"Long signal generated for {market_data.symbol} with confidence {confidence:.2f}")
+                logger.info("Long signal generated for %s with confidence %.2f",
+                            market_data.symbol, confidence)
             
             return signal_valid, confidence
             
-        except Exception as e:
+        except (AttributeError, ZeroDivisionError, TypeError) as e:
             logger.error(f"Error evaluating long conditions for {market_data.symbol}: {str(e)}")
+            self._pending_analysis = None
             self._last_analysis = {
                 'signal_type': 'long',
                 'error': str(e),
@@ -385,78 +719,49 @@ class AlgorithmEngine:
                                 historical_indicators: List[TechnicalIndicators],
                                 htf_market_data: Optional[MarketData],
                                 htf_indicators: Optional[TechnicalIndicators],
-                                settings: AlgorithmSettings) -> Tuple[bool, float]:
+                                settings: Union[AlgorithmSettings, _SettingsCache],
+                                fomo_ok: Optional[bool] = None,
+                                vol_ok: Optional[bool] = None) -> Tuple[bool, float]:
         """
         Evaluate all short signal conditions.
         
         Args:
             market_data: Current market data
             indicators: Current technical indicators
-            historical_indicators: Historical indicators for trend analysis
+            historical_indicators: Recent indicators (most recent last); the trend
+                check reads the EMAs of the last two
             htf_market_data: Higher timeframe market data (optional)
             htf_indicators: Higher timeframe indicators (optional)
             settings: Algorithm settings
+            fomo_ok: Precomputed FOMO filter result (computed if None)
+            vol_ok: Precomputed volatility filter result (computed if None)
             
         Returns:
             Tuple of (signal_valid, confidence_score)
         """
         try:
-            conditions_met = 0
-            total_conditions = 5  # Will be 6 if HTF data is available
-            rejection_reasons = []
-            partial_criteria = []
-            
-            # Check polar formation
-            if self._check_polar_formation_short(market_data, indicators):
-                conditions_met += 1
-                partial_criteria.append("Bearish polar formation")
-                logger.debug(f"Short polar formation check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("Failed bearish polar formation")
-            
-            # Check EMA positioning
-            if self._check_ema_positioning_short(indicators):
-                conditions_met += 1
-                partial_criteria.append("EMA5 above ATR short line")
-                logger.debug(f"Short EMA positioning check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("EMA5 not above ATR short line")
-            
-            # Check falling EMAs
-            if self._check_falling_emas(historical_indicators, settings):
-                conditions_met += 1
-                partial_criteria.append("Falling EMAs")
-                logger.debug(f"Falling EMAs check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("EMAs not falling sufficiently")
-            
-            # Check FOMO filter
-            if self._check_fomo_filter(market_data, indicators, settings):
-                conditions_met += 1
-                partial_criteria.append("FOMO filter passed")
-                logger.debug(f"FOMO filter check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("Failed FOMO filter (price too extended)")
-            
-            # Check volatility filter
-            if self._check_volatility_filter(indicators, settings):
-                conditions_met += 1
-                partial_criteria.append("Volatility filter passed")
-                logger.debug(f"Volatility filter check passed for {market_data.symbol}")
-            else:
-                rejection_reasons.append("Failed volatility filter")
-            
-            # Check higher timeframe confirmation if available
+            settings = _SettingsCache.of(settings)
+            trend_emas = self._trend_emas(historical_indicators)
+            # Pick the HTF or no-HTF variant once instead of testing per check
             if htf_market_data and htf_indicators:
-                total_conditions = 6
-                if self._check_higher_timeframe_confirmation_short(htf_market_data, htf_indicators):
-                    conditions_met += 1
-                    partial_criteria.append("HTF confirmation")
-                    logger.debug(f"HTF confirmation check passed for {market_data.symbol}")
-                else:
-                    rejection_reasons.append("Failed HTF confirmation")
+                has_htf = True
+                mask = self._evaluate_short_with_htf(
+                    market_data, indicators, trend_emas,
+                    htf_market_data, htf_indicators, settings, fomo_ok, vol_ok
+                )
             else:
-                rejection_reasons.append("No HTF data available")
+                has_htf = False
+                mask = self._evaluate_short_no_htf(
+                    market_data, indicators, trend_emas,
+                    settings, fomo_ok, vol_ok
+                )
+            if mask is None:
+                self._pending_analysis = None
+                self._last_analysis = None
+                return False, 0.0
+            
+            total_conditions = 6 if has_htf else 5
+            conditions_met = mask.bit_count()
             
             # Calculate confidence score
             confidence = conditions_met / total_conditions
@@ -465,23 +770,21 @@ class AlgorithmEngine:
             signal_valid = conditions_met == total_conditions
             
             # Store analysis for diagnostics
-            self._last_analysis = {
-                'signal_type': 'short',
-                'conditions_met': conditions_met,
-                'total_conditions': total_conditions,
-                'rejection_reasons': rejection_reasons,
-                'partial_criteria': partial_criteria,
-                'confidence': confidence,
-                'signal_valid': signal_valid
-            }
+            self._store_analysis('short', mask, has_htf)
+            if logger.isEnabledFor(logging.DEBUG):
+                passed = _MASK_TO_LABELS['short'][has_htf, mask][0]
+                logger.debug("Short checks passed for %s: %s", market_data.symbol,
+                             ", ".join(passed) or "none")
             
             if signal_valid:
-                logger.info(f"Short signal generated for {market_data.symbol} with confidence {confidence:.2f}")
+                logger.info("Short signal generated for %s with confidence %.2f",
+                            market_data.symbol, confidence)
             
             return signal_valid, confidence
             
-        except Exception as e:
+        except (AttributeError, ZeroDivisionError, TypeError) as e:
             logger.error(f"Error evaluating short conditions for {market_data.symbol}: {str(e)}")
+            self._pending_analysis = None
             self._last_analysis = {
                 'signal_type': 'short',
                 'error': str(e),
@@ -492,6 +795,193 @@ class AlgorithmEngine:
             }
             return False, 0.0
     
+    @staticmethod
+    def _trend_mask(current: np.ndarray, previous: np.ndarray,
+                    threshold: float, rising: bool) -> np.ndarray:
+        """Elementwise rising/falling EMA check; a zero or NaN previous value fails."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (current - previous) / previous
+        passed = change >= threshold if rising else change <= -threshold
+        return passed & (previous != 0)
+    
+    def _condition_counts(self, signal_type: str, arrays: Tuple[np.ndarray, ...],
+                          derived: _SettingsCache) -> np.ndarray:
+        """Count the met conditions, excluding HTF, for every bar."""
+        if _aot_kernels is not None:
+            name = f"{signal_type}_condition_counts"
+            if arrays[0].dtype == np.float32:
+                name += "_f32"
+            return getattr(_aot_kernels, name)(*arrays, derived.fomo_mult, derived.inv_vol_filter,
+                                               derived.t5, derived.t8, derived.t21)
+        
+        close, open_, ema5, ema8, ema21, atr, atr_line, ema5_prev, ema8_prev, ema21_prev = arrays
+        rising = signal_type == 'long'
+        if rising:
+            polar = (close > open_) & (close > ema8) & (close > ema21)
+            positioning = ema5 < atr_line
+        else:
+            polar = (close < open_) & (close < ema8) & (close < ema21)
+            positioning = ema5 > atr_line
+        max_distance = atr * derived.fomo_mult
+        conditions = (
+            polar,
+            positioning,
+            self._trend_mask(ema5, ema5_prev, derived.t5, rising)
+            & self._trend_mask(ema8, ema8_prev, derived.t8, rising)
+            & self._trend_mask(ema21, ema21_prev, derived.t21, rising),
+            (np.abs(close - ema8) <= max_distance) & (np.abs(close - ema21) <= max_distance),
+            atr >= derived.inv_vol_filter,
+        )
+        return np.sum(conditions, axis=0, dtype=np.int8)
+    
+    def _evaluate_series(self, signal_type: str, arrays: Tuple[np.ndarray, ...],
+                         settings: Union[AlgorithmSettings, _SettingsCache],
+                         htf_arrays: Tuple[Optional[np.ndarray], ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Shared body of ``evaluate_long_series``/``evaluate_short_series``."""
+        # Stay in float32 only when every input already is
+        dtype = np.float32 if all(getattr(a, 'dtype', None) == np.float32 for a in arrays) else np.float64
+        arrays = tuple(np.ascontiguousarray(a, dtype=dtype) for a in arrays)
+        counts = self._condition_counts(signal_type, arrays, _SettingsCache.of(settings))
+        total_conditions = 5
+        
+        if all(a is not None for a in htf_arrays):
+            htf_close, htf_open, htf_ema5, htf_ema8 = (np.asarray(a, dtype=np.float64) for a in htf_arrays)
+            if signal_type == 'long':
+                htf_ok = (htf_ema5 > htf_ema8) & (htf_close > htf_open)
+            else:
+                htf_ok = (htf_ema5 < htf_ema8) & (htf_close < htf_open)
+            counts = counts + htf_ok
+            total_conditions = 6
+        
+        return counts == total_conditions, counts / total_conditions
+    
+    def evaluate_long_series(self, close: np.ndarray, open_: np.ndarray,
+                             ema5: np.ndarray, ema8: np.ndarray, ema21: np.ndarray,
+                             atr: np.ndarray, atr_long_line: np.ndarray,
+                             ema5_prev: np.ndarray, ema8_prev: np.ndarray, ema21_prev: np.ndarray,
+                             settings: Union[AlgorithmSettings, _SettingsCache],
+                             htf_close: Optional[np.ndarray] = None,
+                             htf_open: Optional[np.ndarray] = None,
+                             htf_ema5: Optional[np.ndarray] = None,
+                             htf_ema8: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the long conditions for many bars at once.
+        
+        Every argument is an aligned array with one element per bar; the
+        ``*_prev`` arrays hold the previous bar's EMAs. HTF confirmation is a
+        sixth condition when all four ``htf_*`` arrays are given. Results
+        match ``evaluate_long_conditions`` bar by bar, without the diagnostics.
+        Uses the ahead-of-time compiled kernels when they are built. If all
+        arrays are float32 (see ``calculate_all_indicators_series``) they
+        are evaluated in float32; anything else is converted to float64.
+        
+        Returns:
+            Tuple of (signal_valid bool array, confidence float array)
+        """
+        return self._evaluate_series(
+            'long',
+            (close, open_, ema5, ema8, ema21, atr, atr_long_line, ema5_prev, ema8_prev, ema21_prev),
+            settings, (htf_close, htf_open, htf_ema5, htf_ema8)
+        )
+    
+    def evaluate_short_series(self, close: np.ndarray, open_: np.ndarray,
+                              ema5: np.ndarray, ema8: np.ndarray, ema21: np.ndarray,
+                              atr: np.ndarray, atr_short_line: np.ndarray,
+                              ema5_prev: np.ndarray, ema8_prev: np.ndarray, ema21_prev: np.ndarray,
+                              settings: Union[AlgorithmSettings, _SettingsCache],
+                              htf_close: Optional[np.ndarray] = None,
+                              htf_open: Optional[np.ndarray] = None,
+                              htf_ema5: Optional[np.ndarray] = None,
+                              htf_ema8: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the short conditions for many bars at once.
+        
+        Mirrors ``evaluate_long_series`` with the bearish checks.
+        
+        Returns:
+            Tuple of (signal_valid bool array, confidence float array)
+        """
+        return self._evaluate_series(
+            'short',
+            (close, open_, ema5, ema8, ema21, atr, atr_short_line, ema5_prev, ema8_prev, ema21_prev),
+            settings, (htf_close, htf_open, htf_ema5, htf_ema8)
+        )
+    
+    def generate_signals_batch(self, data: List[MarketData],
+                               settings: AlgorithmSettings = None) -> SignalArray:
+        """
+        Generate signals for every bar of a history at once, without HTF confirmation.
+        
+        Bar ``i`` gets the signals ``generate_signals(data[i], data[:i])``
+        returns without HTF data. Indicators are computed in one pass and the
+        conditions evaluated with the vectorized series path, so no per-bar
+        objects are created and no diagnostics are recorded.
+        
+        Args:
+            data: Market data for one symbol, oldest first
+            settings: Algorithm settings (uses defaults if None)
+            
+        Returns:
+            SignalArray with the valid signals in bar order
+        """
+        if settings is None:
+            settings = AlgorithmSettings()
+        
+        symbol = data[0].symbol if data else ""
+        n = len(data)
+        start = self._min_points  # First bar with enough history for the trend check
+        if n <= start:
+            return SignalArray.empty(symbol)
+        
+        buffer = MarketDataBuffer(n)
+        buffer.sync(data)
+        opens, highs, lows, closes = (buffer.opens[:n], buffer.highs[:n],
+                                      buffer.lows[:n], buffer.closes[:n])
+        try:
+            series = self.indicator_engine.calculate_all_indicators_series(
+                highs, lows, closes, settings.atr_multiplier
+            )
+        except (InsufficientDataError, IndicatorCalculationError) as e:
+            logger.warning(f"Cannot generate signals for {symbol}: {str(e)}")
+            return SignalArray.empty(symbol)
+        
+        derived = _SettingsCache.of(settings)
+        bars = slice(start, None)
+        common = (closes[bars], opens[bars], series['ema5'][bars], series['ema8'][bars],
+                  series['ema21'][bars], series['atr'][bars])
+        previous = tuple(series[name][start - 1:-1] for name in ('ema5', 'ema8', 'ema21'))
+        long_valid, long_confidence = self.evaluate_long_series(
+            *common, series['atr_long_line'][bars], *previous, derived
+        )
+        short_valid, short_confidence = self.evaluate_short_series(
+            *common, series['atr_short_line'][bars], *previous, derived
+        )
+        
+        # generate_signals rejects bars without a positive close
+        usable = closes[bars] > 0
+        long_rows = np.flatnonzero(long_valid & usable)
+        short_rows = np.flatnonzero(short_valid & usable)
+        rows = np.concatenate((long_rows, short_rows)) + start
+        types = np.concatenate((
+            np.full(len(long_rows), SignalArray.LONG, dtype=np.int8),
+            np.full(len(short_rows), SignalArray.SHORT, dtype=np.int8),
+        ))
+        confidences = np.concatenate((long_confidence[long_rows], short_confidence[short_rows]))
+        order = np.argsort(rows, kind='stable')
+        rows = rows[order]
+        
+        timestamps = pd.DatetimeIndex([data[i].timestamp for i in rows])
+        return SignalArray(
+            symbol=symbol,
+            bar_indices=rows,
+            timestamps=timestamps.asi8,
+            prices=closes[rows],
+            confidences=confidences[order],
+            types=types[order],
+            indicators={name: column[rows] for name, column in series.items()},
+            tz=timestamps.tz
+        )
+    
     def generate_signals(self, market_data: MarketData, 
                         historical_data: List[MarketData],
                         htf_market_data: Optional[MarketData] = None,
@@ -510,55 +1000,93 @@ class AlgorithmEngine:
         Returns:
             List of generated signals
         """
+        return self._generate_signals(market_data, historical_data, len(historical_data),
+                                      htf_market_data, htf_historical_data,
+                                      len(htf_historical_data) if htf_historical_data else 0,
+                                      settings)
+    
+    def generate_signals_indexed(self, data: Sequence[MarketData], index: int,
+                                 htf_data: Optional[Sequence[MarketData]] = None,
+                                 htf_index: int = -1, htf_end: Optional[int] = None,
+                                 settings: AlgorithmSettings = None) -> List[Signal]:
+        """
+        Generate trading signals for ``data[index]`` with ``data[:index]`` as history.
+        
+        Equivalent to ``generate_signals(data[index], data[:index],
+        htf_data[htf_index], htf_data[:htf_end], ...)`` without copying
+        either history, so stepping the indices through a series costs O(1)
+        per bar while the incremental indicator states apply.
+        
+        Args:
+            data: Market data for one symbol, oldest first
+            index: Position of the current bar in ``data``
+            htf_data: Higher timeframe market data, oldest first (optional)
+            htf_index: Position of the current HTF bar; negative for none
+            htf_end: Length of the HTF history (defaults to ``htf_index``)
+            settings: Algorithm settings (uses defaults if None)
+            
+        Returns:
+            List of generated signals
+        """
+        htf_market_data = None
+        if htf_data is not None and htf_index >= 0:
+            htf_market_data = htf_data[htf_index]
+            if htf_end is None:
+                htf_end = htf_index
+        return self._generate_signals(data[index], data, index,
+                                      htf_market_data, htf_data, htf_end or 0, settings)
+    
+    def _generate_signals(self, market_data: MarketData, historical_data: Sequence[MarketData],
+                          count: int, htf_market_data: Optional[MarketData],
+                          htf_historical_data: Optional[Sequence[MarketData]], htf_count: int,
+                          settings: Optional[AlgorithmSettings]) -> List[Signal]:
+        """
+        Shared body of the signal generators; the history is
+        ``historical_data[:count]`` and the HTF history ``htf_historical_data[:htf_count]``.
+        """
         if settings is None:
             settings = AlgorithmSettings()
         
         signals = []
         
         try:
-            # Prepare price data for indicator calculation
-            all_data = historical_data + [market_data]
-            high_prices = [d.high for d in all_data]
-            low_prices = [d.low for d in all_data]
-            close_prices = [d.close for d in all_data]
-            
-            # Calculate current indicators
-            indicators = self.indicator_engine.calculate_all_indicators(
-                high_prices, low_prices, close_prices, settings.atr_multiplier
+            indicator_engine = self.indicator_engine
+            atr_multiplier = settings.atr_multiplier
+            previous_state, current_state = self._indicator_states(
+                market_data, historical_data, atr_multiplier, count
             )
+            indicators = indicator_engine.indicators_from_state(current_state, atr_multiplier)
             
-            # Calculate historical indicators for trend analysis
-            historical_indicators = []
-            for i in range(len(historical_data)):
-                hist_high = [d.high for d in historical_data[:i+1]]
-                hist_low = [d.low for d in historical_data[:i+1]]
-                hist_close = [d.close for d in historical_data[:i+1]]
-                
-                if len(hist_close) >= 50:  # Minimum data for all indicators
-                    hist_indicators = self.indicator_engine.calculate_all_indicators(
-                        hist_high, hist_low, hist_close, settings.atr_multiplier
-                    )
-                    historical_indicators.append(hist_indicators)
-            
-            # Add current indicators
-            historical_indicators.append(indicators)
+            # Trend analysis only compares the current bar with the previous one,
+            # which needs enough history of its own for all indicators
+            if count >= self._min_points:
+                # Only its EMAs are read, so the raw state stands in for a full snapshot
+                historical_indicators = [previous_state, indicators]
+            else:
+                historical_indicators = [indicators]
             
             # Calculate HTF indicators if data is available
             htf_indicators = None
-            if htf_market_data and htf_historical_data:
-                htf_all_data = htf_historical_data + [htf_market_data]
-                htf_high_prices = [d.high for d in htf_all_data]
-                htf_low_prices = [d.low for d in htf_all_data]
-                htf_close_prices = [d.close for d in htf_all_data]
-                
-                htf_indicators = self.indicator_engine.calculate_all_indicators(
-                    htf_high_prices, htf_low_prices, htf_close_prices, settings.atr_multiplier
+            if htf_market_data and htf_count:
+                _, htf_state = self._indicator_states(
+                    htf_market_data, htf_historical_data, atr_multiplier, htf_count, htf=True
                 )
+                htf_indicators = indicator_engine.indicators_from_state(htf_state, atr_multiplier)
+            
+            # Settings-derived constants and the direction-agnostic filters
+            # are shared by both directions. Without diagnostics the filters
+            # are left to the short-circuiting evaluators, which rarely reach them.
+            derived = _SettingsCache.of(settings)
+            fomo_ok = vol_ok = None
+            if self._diagnostics_enabled:
+                fomo_ok = self._check_fomo_filter(market_data, indicators, derived)
+                vol_ok = self._check_volatility_filter(indicators, derived)
             
             # Evaluate long conditions
             long_valid, long_confidence = self.evaluate_long_conditions(
                 market_data, indicators, historical_indicators,
-                htf_market_data, htf_indicators, settings
+                htf_market_data, htf_indicators, derived,
+                fomo_ok=fomo_ok, vol_ok=vol_ok
             )
             
             if long_valid:
@@ -575,7 +1103,8 @@ class AlgorithmEngine:
             # Evaluate short conditions
             short_valid, short_confidence = self.evaluate_short_conditions(
                 market_data, indicators, historical_indicators,
-                htf_market_data, htf_indicators, settings
+                htf_market_data, htf_indicators, derived,
+                fomo_ok=fomo_ok, vol_ok=vol_ok
             )
             
             if short_valid:
@@ -605,4 +1134,7 @@ class AlgorithmEngine:
         Returns:
             Dictionary with analysis details or None if no analysis available
         """
+        if self._pending_analysis is not None:
+            self._last_analysis = _decode_analysis(*self._pending_analysis)
+            self._pending_analysis = None
         return self._last_analysis
\ No newline at end of file
@@ -6,18 +6,21 @@ Implements backtesting engine with trade simulation and performance metrics calc
 import logging
 import time
 import uuid
+from collections import defaultdict
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
+import numpy as np
 
-from ..database import get_session
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import delete, desc, func, select, and_, or_
+
+from ..database import session_scope
 from ..models.database_models import BacktestResultDB, TradeDB
-from ..models.results import BacktestResult, Trade, PerformanceMetrics
+from ..models.results import BacktestResult, Trade, PerformanceMetrics, max_drawdown, sharpe_ratio
 from ..models.signals import Signal, AlgorithmSettings
 from ..models.market_data import MarketData
 from .data_service import DataService
@@ -25,6 +28,10 @@ from .algorithm_engine import AlgorithmEngine
 
 logger = logging.getLogger(__name__)
 
+# yfinance intervals spanning several days; their bars are stamped at the
+# start of the period but carry its close
+_MULTI_DAY_TIMEFRAMES = frozenset({'5d', '1wk', '1mo', '3mo'})
+
 
 @dataclass
 class BacktestFilters:
@@ -49,6 +56,16 @@ class TradeSimulation:
     commission_per_trade: float = 0.0  # Commission cost per trade
 
 
+@dataclass(slots=True)
+class _OpenPosition:
+    """Position held during trade simulation."""
+    symbol: str
+    trade_type: str  # 'long' or 'short'
+    entry_date: datetime
+    entry_price: float
+    signal_confidence: float
+
+
 class BacktestService:
     """Service for running historical backtests and performance analysis."""
     
@@ -64,7 +81,7 @@ class BacktestService:
             max_workers: Maximum number of worker threads
         """
         self.data_service = data_service or DataService()
-        self.algorithm_engine = algorithm_engine or AlgorithmEngine()
+        self.algorithm_engine = algorithm_engine or AlgorithmEngine(collect_diagnostics=False)
         self.max_workers = max_workers
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
     
@@ -103,27 +120,32 @@ class BacktestService:
                    f"from {start_date} to {end_date}")
         
         # Clean and validate symbols
-        valid_symbols = [s.strip().upper() for s in symbols if s and s.strip()]
+        # Duplicates are dropped: the engine keeps indicator state per symbol,
+        # so two concurrent runs of one symbol would share and corrupt it
+        valid_symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
         if not valid_symbols:
             raise ValueError("No valid symbols provided")
         
         all_trades = []
         
         try:
-            # Fetch historical data for all symbols
+            # Fetch historical data for all symbols, together with the higher
+            # timeframe data if needed; the two requests are independent
             logger.info("Fetching historical data...")
-            historical_data = await self.data_service.fetch_historical_data(
+            fetches = [self.data_service.fetch_historical_data(
                 valid_symbols, start_date, end_date, interval="1d"
-            )
-            
-            # Also fetch higher timeframe data if needed
-            htf_data = {}
+            )]
             if settings.higher_timeframe != "1d":
-                htf_data = await self.data_service.fetch_historical_data(
+                fetches.append(self.data_service.fetch_historical_data(
                     valid_symbols, start_date, end_date, interval=settings.higher_timeframe
-                )
+                ))
+            fetched = await asyncio.gather(*fetches)
+            historical_data = fetched[0]
+            htf_data = fetched[1] if len(fetched) > 1 else {}
             
             # Run backtest for each symbol
+            tested_symbols = []
+            tasks = []
             for symbol in valid_symbols:
                 symbol_data = historical_data.get(symbol, [])
                 symbol_htf_data = htf_data.get(symbol, [])
@@ -136,11 +158,14 @@ class BacktestService:
                     logger.warning(f"Insufficient data for {symbol}: {len(symbol_data)} points")
                     continue
                 
-                # Run backtest for this symbol
-                symbol_trades = await self._backtest_symbol(
+                # Distinct symbols use separate per-symbol engine state, so
+                # they run concurrently
+                tested_symbols.append(symbol)
+                tasks.append(self._backtest_symbol(
                     symbol, symbol_data, symbol_htf_data, settings, simulation_config
-                )
-                
+                ))
+            
+            for symbol, symbol_trades in zip(tested_symbols, await asyncio.gather(*tasks)):
                 all_trades.extend(symbol_trades)
                 logger.info(f"Generated {len(symbol_trades)} trades for {symbol}")
             
@@ -179,6 +204,28 @@ class BacktestService:
                               htf_data: List[MarketData], settings: AlgorithmSettings,
                               simulation_config: TradeSimulation) -> List[Trade]:
         """
+        Run backtest for a single symbol on the service's thread pool.
+        
+        Args:
+            symbol: Stock symbol
+            historical_data: Historical market data
+            htf_data: Higher timeframe data
+            settings: Algorithm settings
+            simulation_config: Trade simulation configuration
+            
+        Returns:
+            List of trades generated for this symbol
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._backtest_symbol_sync,
+            symbol, historical_data, htf_data, settings, simulation_config
+        )
+    
+    def _backtest_symbol_sync(self, symbol: str, historical_data: List[MarketData],
+                              htf_data: List[MarketData], settings: AlgorithmSettings,
+                              simulation_config: TradeSimulation) -> List[Trade]:
+        """
         Run backtest for a single symbol.
         
         Args:
@@ -194,57 +241,90 @@ class BacktestService:
         trades = []
         current_position = None  # Track open position
         
-        # Create HTF data lookup for faster access
-        htf_lookup = {data.timestamp.date(): data for data in htf_data} if htf_data else {}
+        # Simulation settings as plain locals for the per-bar loop; falsy
+        # thresholds disable their check
+        stop_loss = simulation_config.stop_loss_percent or None
+        take_profit = simulation_config.take_profit_percent or None
+        max_hold_days = simulation_config.max_hold_days or None
+        commission = simulation_config.commission_per_trade
+        entry_delay = timedelta(minutes=simulation_config.entry_delay_minutes)
+        
+        # Match every bar to the HTF series by date ordinal up front. A bar's
+        # HTF bar is the last one at or before its date, forward-filled when
+        # the date has none; its HTF history is the bars before its date, and
+        # ends before a forward-filled bar so that bar is not counted twice
+        start = 50  # Start after enough data for indicators
+        htf_ords = np.fromiter(
+            (data.timestamp.toordinal() for data in htf_data),
+            dtype=np.int64, count=len(htf_data)
+        )
+        bar_ords = np.fromiter(
+            (historical_data[i].timestamp.toordinal() for i in range(start, len(historical_data))),
+            dtype=np.int64, count=max(len(historical_data) - start, 0)
+        )
+        htf_indices = np.searchsorted(htf_ords, bar_ords, side='right') - 1
+        if settings.higher_timeframe in _MULTI_DAY_TIMEFRAMES:
+            # The bar covering the date closes in the future; confirm with
+            # the last completed one instead
+            htf_indices -= 1
+        htf_ends = np.minimum(
+            np.searchsorted(htf_ords, bar_ords, side='left'), np.maximum(htf_indices, 0)
+        )
+        
+        # Without HTF data or diagnostics every bar's signals come from one
+        # vectorized pass, and only the bars that signal get Signal objects
+        batch_signals = None
+        algorithm_engine = self.algorithm_engine
+        if not htf_data and not algorithm_engine.collect_diagnostics:
+            batch = algorithm_engine.generate_signals_batch(historical_data, settings)
+            batch_signals = defaultdict(list)
+            for bar_index, signal in zip(batch.bar_indices.tolist(), batch.to_signals()):
+                batch_signals[bar_index].append(signal)
         
         # Process each day in historical data
-        for i in range(50, len(historical_data)):  # Start after enough data for indicators
+        for i, htf_index, htf_end in zip(range(start, len(historical_data)),
+                                         htf_indices.tolist(), htf_ends.tolist()):
             current_data = historical_data[i]
-            historical_slice = historical_data[:i]
-            
-            # Get corresponding HTF data
-            htf_current = htf_lookup.get(current_data.timestamp.date())
-            htf_historical = [data for data in htf_data 
-                            if data.timestamp.date() < current_data.timestamp.date()] if htf_data else []
             
             try:
-                # Generate signals for current data point
-                signals = self.algorithm_engine.generate_signals(
-                    market_data=current_data,
-                    historical_data=historical_slice,
-                    htf_market_data=htf_current,
-                    htf_historical_data=htf_historical,
-                    settings=settings
-                )
+                if batch_signals is not None:
+                    signals = batch_signals.get(i, ())
+                else:
+                    # Generate signals for current data point; the engine reads
+                    # historical_data[:i] and htf_data[:htf_end] in place
+                    # instead of copied slices
+                    signals = algorithm_engine.generate_signals_indexed(
+                        historical_data, i,
+                        htf_data=htf_data, htf_index=htf_index, htf_end=htf_end,
+                        settings=settings
+                    )
                 
                 # Process signals
                 for signal in signals:
                     # Check if we should close existing position
                     if current_position:
                         should_close = self._should_close_position(
-                            current_position, signal, current_data, simulation_config
+                            current_position, signal, current_data.close, stop_loss, take_profit
                         )
                         
                         if should_close:
                             # Close position
-                            trade = self._close_position(
-                                current_position, current_data, simulation_config
-                            )
+                            trade = self._close_position(current_position, current_data, commission)
                             trades.append(trade)
                             current_position = None
                     
                     # Check if we should open new position
                     if not current_position and self._should_open_position(signal, current_data):
-                        current_position = self._open_position(signal, current_data, simulation_config)
+                        current_position = self._open_position(signal, current_data, entry_delay)
                 
                 # Check for position timeout or stop loss
                 if current_position:
                     should_close_timeout = self._should_close_position_timeout(
-                        current_position, current_data, simulation_config
+                        current_position, current_data, max_hold_days
                     )
                     
                     if should_close_timeout:
-                        trade = self._close_position(current_position, current_data, simulation_config)
+                        trade = self._close_position(current_position, current_data, commission)
                         trades.append(trade)
                         current_position = None
                         
@@ -255,7 +335,7 @@ class BacktestService:
         # Close any remaining open position at the end
         if current_position:
             final_data = historical_data[-1]
-            trade = self._close_position(current_position, final_data, simulation_config)
+            trade = self._close_position(current_position, final_data, commission)
             trades.append(trade)
         
         return trades
@@ -276,118 +356,108 @@ class BacktestService:
                 signal.confidence >= 0.5 and
                 signal.signal_type in ['long', 'short'])
     
-    def _should_close_position(self, position: Dict[str, Any], signal: Signal, 
-                              current_data: MarketData, simulation_config: TradeSimulation) -> bool:
+    def _should_close_position(self, position: _OpenPosition, signal: Signal,
+                              current_price: float, stop_loss: Optional[float],
+                              take_profit: Optional[float]) -> bool:
         """
         Determine if we should close current position based on new signal.
         
         Args:
             position: Current open position
             signal: New trading signal
-            current_data: Current market data
-            simulation_config: Trade simulation configuration
+            current_price: Current close price
+            stop_loss: Stop loss fraction, or None to disable
+            take_profit: Take profit fraction, or None to disable
             
         Returns:
             True if position should be closed
         """
         # Close on opposite signal
-        if (position['trade_type'] == 'long' and signal.signal_type == 'short') or \
-           (position['trade_type'] == 'short' and signal.signal_type == 'long'):
+        if (position.trade_type == 'long' and signal.signal_type == 'short') or \
+           (position.trade_type == 'short' and signal.signal_type == 'long'):
             return True
         
+        if not (stop_loss or take_profit):
+            return False
+        
+        # One signed return in the position's favour serves both thresholds
+        entry_price = position.entry_price
+        direction = 1.0 if position.trade_type == 'long' else -1.0
+        ret = direction * (current_price - entry_price) / entry_price
+        
         # Check stop loss
-        if simulation_config.stop_loss_percent:
-            current_price = current_data.close
-            entry_price = position['entry_price']
-            
-            if position['trade_type'] == 'long':
-                loss_percent = (entry_price - current_price) / entry_price
-                if loss_percent >= simulation_config.stop_loss_percent:
-                    return True
-            else:  # short
-                loss_percent = (current_price - entry_price) / entry_price
-                if loss_percent >= simulation_config.stop_loss_percent:
-                    return True
+        if stop_loss and ret <= -stop_loss:
+            return True
         
         # Check take profit
-        if simulation_config.take_profit_percent:
-            current_price = current_data.close
-            entry_price = position['entry_price']
-            
-            if position['trade_type'] == 'long':
-                profit_percent = (current_price - entry_price) / entry_price
-                if profit_percent >= simulation_config.take_profit_percent:
-                    return True
-            else:  # short
-                profit_percent = (entry_price - current_price) / entry_price
-                if profit_percent >= simulation_config.take_profit_percent:
-                    return True
+        if take_profit and ret >= take_profit:
+            return True
         
         return False
     
-    def _should_close_position_timeout(self, position: Dict[str, Any], current_data: MarketData,
-                                     simulation_config: TradeSimulation) -> bool:
+    def _should_close_position_timeout(self, position: _OpenPosition, current_data: MarketData,
+                                     max_hold_days: Optional[int]) -> bool:
         """
         Check if position should be closed due to timeout.
         
         Args:
             position: Current open position
             current_data: Current market data
-            simulation_config: Trade simulation configuration
+            max_hold_days: Maximum holding period in days, or None to disable
             
         Returns:
             True if position should be closed due to timeout
         """
-        if not simulation_config.max_hold_days:
+        if not max_hold_days:
             return False
         
-        entry_date = position['entry_date']
+        entry_date = position.entry_date
         days_held = (current_data.timestamp - entry_date).days
         
-        return days_held >= simulation_config.max_hold_days
+        return days_held >= max_hold_days
     
     def _open_position(self, signal: Signal, current_data: MarketData,
-                      simulation_config: TradeSimulation) -> Dict[str, Any]:
+                      entry_delay: timedelta) -> _OpenPosition:
         """
         Open a new trading position.
         
         Args:
             signal: Trading signal
             current_data: Current market data
-            simulation_config: Trade simulation configuration
+            entry_delay: Simulated delay between signal and entry
             
         Returns:
-            Position dictionary
+            Open position
         """
         # Simulate entry delay
-        entry_time = current_data.timestamp + timedelta(minutes=simulation_config.entry_delay_minutes)
-        
-        return {
-            'symbol': signal.symbol,
-            'trade_type': signal.signal_type,
-            'entry_date': entry_time,
-            'entry_price': current_data.close,  # Simplified - use close price
-            'signal_confidence': signal.confidence
-        }
+        entry_time = current_data.timestamp + entry_delay
+        
+        return _OpenPosition(
+            symbol=signal.symbol,
+            trade_type=signal.signal_type,
+            entry_date=entry_time,
+            entry_price=current_data.close,  # Simplified - use close price
+            signal_confidence=signal.confidence
+        )
     
-    def _close_position(self, position: Dict[str, Any], current_data: MarketData,
-                       simulation_config: TradeSimulation) -> Trade:
+    def _close_position(self, position: _OpenPosition, current_data: MarketData,
+                       commission: float) -> Trade:
         """
         Close an open trading position.
         
         Args:
             position: Open position to close
             current_data: Current market data
-            simulation_config: Trade simulation configuration
+            commission: Commission charged per trade
             
         Returns:
             Completed Trade object
         """
         exit_price = current_data.close
-        entry_price = position['entry_price']
+        entry_price = position.entry_price
         
         # Calculate P&L
-        if position['trade_type'] == 'long':
+        if position.trade_type == 'long':
             pnl = exit_price - entry_price
             pnl_percent = (exit_price - entry_price) / entry_price
         else:  # short
@@ -395,15 +465,15 @@ class BacktestService:
             pnl_percent = (entry_price - exit_price) / entry_price
         
         # Subtract commission
-        pnl -= simulation_config.commission_per_trade
+        pnl -= commission
         
         return Trade(
-            symbol=position['symbol'],
-            entry_date=position['entry_date'],
+            symbol=position.symbol,
+            entry_date=position.entry_date,
             entry_price=entry_price,
             exit_date=current_data.timestamp,
             exit_price=exit_price,
-            trade_type=position['trade_type'],
+            trade_type=position.trade_type,
             pnl=pnl,
             pnl_percent=pnl_percent
         )   
@@ -418,45 +488,9 @@ class BacktestService:
         Returns:
             PerformanceMetrics object with calculated statistics
         """
-        if not trades:
-            return PerformanceMetrics(
-                total_trades=0,
-                winning_trades=0,
-                losing_trades=0,
-                win_rate=0.0,
-                total_return=0.0,
-                average_return=0.0,
-                max_drawdown=0.0,
-                sharpe_ratio=0.0
-            )
-        
-        total_trades = len(trades)
-        winning_trades = len([t for t in trades if t.pnl > 0])
-        losing_trades = len([t for t in trades if t.pnl <= 0])
-        
-        win_rate = winning_trades / total_trades if total_trades > 0 else 0.0
-        
-        # Calculate returns
-        returns = [t.pnl_percent for t in trades]
-        total_return = sum(returns)
-        average_return = total_return / total_trades if total_trades > 0 else 0.0
-        
-        # Calculate maximum drawdown
-        max_drawdown = self._calculate_max_drawdown(trades)
-        
-        # Calculate Sharpe ratio (simplified - assumes risk-free rate of 0)
-        sharpe_ratio = self._calculate_sharpe_ratio(returns)
-        
-        return PerformanceMetrics(
-            total_trades=total_trades,
-            winning_trades=winning_trades,
-            losing_trades=losing_trades,
-            win_rate=win_rate,
-            total_return=total_return,
-            average_return=average_return,
-            max_drawdown=max_drawdown,
-            sharpe_ratio=sharpe_ratio
-        )
+        # One extraction of the trade columns; the returns array goes
+        # straight to the drawdown and Sharpe kernels
+        return PerformanceMetrics.from_trades(trades)
     
     def _calculate_max_drawdown(self, trades: List[Trade]) -> float:
         """
@@ -471,29 +505,11 @@ class BacktestService:
         if not trades:
             return 0.0
         
-        # Sort trades by exit date
-        sorted_trades = sorted(trades, key=lambda t: t.exit_date)
-        
-        # Calculate cumulative returns
-        cumulative_return = 0.0
-        peak_return = 0.0
-        max_drawdown = 0.0
-        
-        for trade in sorted_trades:
-            cumulative_return += trade.pnl_percent
-            
-            # Update peak
-            if cumulative_return > peak_return:
-                peak_return = cumulative_return
-            
-            # Calculate current drawdown
-            current_drawdown = peak_return - cumulative_return
-            
-            # Update max drawdown
-            if current_drawdown > max_drawdown:
-                max_drawdown = current_drawdown
-        
-        return max_drawdown
+        # Stable sort by exit date, as sorted() would
+        exit_dates = np.array([t.exit_date for t in trades], dtype=object)
+        order = np.argsort(exit_dates, kind='stable')
+        returns = np.fromiter((trades[i].pnl_percent for i in order), dtype=np.float64, count=len(trades))
+        return max_drawdown(returns)
     
     def _calculate_sharpe_ratio(self, returns: List[float]) -> float:
         """
@@ -505,19 +521,7 @@ class BacktestService:
         Returns:
             Sharpe ratio
         """
-        if not returns or len(returns) < 2:
-            return 0.0
-        
-        import statistics
-        
-        mean_return = statistics.mean(returns)
-        std_return = statistics.stdev(returns)
-        
-        if std_return == 0:
-            return 0.0
-        
-        # Simplified Sharpe ratio (assuming risk-free rate = 0)
-        return mean_return / std_return
+        return sharpe_ratio(np.asarray(returns, dtype=np.float64))
     
     async def _save_backtest_result(self, backtest_result: BacktestResult) -> None:
         """
@@ -527,54 +531,65 @@ class BacktestService:
             backtest_result: Backtest result to save
         """
         try:
-            db = get_session()
-            try:
+            with session_scope() as db:
+                backtest_id = uuid.UUID(backtest_result.id)
+                
+                # One walk over the trades for both the JSON column and the trade rows
+                trade_dicts = []
+                trade_rows = []
+                for trade in backtest_result.trades:
+                    trade_dicts.append(trade.to_dict())
+                    trade_rows.append({
+                        'backtest_id': backtest_id,
+                        'symbol': trade.symbol,
+                        'entry_date': trade.entry_date,
+                        'entry_price': float(trade.entry_price),
+                        'exit_date': trade.exit_date,
+                        'exit_price': float(trade.exit_price),
+                        'trade_type': trade.trade_type,
+                        'pnl': float(trade.pnl),
+                        'pnl_percent': float(trade.pnl_percent)
+                    })
+                
                 # Convert to database model
                 db_backtest_result = BacktestResultDB(
-                    id=uuid.UUID(backtest_result.id),
+                    id=backtest_id,
                     timestamp=backtest_result.timestamp,
                     start_date=backtest_result.start_date,
                     end_date=backtest_result.end_date,
                     symbols=backtest_result.symbols,
-                    trades=[trade.to_dict() for trade in backtest_result.trades],
+                    trades=trade_dicts,
                     performance=backtest_result.performance.to_dict(),
-                    settings_used=backtest_result.settings_used.to_dict()
+                    settings_used=backtest_result.settings_used.to_dict(),
+                    trade_count=backtest_result.performance.total_trades,
+                    win_rate=backtest_result.performance.win_rate,
+                    total_return=backtest_result.performance.total_return
                 )
                 
                 db.add(db_backtest_result)
                 
-                # Also save individual trades for detailed analysis
-                for trade in backtest_result.trades:
-                    db_trade = TradeDB(
-                        backtest_id=uuid.UUID(backtest_result.id),
-                        symbol=trade.symbol,
-                        entry_date=trade.entry_date,
-                        entry_price=float(trade.entry_price),
-                        exit_date=trade.exit_date,
-                        exit_price=float(trade.exit_price),
-                        trade_type=trade.trade_type,
-                        pnl=float(trade.pnl),
-                        pnl_percent=float(trade.pnl_percent)
-                    )
-                    db.add(db_trade)
-                
-                db.commit()
-                
-                logger.info(f"Saved backtest result {backtest_result.id} with {len(backtest_result.trades)} trades")
-                
-            finally:
-                db.close()
+                # Also save individual trades for detailed analysis, as one
+                # batched INSERT; the parent row must exist first for the FK
+                if trade_rows:
+                    db.flush()
+                    db.bulk_insert_mappings(TradeDB, trade_rows)
+            
+            logger.info(f"Saved backtest result {backtest_result.id} with {len(backtest_result.trades)} trades")
                 
         except Exception as e:
             logger.error(f"Error saving backtest result {backtest_result.id}: {str(e)}")
             raise
     
-    async def get_backtest_history(self, filters: Optional[BacktestFilters] = None) -> List[BacktestResult]:
+    async def get_backtest_history(self, filters: Optional[BacktestFilters] = None,
+                                   include_trades: bool = False) -> List[BacktestResult]:
         """
         Retrieve backtest history with optional filtering.
         
         Args:
             filters: Optional filters for backtest history
+            include_trades: Load and deserialize each result's trades. When
+                False, results carry an empty trade list; use
+                get_backtest_by_id for the full record.
             
         Returns:
             List of backtest results matching filters
@@ -583,10 +598,12 @@ class BacktestService:
             filters = BacktestFilters()
         
         try:
-            db = get_session()
-            try:
+            with session_scope() as db:
                 # Build query with filters
                 query = db.query(BacktestResultDB)
+                if not include_trades:
+                    # Listings only need summary metrics; skip the trades JSONB
+                    query = query.options(defer(BacktestResultDB.trades))
                 
                 # Date range filter
                 if filters.start_date:
@@ -603,6 +620,13 @@ class BacktestService:
                         )
                     query = query.filter(or_(*symbol_conditions))
                 
+                # Trade count and win rate filters use the denormalized
+                # columns, so rejected rows never transfer their JSONB
+                if filters.min_trades:
+                    query = query.filter(BacktestResultDB.trade_count >= filters.min_trades)
+                if filters.min_win_rate:
+                    query = query.filter(BacktestResultDB.win_rate >= filters.min_win_rate)
+                
                 # Order by timestamp descending
                 query = query.order_by(desc(BacktestResultDB.timestamp))
                 
@@ -619,18 +643,12 @@ class BacktestService:
                 backtest_results = []
                 for db_result in db_results:
                     # Convert trades from dict to Trade objects
-                    trades = [Trade.from_dict(trade_dict) for trade_dict in db_result.trades]
-                    
-                    # Apply additional filters that require domain model processing
-                    if filters.min_trades and len(trades) < filters.min_trades:
-                        continue
-                    
-                    # Calculate performance for filtering
+                    trades = (
+                        [Trade.from_dict(trade_dict) for trade_dict in db_result.trades]
+                        if include_trades else []
+                    )
                     performance = PerformanceMetrics.from_dict(db_result.performance)
                     
-                    if filters.min_win_rate and performance.win_rate < filters.min_win_rate:
-                        continue
-                    
                     # Create backtest result
                     backtest_result = BacktestResult(
                         id=str(db_result.id),
@@ -648,9 +666,6 @@ class BacktestService:
                 logger.info(f"Retrieved {len(backtest_results)} backtest results from history")
                 return backtest_results
                 
-            finally:
-                db.close()
-                
         except Exception as e:
             logger.error(f"Error retrieving backtest history: {str(e)}")
             raise
@@ -666,8 +681,7 @@ class BacktestService:
             Backtest result if found, None otherwise
         """
         try:
-            db = get_session()
-            try:
+            with session_scope() as db:
                 db_result = db.query(BacktestResultDB).filter(
                     BacktestResultDB.id == uuid.UUID(backtest_id)
                 ).first()
@@ -676,6 +690,8 @@ class BacktestService:
                     return None
                 
                 # Convert to domain model
+                # The JSONB copy keeps the saved order, full-precision returns
+                # and timestamps; the trades table rounds to its Numeric scale
                 trades = [Trade.from_dict(trade_dict) for trade_dict in db_result.trades]
                 performance = PerformanceMetrics.from_dict(db_result.performance)
                 
@@ -692,9 +708,6 @@ class BacktestService:
                 
                 return backtest_result
                 
-            finally:
-                db.close()
-                
         except Exception as e:
             logger.error(f"Error retrieving backtest {backtest_id}: {str(e)}")
             return None
@@ -710,23 +723,18 @@ class BacktestService:
             True if deleted successfully, False otherwise
         """
         try:
-            db = get_session()
-            try:
-                result = db.query(BacktestResultDB).filter(
-                    BacktestResultDB.id == uuid.UUID(backtest_id)
-                ).delete()
-                
-                db.commit()
-                
-                if result > 0:
-                    logger.info(f"Deleted backtest result {backtest_id}")
-                    return True
-                else:
-                    logger.warning(f"Backtest result {backtest_id} not found for deletion")
-                    return False
-                    
-            finally:
-                db.close()
+            with session_scope() as db:
+                # One DELETE statement; trade rows go with it via ON DELETE CASCADE
+                result = db.execute(
+                    delete(BacktestResultDB).where(BacktestResultDB.id == uuid.UUID(backtest_id))
+                )
+                deleted = result.rowcount > 0
+            
+            if deleted:
+                logger.info(f"Deleted backtest result {backtest_id}")
+            else:
+                logger.warning(f"Backtest result {backtest_id} not found for deletion")
+            return deleted
                 
         except Exception as e:
             logger.error(f"Error deleting backtest {backtest_id}: {str(e)}")
@@ -743,16 +751,21 @@ class BacktestService:
             Dictionary with backtest statistics
         """
         try:
-            db = get_session()
-            try:
+            with session_scope() as db:
                 cutoff_date = datetime.now() - timedelta(days=days)
-                
-                # Get all backtests in the time period
-                backtests = db.query(BacktestResultDB).filter(
-                    BacktestResultDB.timestamp >= cutoff_date
-                ).all()
-                
-                if not backtests:
+                in_window = BacktestResultDB.timestamp >= cutoff_date
+                total_return = BacktestResultDB.total_return
+                
+                # Totals and averages in one aggregate row; no JSONB payloads
+                # cross the wire
+                total_backtests, total_trades, avg_win_rate, avg_return = db.query(
+                    func.count(BacktestResultDB.id),
+                    func.coalesce(func.sum(BacktestResultDB.trade_count), 0),
+                    func.avg(BacktestResultDB.win_rate),
+                    func.avg(total_return)
+                ).filter(in_window).one()
+                
+                if not total_backtests:
                     return {
                         "total_backtests": 0,
                         "total_trades": 0,
@@ -762,67 +775,65 @@ class BacktestService:
                         "most_tested_symbols": []
                     }
                 
-                # Calculate statistics
-                total_backtests = len(backtests)
-                total_trades = sum(len(bt.trades) for bt in backtests)
-                
-                # Calculate average metrics
-                win_rates = []
-                returns = []
-                symbol_counts = {}
-                symbol_performance = {}
-                
-                for backtest in backtests:
-                    try:
-                        performance = PerformanceMetrics.from_dict(backtest.performance)
-                        win_rates.append(performance.win_rate)
-                        returns.append(performance.total_return)
-                    except Exception as e:
-                        logger.warning(f"Error parsing performance data for backtest {backtest.id}: {str(e)}")
-                        # Skip this backtest if performance data is invalid
-                        continue
-                    
-                    # Count symbol usage
-                    for symbol in backtest.symbols:
-                        symbol_counts[symbol] = symbol_counts.get(symbol, 0) + 1
-                        
-                        # Track symbol performance
-                        if symbol not in symbol_performance:
-                            symbol_performance[symbol] = []
-                        symbol_performance[symbol].append(performance.total_return)
-                
-                avg_win_rate = sum(win_rates) / len(win_rates) if win_rates else 0.0
-                avg_return = sum(returns) / len(returns) if returns else 0.0
+                # One row per (backtest, symbol), grouped once per symbol
+                per_symbol = select(
+                    func.jsonb_array_elements_text(BacktestResultDB.symbols).label('symbol'),
+                    total_return.label('total_return')
+                ).where(in_window).subquery()
+                symbol_stats = select(
+                    per_symbol.c.symbol,
+                    func.count().label('tests'),
+                    func.count(per_symbol.c.total_return).label('tests_with_return'),
+                    func.avg(per_symbol.c.total_return).label('avg_return')
+                ).group_by(per_symbol.c.symbol).subquery()
+                
+                # Rank both leaderboards over the same grouped rows, so a
+                # single statement returns at most 20 symbols
+                ranked = select(
+                    symbol_stats,
+                    func.row_number().over(
+                        order_by=desc(symbol_stats.c.tests)
+                    ).label('tested_rank'),
+                    func.row_number().over(
+                        order_by=desc(symbol_stats.c.avg_return).nulls_last()
+                    ).label('return_rank')
+                ).subquery()
+                top_symbols = db.query(
+                    ranked.c.symbol, ranked.c.tests, ranked.c.tests_with_return,
+                    ranked.c.avg_return, ranked.c.tested_rank, ranked.c.return_rank
+                ).filter(or_(ranked.c.tested_rank <= 10, ranked.c.return_rank <= 10)).all()
                 
                 # Get most tested symbols (top 10)
-                most_tested = sorted(symbol_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+                most_tested = sorted(
+                    (row for row in top_symbols if row.tested_rank <= 10),
+                    key=lambda row: row.tested_rank
+                )
                 
                 # Get best performing symbols (top 10 by average return)
-                best_performing = []
-                for symbol, performances in symbol_performance.items():
-                    avg_perf = sum(performances) / len(performances)
-                    best_performing.append((symbol, avg_perf, len(performances)))
-                
-                best_performing = sorted(best_performing, key=lambda x: x[1], reverse=True)[:10]
+                best_performing = sorted(
+                    (row for row in top_symbols if row.return_rank <= 10 and row.tests_with_return),
+                    key=lambda row: row.return_rank
+                )
                 
                 return {
                     "total_backtests": total_backtests,
-                    "total_trades": total_trades,
-                    "average_win_rate": round(avg_win_rate, 4),
-                    "average_return": round(avg_return, 4),
+                    "total_trades": int(total_trades),
+                    "average_win_rate": round(float(avg_win_rate or 0.0), 4),
+                    "average_return": round(float(avg_return or 0.0), 4),
                     "best_performing_symbols": [
-                        {"symbol": symbol, "avg_return": round(perf, 4), "tests": count}
-                        for symbol, perf, count in best_performing
+                        {
+                            "symbol": row.symbol,
+                            "avg_return": round(float(row.avg_return), 4),
+                            "tests": row.tests_with_return
+                        }
+                        for row in best_performing
                     ],
                     "most_tested_symbols": [
-                        {"symbol": symbol, "count": count}
-                        for symbol, count in most_tested
+                        {"symbol": row.symbol, "count": row.tests}
+                        for row in most_tested
                     ]
                 }
                 
-            finally:
-                db.close()
-                
         except Exception as e:
             logger.error(f"Error getting backtest statistics: {str(e)}")
             return {}
@@ -830,4 +841,5 @@ class BacktestService:
     def __del__(self):
         """Cleanup resources."""
         if hasattr(self, '_executor'):
-            self._executor.shutdown(wait=True)
\ No newline at end of file
+            # The last reference may be dropped on a pool thread, which cannot join itself
+            self._executor.shutdown(wait=False)
\ No newline at end of file
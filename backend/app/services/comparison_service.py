@@ -3,20 +3,116 @@ Comparison service for analyzing differences between multiple scans.
 Provides side-by-side comparison of settings, performance, and outcomes.
 """
 
+import asyncio
 import logging
+import operator
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional, Any, Set
-from collections import defaultdict
+from typing import List, Dict, Optional, Any, Set, Tuple
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+from sqlalchemy import String, Text, cast, column, func, select, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Session
 
 from ..database import get_session
 from ..models.database_models import ScanResultDB
-from ..models.enhanced_diagnostics import ScanComparison, EnhancedScanDiagnostics
+from ..models.enhanced_diagnostics import ScanComparison
 from ..models.signals import AlgorithmSettings
+from ..utils.jit import njit
 
 logger = logging.getLogger(__name__)
 
 
+# Algorithm settings compared between scans
+_SETTING_FIELDS = (
+    'atr_multiplier', 'ema5_rising_threshold', 'ema8_rising_threshold',
+    'ema21_rising_threshold', 'volatility_filter', 'fomo_filter',
+    'higher_timeframe'
+)
+_get_setting_values = operator.attrgetter(*_SETTING_FIELDS)
+
+_NUMERIC_TYPES = frozenset((int, float))
+_NO_CHANGE = "no_change"
+
+# Comparisons keyed by the sorted scan ids, least recently used first. Saved
+# scans are never modified, so an entry only goes stale when one of its scans
+# is deleted; see invalidate_comparisons.
+_COMPARISON_CACHE_SIZE = 256
+_comparison_cache: 'OrderedDict[Tuple[str, ...], ScanComparison]' = OrderedDict()
+
+
+def invalidate_comparisons(scan_id: str) -> None:
+    """Drop cached comparisons that include the given scan."""
+    for key in [key for key in _comparison_cache if scan_id in key]:
+        del _comparison_cache[key]
+
+
+@dataclass(slots=True)
+class _ScanColumns:
+    """
+    Fields of the compared scans as parallel columns, in timestamp order.
+    
+    Settings stay as the stored JSON dictionaries. Numeric summaries come
+    from the columns written when the scan was saved; the symbol lists are
+    extracted from the enhanced diagnostics in the database and are None
+    for scans without enhanced diagnostics.
+    """
+    scan_ids: List[str]
+    settings: List[Optional[Dict[str, Any]]]
+    symbols_scanned: List[List[str]]
+    execution_time: np.ndarray
+    data_quality_score: np.ndarray  # 0.0 where the scan has no score
+    symbols_count: np.ndarray
+    signals_found: np.ndarray
+    success_rate: np.ndarray  # 0.0 without enhanced diagnostics
+    memory_usage: np.ndarray  # 0.0 without performance metrics
+    api_requests: np.ndarray  # 0 without performance metrics
+    symbols_with_data: List[Optional[List[str]]]
+    symbols_without_data: List[Optional[List[str]]]
+    symbols_with_errors: List[Optional[Dict[str, str]]]
+    symbol_statuses: List[Optional[Dict[str, str]]]  # symbol -> status from symbol_details
+
+
+def _symbol_statuses_expression():
+    """Correlated subquery collapsing ``symbol_details`` to symbol -> status."""
+    details = func.jsonb_each(
+        ScanResultDB.enhanced_diagnostics['symbol_details']
+    ).table_valued(column('key', Text), column('value', JSONB)).render_derived()
+    return select(
+        func.jsonb_object_agg(details.c.key, details.c.value['status'].astext, type_=JSONB)
+    ).scalar_subquery()
+
+
+def _compared_ids(scan_ids: List[str]):
+    """``VALUES`` CTE of the distinct scan ids, joined instead of ``IN (...)``.
+
+    The ids are bound as text and cast on the CTE side of the join, so the
+    primary key index on ``scan_results.id`` is still used.
+    """
+    return select(
+        values(column('id', String), name='ids').data(
+            [(scan_id,) for scan_id in dict.fromkeys(scan_ids)]
+        )
+    ).cte('compared_ids')
+
+
+def _parse_settings(settings_used: Optional[Dict[str, Any]]) -> AlgorithmSettings:
+    """Build settings from a stored dictionary, falling back to defaults."""
+    return AlgorithmSettings.from_dict(settings_used) if settings_used else AlgorithmSettings()
+
+
+@njit(cache=True)
+def _percent_changes(first: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """Percentage change from first to last for each metric (0.0 from a zero start)."""
+    changes = np.zeros(first.shape[0])
+    for i in range(first.shape[0]):
+        if first[i] != 0.0:
+            changes[i] = (last[i] - first[i]) / first[i] * 100.0
+    return changes
+
+
 class ComparisonService:
     """Service for comparing multiple scans and identifying differences."""
     
@@ -32,96 +128,128 @@ class ComparisonService:
             scan_ids: List of scan IDs to compare
             
         Returns:
-            ScanComparison with detailed analysis or None if insufficient data
+            ScanComparison with detailed analysis or None if insufficient data.
+            Results are cached and shared between callers; treat them as
+            read-only.
         """
+        cache_key = tuple(sorted(set(scan_ids)))
+        cached = _comparison_cache.get(cache_key)
+        if cached is not None:
+            _comparison_cache.move_to_end(cache_key)
+            return cached
+        
+        if not scan_ids:
+            logger.warning("Insufficient scans found for comparison: 0")
+            return None
+        
         try:
             db = get_session()
             try:
-                # Retrieve scan results
-                db_results = db.query(ScanResultDB).filter(
-                    ScanResultDB.id.in_(scan_ids)
+                # Retrieve only the compared fields, already in timestamp order.
+                # Trend values are summary columns written with the scan, and
+                # the symbol status fields are extracted in the database, so
+                # neither the signals nor the diagnostics payloads are transferred.
+                diagnostics = ScanResultDB.enhanced_diagnostics
+                compared_ids = _compared_ids(scan_ids)
+                rows = db.query(
+                    ScanResultDB.id,
+                    ScanResultDB.execution_time,
+                    ScanResultDB.data_quality_score,
+                    ScanResultDB.symbols_scanned,
+                    ScanResultDB.symbols_count,
+                    ScanResultDB.signals_count,
+                    ScanResultDB.success_rate,
+                    ScanResultDB.memory_usage_mb,
+                    ScanResultDB.api_requests_made,
+                    ScanResultDB.settings_used,
+                    diagnostics['symbols_with_data'],
+                    diagnostics['symbols_without_data'],
+                    diagnostics['symbols_with_errors'],
+                    _symbol_statuses_expression()
+                ).join(
+                    compared_ids, ScanResultDB.id == cast(compared_ids.c.id, UUID(as_uuid=True))
                 ).order_by(ScanResultDB.timestamp).all()
-                
-                if len(db_results) < 2:
-                    logger.warning(f"Insufficient scans found for comparison: {len(db_results)}")
-                    return None
-                
-                # Convert to enhanced diagnostics
-                scan_data = {}
-                for db_result in db_results:
-                    scan_id = str(db_result.id)
-                    
-                    # Parse settings
-                    settings = AlgorithmSettings()
-                    if db_result.settings_used:
-                        settings = AlgorithmSettings.from_dict(db_result.settings_used)
-                    
-                    # Parse enhanced diagnostics
-                    enhanced_diagnostics = None
-                    if db_result.enhanced_diagnostics:
-                        enhanced_diagnostics = EnhancedScanDiagnostics.from_dict(
-                            db_result.enhanced_diagnostics
-                        )
-                    
-                    scan_data[scan_id] = {
-                        'timestamp': db_result.timestamp,
-                        'settings': settings,
-                        'enhanced_diagnostics': enhanced_diagnostics,
-                        'execution_time': float(db_result.execution_time),
-                        'data_quality_score': float(db_result.data_quality_score) if db_result.data_quality_score else None,
-                        'symbols_scanned': db_result.symbols_scanned or [],
-                        'scan_status': db_result.scan_status,
-                        'signals_found': len(db_result.signals_found) if db_result.signals_found else 0
-                    }
-                
-                # Perform comparison analysis
-                settings_differences = self._analyze_settings_differences(scan_data)
-                performance_trends = self._analyze_performance_trends(scan_data)
-                symbol_status_changes = self._analyze_symbol_status_changes(scan_data)
-                insights = self._generate_insights(scan_data, settings_differences, performance_trends)
-                
-                comparison = ScanComparison(
-                    scan_ids=list(scan_data.keys()),
-                    settings_differences=settings_differences,
-                    performance_trends=performance_trends,
-                    symbol_status_changes=symbol_status_changes,
-                    insights=insights
-                )
-                
-                logger.info(f"Generated comparison for {len(scan_ids)} scans")
-                return comparison
-                
             finally:
+                # The analysis needs no database access; release the connection
                 db.close()
+            
+            if len(rows) < 2:
+                logger.warning(f"Insufficient scans found for comparison: {len(rows)}")
+                return None
+            
+            (ids, execution_times, quality_scores, symbols, symbol_counts, signal_counts,
+             success_rates, memory_usage, api_requests, settings, symbols_with_data,
+             symbols_without_data, symbols_with_errors, symbol_statuses) = zip(*rows)
+            columns = _ScanColumns(
+                scan_ids=[str(scan_id) for scan_id in ids],
+                settings=list(settings),
+                symbols_scanned=[symbols_scanned or [] for symbols_scanned in symbols],
+                execution_time=np.array(execution_times, dtype=np.float64),
+                data_quality_score=np.array(
+                    [score or 0.0 for score in quality_scores], dtype=np.float64
+                ),
+                symbols_count=np.array([value or 0 for value in symbol_counts], dtype=np.int64),
+                signals_found=np.array([value or 0 for value in signal_counts], dtype=np.int64),
+                success_rate=np.array([value or 0.0 for value in success_rates], dtype=np.float64),
+                memory_usage=np.array([value or 0.0 for value in memory_usage], dtype=np.float64),
+                api_requests=np.array([value or 0 for value in api_requests], dtype=np.int64),
+                symbols_with_data=list(symbols_with_data),
+                symbols_without_data=list(symbols_without_data),
+                symbols_with_errors=list(symbols_with_errors),
+                symbol_statuses=list(symbol_statuses)
+            )
+            
+            # Perform the independent analyses off the event loop
+            settings_differences, performance_trends, symbol_status_changes = await asyncio.gather(
+                asyncio.to_thread(self._analyze_settings_differences, columns),
+                asyncio.to_thread(self._analyze_performance_trends, columns),
+                asyncio.to_thread(self._analyze_symbol_status_changes, columns)
+            )
+            insights = self._generate_insights(columns, settings_differences, performance_trends)
+            
+            comparison = ScanComparison(
+                scan_ids=columns.scan_ids,
+                settings_differences=settings_differences,
+                performance_trends=performance_trends,
+                symbol_status_changes=symbol_status_changes,
+                insights=insights
+            )
+            
+            _comparison_cache[cache_key] = comparison
+            if len(_comparison_cache) > _COMPARISON_CACHE_SIZE:
+                _comparison_cache.popitem(last=False)
+            
+            logger.info(f"Generated comparison for {len(scan_ids)} scans")
+            return comparison
                 
         except Exception as e:
             logger.error(f"Error comparing scans: {e}")
             raise
     
-    def _analyze_settings_differences(self, scan_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    def _analyze_settings_differences(self, columns: _ScanColumns) -> Dict[str, Dict[str, Any]]:
         """Analyze differences in algorithm settings between scans."""
         settings_differences = {}
         
         # Get baseline settings (first scan)
-        scan_ids = list(scan_data.keys())
-        baseline_scan_id = scan_ids[0]
-        baseline_settings = scan_data[baseline_scan_id]['settings']
+        baseline_raw = columns.settings[0]
+        baseline_values = _get_setting_values(_parse_settings(baseline_raw))
         
-        for scan_id in scan_ids:
-            current_settings = scan_data[scan_id]['settings']
+        for scan_id, current_raw in zip(columns.scan_ids, columns.settings):
+            # Identical stored settings cannot differ; skip parsing them
+            if current_raw == baseline_raw:
+                continue
+            
+            # One tuple comparison for scans whose compared values all match
+            current_values = _get_setting_values(_parse_settings(current_raw))
+            if current_values == baseline_values:
+                continue
+            
             differences = {}
             
             # Compare each setting
-            setting_fields = [
-                'atr_multiplier', 'ema5_rising_threshold', 'ema8_rising_threshold',
-                'ema21_rising_threshold', 'volatility_filter', 'fomo_filter',
-                'higher_timeframe'
-            ]
-            
-            for field in setting_fields:
-                baseline_value = getattr(baseline_settings, field, None)
-                current_value = getattr(current_settings, field, None)
-                
+            for field, baseline_value, current_value in zip(
+                _SETTING_FIELDS, baseline_values, current_values
+            ):
                 if baseline_value != current_value:
                     differences[field] = {
                         'baseline': baseline_value,
@@ -134,104 +262,96 @@ class ComparisonService:
         
         return settings_differences
     
-    def _analyze_performance_trends(self, scan_data: Dict[str, Any]) -> Dict[str, List[float]]:
+    def _analyze_performance_trends(self, columns: _ScanColumns) -> Dict[str, List[float]]:
         """Analyze performance trends across scans."""
-        trends = {
-            'execution_time': [],
-            'data_quality_score': [],
-            'symbols_scanned_count': [],
-            'signals_found_count': [],
-            'success_rate': [],
-            'memory_usage': [],
-            'api_requests': []
+        # Columns are in the order of the query's ORDER BY timestamp, so the
+        # trends are chronological without sorting again here
+        return {
+            'execution_time': columns.execution_time.tolist(),
+            'data_quality_score': columns.data_quality_score.tolist(),
+            'symbols_scanned_count': columns.symbols_count.tolist(),
+            'signals_found_count': columns.signals_found.tolist(),
+            'success_rate': columns.success_rate.tolist(),
+            'memory_usage': columns.memory_usage.tolist(),
+            'api_requests': columns.api_requests.tolist()
         }
-        
-        # Sort scans by timestamp
-        sorted_scans = sorted(
-            scan_data.items(), 
-            key=lambda x: x[1]['timestamp']
-        )
-        
-        for scan_id, data in sorted_scans:
-            trends['execution_time'].append(data['execution_time'])
-            trends['data_quality_score'].append(data['data_quality_score'] or 0.0)
-            trends['symbols_scanned_count'].append(len(data['symbols_scanned']))
-            trends['signals_found_count'].append(data['signals_found'])
-            
-            # Calculate success rate from enhanced diagnostics
-            success_rate = 0.0
-            if data['enhanced_diagnostics']:
-                total_symbols = len(data['symbols_scanned'])
-                successful_symbols = len(data['enhanced_diagnostics'].symbols_with_data)
-                success_rate = successful_symbols / total_symbols if total_symbols > 0 else 0.0
-            
-            trends['success_rate'].append(success_rate)
-            
-            # Extract performance metrics if available
-            if data['enhanced_diagnostics'] and data['enhanced_diagnostics'].performance_metrics:
-                perf_metrics = data['enhanced_diagnostics'].performance_metrics
-                trends['memory_usage'].append(perf_metrics.memory_usage_mb)
-                trends['api_requests'].append(perf_metrics.api_requests_made)
-            else:
-                trends['memory_usage'].append(0.0)
-                trends['api_requests'].append(0)
-        
-        return trends
     
-    def _analyze_symbol_status_changes(self, scan_data: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    def _analyze_symbol_status_changes(self, columns: _ScanColumns) -> Dict[str, Dict[str, str]]:
         """Analyze how symbol processing status changed between scans."""
         symbol_status_changes = {}
         
-        # Collect all symbols across all scans
+        # Resolve every scanned symbol's status once per scan, collecting all
+        # symbols across all scans in the same pass
+        status_maps = []
         all_symbols: Set[str] = set()
-        for data in scan_data.values():
-            all_symbols.update(data['symbols_scanned'])
+        for i in range(len(columns.scan_ids)):
+            status_map = self._symbol_statuses(columns, i)
+            status_maps.append(status_map)
+            all_symbols.update(status_map.keys())
         
         # Track status for each symbol across scans
         for symbol in all_symbols:
-            symbol_statuses = {}
-            
-            for scan_id, data in scan_data.items():
-                if symbol in data['symbols_scanned']:
-                    # Determine status from enhanced diagnostics
-                    status = "unknown"
-                    if data['enhanced_diagnostics'] and data['enhanced_diagnostics'].symbol_details:
-                        symbol_detail = data['enhanced_diagnostics'].symbol_details.get(symbol)
-                        if symbol_detail:
-                            status = symbol_detail.status
-                    elif data['enhanced_diagnostics']:
-                        # Fallback to legacy diagnostic format
-                        if symbol in data['enhanced_diagnostics'].symbols_with_data:
-                            status = "success"
-                        elif symbol in data['enhanced_diagnostics'].symbols_without_data:
-                            status = "no_data"
-                        elif symbol in data['enhanced_diagnostics'].symbols_with_errors:
-                            status = "error"
-                    
-                    symbol_statuses[scan_id] = status
-                else:
-                    symbol_statuses[scan_id] = "not_scanned"
+            statuses = [status_map.get(symbol, "not_scanned") for status_map in status_maps]
             
             # Only include symbols that had status changes
-            unique_statuses = set(symbol_statuses.values())
-            if len(unique_statuses) > 1:
-                symbol_status_changes[symbol] = symbol_statuses
+            first_status = statuses[0]
+            if any(status != first_status for status in statuses):
+                symbol_status_changes[symbol] = dict(zip(columns.scan_ids, statuses))
         
         return symbol_status_changes
     
+    @staticmethod
+    def _symbol_statuses(columns: _ScanColumns, index: int) -> Dict[str, str]:
+        """Map each symbol scanned in one scan to its processing status."""
+        statuses = dict.fromkeys(columns.symbols_scanned[index], "unknown")
+        if columns.symbols_with_data[index] is None:
+            # No enhanced diagnostics for this scan
+            return statuses
+        
+        symbol_statuses = columns.symbol_statuses[index]
+        if symbol_statuses:
+            for symbol, status in symbol_statuses.items():
+                if symbol in statuses:
+                    statuses[symbol] = status
+        else:
+            # Fallback to legacy diagnostic format; applied from lowest to
+            # highest precedence so success wins over no_data over error
+            for status, symbols in (
+                ("error", columns.symbols_with_errors[index]),
+                ("no_data", columns.symbols_without_data[index]),
+                ("success", columns.symbols_with_data[index])
+            ):
+                for symbol in symbols or ():
+                    if symbol in statuses:
+                        statuses[symbol] = status
+        return statuses
+    
     def _generate_insights(
         self, 
-        scan_data: Dict[str, Any], 
+        columns: _ScanColumns, 
         settings_differences: Dict[str, Dict[str, Any]],
         performance_trends: Dict[str, List[float]]
     ) -> List[str]:
         """Generate insights about significant differences and trends."""
         insights = []
+        trends = {name: np.asarray(values) for name, values in performance_trends.items()}
+        
+        # Unset quality scores and memory readings are stored as 0
+        execution_times = trends['execution_time']
+        quality_scores = trends['data_quality_score']
+        quality_scores = quality_scores[quality_scores > 0]
+        memory_usage = trends['memory_usage']
+        memory_usage = memory_usage[memory_usage > 0]
+        
+        # Relative changes of all ratio metrics in one kernel call
+        ratio_metrics = (execution_times, quality_scores, memory_usage)
+        time_change, quality_change, memory_change = _percent_changes(
+            np.array([values[0] if values.size else 0.0 for values in ratio_metrics], dtype=np.float64),
+            np.array([values[-1] if values.size else 0.0 for values in ratio_metrics], dtype=np.float64)
+        )
         
         # Analyze execution time trends
-        execution_times = performance_trends['execution_time']
-        if len(execution_times) >= 2:
-            time_change = ((execution_times[-1] - execution_times[0]) / execution_times[0]) * 100
+        if execution_times.size >= 2:
             if abs(time_change) > 20:  # More than 20% change
                 direction = "increased" if time_change > 0 else "decreased"
                 insights.append(
@@ -240,9 +360,7 @@ class ComparisonService:
                 )
         
         # Analyze quality score trends
-        quality_scores = [score for score in performance_trends['data_quality_score'] if score > 0]
-        if len(quality_scores) >= 2:
-            quality_change = ((quality_scores[-1] - quality_scores[0]) / quality_scores[0]) * 100
+        if quality_scores.size >= 2:
             if abs(quality_change) > 10:  # More than 10% change
                 direction = "improved" if quality_change > 0 else "degraded"
                 insights.append(
@@ -262,20 +380,21 @@ class ComparisonService:
                 )
         
         # Analyze signal generation trends
-        signals_counts = performance_trends['signals_found_count']
-        if len(signals_counts) >= 2:
-            if signals_counts[-1] > signals_counts[0] * 1.5:
+        signals_counts = trends['signals_found_count']
+        if signals_counts.size >= 2:
+            first_count, last_count = int(signals_counts[0]), int(signals_counts[-1])
+            if last_count > first_count * 1.5:
                 insights.append(
-                    f"Signal generation increased significantly from {signals_counts[0]} to {signals_counts[-1]}"
+                    f"Signal generation increased significantly from {first_count} to {last_count}"
                 )
-            elif signals_counts[-1] < signals_counts[0] * 0.5:
+            elif last_count < first_count * 0.5:
                 insights.append(
-                    f"Signal generation decreased significantly from {signals_counts[0]} to {signals_counts[-1]}"
+                    f"Signal generation decreased significantly from {first_count} to {last_count}"
                 )
         
         # Analyze success rate trends
-        success_rates = performance_trends['success_rate']
-        if len(success_rates) >= 2:
+        success_rates = trends['success_rate']
+        if success_rates.size >= 2:
             success_change = (success_rates[-1] - success_rates[0]) * 100
             if abs(success_change) > 15:  # More than 15% change
                 direction = "improved" if success_change > 0 else "degraded"
@@ -285,9 +404,7 @@ class ComparisonService:
                 )
         
         # Analyze memory usage trends
-        memory_usage = [mem for mem in performance_trends['memory_usage'] if mem > 0]
-        if len(memory_usage) >= 2:
-            memory_change = ((memory_usage[-1] - memory_usage[0]) / memory_usage[0]) * 100
+        if memory_usage.size >= 2:
             if abs(memory_change) > 30:  # More than 30% change
                 direction = "increased" if memory_change > 0 else "decreased"
                 insights.append(
@@ -306,18 +423,18 @@ class ComparisonService:
         if baseline_value is None or current_value is None:
             return None
         
-        if isinstance(baseline_value, (int, float)) and isinstance(current_value, (int, float)):
+        # Exact type checks; compared settings are plain floats, ints and strings
+        if type(baseline_value) in _NUMERIC_TYPES and type(current_value) in _NUMERIC_TYPES:
             if baseline_value == 0:
-                return "new_value" if current_value != 0 else "no_change"
+                return "new_value" if current_value != 0 else _NO_CHANGE
             
             change_percent = ((current_value - baseline_value) / baseline_value) * 100
             if abs(change_percent) < 0.01:  # Less than 0.01% change
-                return "no_change"
+                return _NO_CHANGE
             
-            direction = "+" if change_percent > 0 else ""
-            return f"{direction}{change_percent:.2f}%"
+            return f"{change_percent:+.2f}%"
         
         elif baseline_value != current_value:
             return f"changed_from_{baseline_value}_to_{current_value}"
         
-        return "no_change"
\ No newline at end of file
+        return _NO_CHANGE
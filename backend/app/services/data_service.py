@@ -3,13 +3,17 @@ Data service for fetching market data using yfinance API with AlphaVantage fallb
 Handles current and historical data fetching with caching and error handling.
 """
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta, date
-from typing import Dict, List, Optional, Tuple
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 from dataclasses import dataclass
+from collections import OrderedDict, deque
 import time
 import asyncio
+import functools
+import threading
 from concurrent.futures import ThreadPoolExecutor
 import json
 import os
@@ -28,44 +32,51 @@ from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Request limits as (requests, window seconds) pairs
+YFINANCE_RATE_LIMITS = ((60, 60.0), (360, 3600.0), (8000, 86400.0))
+ALPHAVANTAGE_RATE_LIMITS = ((5, 60.0), (500, 86400.0))
+# Longest a scan fetch waits for a request slot before giving up
+MAX_RATE_LIMIT_WAIT = 10.0
+# Backtests wait out the per-minute window; longer limits are reported
+HISTORICAL_RATE_LIMIT_WAIT = 60.0
 
-@dataclass
+
+@dataclass(slots=True)
 class CacheEntry:
     """Represents a cached data entry with expiration."""
-    data: Dict
-    timestamp: datetime
-    expires_at: datetime
+    data: Any
+    expires_at: float  # time.monotonic() deadline
 
 
 class DataCache:
-    """Simple in-memory cache for market data."""
+    """Bounded in-memory LRU cache for market data."""
     
-    def __init__(self, default_ttl_minutes: int = 5):
-        self._cache: Dict[str, CacheEntry] = {}
-        self._default_ttl = timedelta(minutes=default_ttl_minutes)
+    def __init__(self, default_ttl_minutes: int = 5, maxsize: int = 10000):
+        self._cache: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._default_ttl = default_ttl_minutes * 60.0
+        self.maxsize = maxsize
     
-    def get(self, key: str) -> Optional[Dict]:
+    def get(self, key: str) -> Optional[Any]:
         """Get cached data if not expired."""
-        if key not in self._cache:
+        entry = self._cache.get(key)
+        if entry is None:
             return None
         
-        entry = self._cache[key]
-        if datetime.now() > entry.expires_at:
+        if time.monotonic() >= entry.expires_at:
             del self._cache[key]
             return None
         
+        self._cache.move_to_end(key)
         return entry.data
     
-    def set(self, key: str, data: Dict, ttl_minutes: Optional[int] = None) -> None:
-        """Cache data with expiration."""
-        ttl = timedelta(minutes=ttl_minutes) if ttl_minutes else self._default_ttl
-        expires_at = datetime.now() + ttl
-        
-        self._cache[key] = CacheEntry(
-            data=data,
-            timestamp=datetime.now(),
-            expires_at=expires_at
-        )
+    def set(self, key: str, data: Any, ttl_minutes: Optional[int] = None) -> None:
+        """Cache data with expiration, evicting the least recently used entry when full."""
+        ttl = ttl_minutes * 60.0 if ttl_minutes else self._default_ttl
+        
+        self._cache[key] = CacheEntry(data=data, expires_at=time.monotonic() + ttl)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
     
     def clear(self) -> None:
         """Clear all cached data."""
@@ -76,6 +87,82 @@ class DataCache:
         return len(self._cache)
 
 
+class RateLimitExceeded(Exception):
+    """Raised when a request slot is further away than the caller will wait."""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"Request rate limit reached, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class RequestRateLimiter:
+    """
+    Sliding-window rate limiter enforcing several request limits at once.
+    
+    Requests may burst up to every window's limit; beyond that a caller waits
+    until the oldest request in each full window has aged out of it, or fails
+    fast when that is more than ``max_wait`` away.
+    """
+    
+    def __init__(self, limits: Tuple[Tuple[int, float], ...]):
+        self._windows = [(limit, seconds, deque()) for limit, seconds in limits]
+        # Reservations never await, so a thread lock works from any event loop
+        self._lock = threading.Lock()
+    
+    def _reserve(self, max_wait: float) -> float:
+        """Reserve the earliest allowed request time and return the wait until it."""
+        with self._lock:
+            now = time.monotonic()
+            start = now
+            for limit, seconds, requests in self._windows:
+                while requests and requests[0] <= now - seconds:
+                    requests.popleft()
+                if requests:
+                    # Slots are handed out in order, so each window stays sorted
+                    start = max(start, requests[-1])
+                if len(requests) >= limit:
+                    start = max(start, requests[-limit] + seconds)
+            
+            if start - now > max_wait:
+                raise RateLimitExceeded(start - now)
+            
+            for _, _, requests in self._windows:
+                requests.append(start)
+            return start - now
+    
+    async def acquire(self, max_wait: float = MAX_RATE_LIMIT_WAIT) -> float:
+        """
+        Wait for a request slot.
+        
+        The slot is reserved under the lock and the wait happens outside it,
+        so concurrent callers queue up without blocking the event loop.
+        
+        Args:
+            max_wait: Longest acceptable wait in seconds
+        
+        Returns:
+            Seconds waited
+        
+        Raises:
+            RateLimitExceeded: If no slot is free within ``max_wait``
+        """
+        wait = self._reserve(max_wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def clear(self) -> None:
+        """Forget all recorded requests."""
+        with self._lock:
+            for _, _, requests in self._windows:
+                requests.clear()
+
+
+# Shared by every DataService so the limits hold across requests
+yfinance_limiter = RequestRateLimiter(YFINANCE_RATE_LIMITS)
+alphavantage_limiter = RequestRateLimiter(ALPHAVANTAGE_RATE_LIMITS)
+
+
 class DataService:
     """Service for fetching and managing market data with yfinance primary and AlphaVantage fallback."""
     
@@ -101,25 +188,17 @@ class DataService:
                 logger.warning(f"Failed to initialize AlphaVantage client: {e}")
         else:
             logger.warning("AlphaVantage library not available - install with: pip install alpha-vantage")
-        
-        # Rate limiting (optimized for manual scans)
-        self._last_request_time = 0
-        self._min_request_interval = 0.3  # 300ms between requests (reasonable for manual use)
-        self._last_alphavantage_request = 0
-        self._alphavantage_min_interval = 6.0  # 6 seconds (still respects API limits but faster)
     
-    def _rate_limit(self) -> None:
-        """Implement minimal rate limiting for manual scans."""
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        
-        # Minimal rate limiting for manual scans (not automated)
-        min_interval = 0.3  # 300ms between requests (reduced from 1s)
-        if time_since_last < min_interval:
-            sleep_time = min_interval - time_since_last
-            time.sleep(sleep_time)  # Keep synchronous but minimal delay
-        
-        self._last_request_time = time.time()
+    async def _rate_limit(self, max_wait: float = MAX_RATE_LIMIT_WAIT) -> None:
+        """
+        Wait until another yfinance request fits within the request limits.
+        
+        Raises:
+            RateLimitExceeded: If no request slot is free within ``max_wait``
+        """
+        wait = await yfinance_limiter.acquire(max_wait)
+        if wait > 0:
+            logger.info(f"yfinance rate limiting: waited {wait:.1f}s")
     
     def _validate_symbol(self, symbol: str) -> bool:
         """Validate stock symbol format."""
@@ -140,54 +219,43 @@ class DataService:
             logger.warning(f"No data received for symbol {symbol}")
             return []
         
-        cleaned_data = []
+        try:
+            opens = df['Open'].to_numpy(dtype=np.float64)
+            highs = df['High'].to_numpy(dtype=np.float64)
+            lows = df['Low'].to_numpy(dtype=np.float64)
+            closes = df['Close'].to_numpy(dtype=np.float64)
+            volumes = df['Volume'].to_numpy(dtype=np.float64)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Error processing data for {symbol}: {e}")
+            return []
         
-        for timestamp, row in df.iterrows():
-            try:
-                # Skip rows with NaN values
-                if pd.isna(row['Open']) or pd.isna(row['Close']):
-                    continue
-                
-                # Validate price data
-                if any(val <= 0 for val in [row['Open'], row['High'], row['Low'], row['Close']]):
-                    continue
-                
-                # Validate high/low relationships
-                if row['High'] < max(row['Open'], row['Close']) or row['Low'] > min(row['Open'], row['Close']):
-                    continue
-                
-                market_data = MarketData(
-                    symbol=symbol.upper(),
-                    timestamp=timestamp.to_pydatetime() if hasattr(timestamp, 'to_pydatetime') else timestamp,
-                    open=float(row['Open']),
-                    high=float(row['High']),
-                    low=float(row['Low']),
-                    close=float(row['Close']),
-                    volume=int(row['Volume']) if not pd.isna(row['Volume']) else 0
-                )
-                
-                cleaned_data.append(market_data)
-                
-            except (ValueError, TypeError, KeyError) as e:
-                logger.warning(f"Error processing data point for {symbol}: {e}")
-                continue
+        # Keep rows with positive prices where high/low bound open and close
+        # (NaN prices fail every comparison and are dropped as well)
+        valid = (
+            (opens > 0) & (highs > 0) & (lows > 0) & (closes > 0)
+            & (highs >= np.maximum(opens, closes))
+            & (lows <= np.minimum(opens, closes))
+        )
         
-        return cleaned_data
+        index = df.index[valid]
+        timestamps = index.to_pydatetime() if hasattr(index, 'to_pydatetime') else index
+        volumes = np.nan_to_num(volumes[valid], nan=0.0).astype(np.int64)
+        symbol = symbol.upper()
+        
+        return [
+            MarketData(symbol=symbol, timestamp=timestamp, open=open_, high=high,
+                       low=low, close=close, volume=volume)
+            for timestamp, open_, high, low, close, volume in zip(
+                timestamps, opens[valid].tolist(), highs[valid].tolist(),
+                lows[valid].tolist(), closes[valid].tolist(), volumes.tolist()
+            )
+        ]
     
     async def _rate_limit_alphavantage(self) -> None:
-        """Implement rate limiting for AlphaVantage API (optimized for manual scans)."""
-        current_time = time.time()
-        time_since_last = current_time - self._last_alphavantage_request
-        
-        # Reduced rate limiting for manual scans
-        min_interval = 6.0  # 6 seconds instead of 12 (still respects API limits)
-        if time_since_last < min_interval:
-            sleep_time = min_interval - time_since_last
-            logger.info(f"AlphaVantage rate limiting: waiting {sleep_time:.1f}s")
-            # Use async sleep to avoid blocking the server
-            await asyncio.sleep(sleep_time)
-        
-        self._last_alphavantage_request = time.time()
+        """Wait until another AlphaVantage request fits within the request limits."""
+        wait = await alphavantage_limiter.acquire()
+        if wait > 0:
+            logger.info(f"AlphaVantage rate limiting: waited {wait:.1f}s")
     
     async def _fetch_alphavantage_intraday(self, symbol: str, interval: str = "60min") -> pd.DataFrame:
         """
@@ -316,13 +384,21 @@ class DataService:
         
         while yfinance_attempts < yfinance_max_attempts:
             try:
-                self._rate_limit()
-                yfinance_attempts += 1
-                
+                await self._rate_limit()
+            except RateLimitExceeded as e:
+                # Retrying cannot help until the window frees up
+                logger.warning(f"yfinance request limit reached, skipping {symbol}: {e}")
+                break
+            
+            yfinance_attempts += 1
+            try:
                 logger.info(f"Attempting yfinance fetch for {symbol} (attempt {yfinance_attempts}/{yfinance_max_attempts})")
                 
+                # yfinance blocks on HTTP, so keep it off the event loop
                 ticker = yf.Ticker(symbol)
-                df = ticker.history(period=period, interval=interval)
+                df = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, functools.partial(ticker.history, period=period, interval=interval)
+                )
                 
                 if not df.empty:
                     logger.info(f"yfinance success for {symbol}: {len(df)} data points")
@@ -342,6 +418,35 @@ class DataService:
         logger.info(f"Tip: Try again in a few minutes or check if {symbol} is a valid symbol")
         return pd.DataFrame()
     
+    async def _download_batch(self, symbols: List[str], period: str = "5d", interval: str = "1h") -> Dict[str, pd.DataFrame]:
+        """
+        Fetch data for several symbols with a single yfinance download.
+        
+        Args:
+            symbols: Stock symbols
+            period: Data period for yfinance
+            interval: Data interval
+        
+        Returns:
+            Dictionary mapping symbols to their OHLCV DataFrames (empty when
+            yfinance returned no rows for a symbol)
+        """
+        await self._rate_limit()
+        logger.info(f"Attempting yfinance batch fetch for {len(symbols)} symbols")
+        
+        # auto_adjust matches the Ticker.history default used for single symbols
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(self._executor, functools.partial(
+            yf.download, " ".join(symbols), period=period, interval=interval,
+            group_by='ticker', threads=True, progress=False, auto_adjust=True
+        ))
+        
+        tickers = set(df.columns.get_level_values(0)) if isinstance(df.columns, pd.MultiIndex) else set()
+        return {
+            symbol: df[symbol].dropna(how='all') if symbol in tickers else pd.DataFrame()
+            for symbol in symbols
+        }
+    
     async def fetch_current_data(self, symbols: List[str], period: str = "1d", interval: str = "1h") -> Dict[str, List[MarketData]]:
         """
         Fetch current market data for multiple symbols.
@@ -363,26 +468,33 @@ class DataService:
             logger.error("No valid symbols provided")
             return {}
         
-        # Check cache first
-        cache_key = f"current_{'-'.join(valid_symbols)}_{period}_{interval}"
-        cached_data = self.cache.get(cache_key)
-        if cached_data:
-            logger.info(f"Returning cached data for {len(valid_symbols)} symbols")
-            return {symbol: [MarketData.from_dict(d) for d in data] 
-                   for symbol, data in cached_data.items()}
-        
+        # Check the cache per symbol so only the misses are fetched
         result = {}
-        
-        # Fetch data for symbols in parallel (optimized for manual scans)
-        tasks = []
+        to_fetch = []
         for symbol in valid_symbols:
-            task = asyncio.create_task(self._fetch_single_symbol_data(symbol, period, interval))
-            tasks.append((symbol, task))
+            cached_data = self.cache.get(f"sym:{symbol}:{period}:{interval}")
+            if cached_data:
+                result[symbol] = [MarketData.from_dict(d) for d in cached_data]
+            else:
+                to_fetch.append(symbol)
+        
+        if not to_fetch:
+            logger.info(f"Returning cached data for {len(valid_symbols)} symbols")
+            return result
+        
+        # Several symbols share one batched request instead of one each
+        if len(to_fetch) == 1:
+            frames = {to_fetch[0]: await self._fetch_single_symbol_data(to_fetch[0], period, interval)}
+        else:
+            try:
+                frames = await self._download_batch(to_fetch, period, interval)
+            except Exception as e:
+                logger.warning(f"yfinance batch fetch failed for {len(to_fetch)} symbols: {e}")
+                frames = {}
         
-        # Wait for all tasks to complete
-        for symbol, task in tasks:
+        for symbol in to_fetch:
             try:
-                df = await task
+                df = frames.get(symbol, pd.DataFrame())
                 
                 if df.empty:
                     logger.warning(f"No data available for symbol {symbol} from any source")
@@ -392,15 +504,16 @@ class DataService:
                     result[symbol] = cleaned_data
                     logger.info(f"Successfully fetched {len(cleaned_data)} data points for {symbol}")
                     
+                    # Empty results are not cached so the next scan retries them
+                    if cleaned_data:
+                        self.cache.set(f"sym:{symbol}:{period}:{interval}",
+                                       [d.to_dict() for d in cleaned_data], ttl_minutes=5)
+                    
             except Exception as e:
                 logger.error(f"Unexpected error fetching data for {symbol}: {e}")
                 result[symbol] = []
         
-        # Cache the results
-        cache_data = {symbol: [d.to_dict() for d in data] for symbol, data in result.items()}
-        self.cache.set(cache_key, cache_data, ttl_minutes=5)
-        
-        return result
+        return {symbol: result[symbol] for symbol in valid_symbols}
     
     async def fetch_higher_timeframe_data(self, symbols: List[str], timeframe: str = "4h", period: str = "1d") -> Dict[str, List[MarketData]]:
         """
@@ -429,6 +542,9 @@ class DataService:
         
         Returns:
             Dictionary mapping symbols to their historical data
+        
+        Raises:
+            RateLimitExceeded: If the hourly or daily request limit is reached
         """
         if not symbols or start_date >= end_date:
             return {}
@@ -437,43 +553,59 @@ class DataService:
         if not valid_symbols:
             return {}
         
-        # Check cache
-        cache_key = f"historical_{'-'.join(valid_symbols)}_{start_date}_{end_date}_{interval}"
-        cached_data = self.cache.get(cache_key)
-        if cached_data:
-            logger.info(f"Returning cached historical data for {len(valid_symbols)} symbols")
-            return {symbol: [MarketData.from_dict(d) for d in data] 
-                   for symbol, data in cached_data.items()}
+        # Symbols are fetched concurrently; the shared limiter spaces the requests
+        fetched = await asyncio.gather(*(
+            self._fetch_historical_symbol(symbol, start_date, end_date, interval)
+            for symbol in valid_symbols
+        ))
+        return dict(zip(valid_symbols, fetched))
+    
+    async def _fetch_historical_symbol(self, symbol: str, start_date: date, end_date: date, interval: str) -> List[MarketData]:
+        """
+        Fetch historical market data for one symbol, using the cache when possible.
         
-        result = {}
+        Args:
+            symbol: Stock symbol
+            start_date: Start date for historical data
+            end_date: End date for historical data
+            interval: Data interval
         
-        for symbol in valid_symbols:
-            # Single attempt for historical data (optimized for manual scans)
-            try:
-                self._rate_limit()
-                
-                logger.info(f"Fetching historical data for {symbol} from {start_date} to {end_date}")
-                
-                ticker = yf.Ticker(symbol)
-                df = ticker.history(start=start_date, end=end_date, interval=interval)
-                
-                if df.empty:
-                    logger.warning(f"No historical data available for {symbol}")
-                    result[symbol] = []
-                else:
-                    cleaned_data = self._clean_market_data(df, symbol)
-                    result[symbol] = cleaned_data
-                    logger.info(f"Successfully fetched {len(cleaned_data)} historical data points for {symbol}")
-                    
-            except Exception as e:
-                logger.error(f"Error fetching historical data for {symbol}: {e}")
-                result[symbol] = []
+        Returns:
+            Cleaned market data, empty if none was available
+        """
+        cache_key = f"hist:{symbol}:{start_date}:{end_date}:{interval}"
+        cached_data = self.cache.get(cache_key)
+        if cached_data:
+            logger.info(f"Returning cached historical data for {symbol}")
+            return [MarketData.from_dict(d) for d in cached_data]
         
-        # Cache historical data for longer (30 minutes)
-        cache_data = {symbol: [d.to_dict() for d in data] for symbol, data in result.items()}
-        self.cache.set(cache_key, cache_data, ttl_minutes=30)
+        # Wait out the per-minute window rather than drop symbols silently
+        await self._rate_limit(HISTORICAL_RATE_LIMIT_WAIT)
         
-        return result
+        # Single attempt for historical data (optimized for manual scans)
+        try:
+            logger.info(f"Fetching historical data for {symbol} from {start_date} to {end_date}")
+            
+            ticker = yf.Ticker(symbol)
+            df = await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(ticker.history, start=start_date, end=end_date, interval=interval)
+            )
+            
+            if df.empty:
+                logger.warning(f"No historical data available for {symbol}")
+                return []
+            
+            cleaned_data = self._clean_market_data(df, symbol)
+            logger.info(f"Successfully fetched {len(cleaned_data)} historical data points for {symbol}")
+            
+            # Cache historical data for longer (30 minutes)
+            if cleaned_data:
+                self.cache.set(cache_key, [d.to_dict() for d in cleaned_data], ttl_minutes=30)
+            return cleaned_data
+            
+        except Exception as e:
+            logger.error(f"Error fetching historical data for {symbol}: {e}")
+            return []
     
     def get_cache_stats(self) -> Dict[str, int]:
         """Get cache statistics."""
@@ -4,14 +4,18 @@ Collects detailed performance metrics, data quality scores, and symbol-level dia
 """
 
 import logging
+import sys
 import time
 import psutil
 import threading
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
+from array import array
 from collections import defaultdict, Counter
 
+import numpy as np
+
 from ..models.enhanced_diagnostics import (
     SymbolDiagnostic, PerformanceMetrics, SignalAnalysis, 
     DataQualityMetrics, EnhancedScanDiagnostics
@@ -42,10 +46,13 @@ class DiagnosticContext:
     symbol_diagnostics: Dict[str, SymbolDiagnostic] = None
     symbol_timings: Dict[str, Dict[str, float]] = None
     
-    # Signal analysis
+    # Signal analysis. Symbols are stored once in symbol_table; rejection
+    # reasons map interned reason strings to compact arrays of table indices.
     signals_by_symbol: Dict[str, List[Signal]] = None
-    rejection_reasons: Dict[str, List[str]] = None
-    partial_criteria: Dict[str, List[str]] = None
+    symbol_table: List[str] = None
+    symbol_indices: Dict[str, int] = None
+    rejection_reasons: Dict[str, array] = None
+    partial_criteria: Dict[str, Tuple[str, ...]] = None
     
     # Data quality tracking
     total_data_points: int = 0
@@ -65,8 +72,12 @@ class DiagnosticContext:
             self.symbol_timings = {}
         if self.signals_by_symbol is None:
             self.signals_by_symbol = {}
+        if self.symbol_table is None:
+            self.symbol_table = []
+        if self.symbol_indices is None:
+            self.symbol_indices = {}
         if self.rejection_reasons is None:
-            self.rejection_reasons = defaultdict(list)
+            self.rejection_reasons = defaultdict(lambda: array('i'))
         if self.partial_criteria is None:
             self.partial_criteria = {}
         if self.fetch_times is None:
@@ -75,6 +86,27 @@ class DiagnosticContext:
             self.error_categories = defaultdict(int)
         if self.bottleneck_phases is None:
             self.bottleneck_phases = []
+    
+    def symbol_index(self, symbol: str) -> int:
+        """Get the symbol table index for a symbol, adding it if needed."""
+        index = self.symbol_indices.get(symbol)
+        if index is None:
+            index = len(self.symbol_table)
+            self.symbol_indices[symbol] = index
+            self.symbol_table.append(symbol)
+        return index
+    
+    def materialize_rejection_reasons(self) -> Dict[str, List[str]]:
+        """Expand rejection reason indices back into lists of symbols."""
+        table = self.symbol_table
+        return {
+            reason: [table[index] for index in indices]
+            for reason, indices in self.rejection_reasons.items()
+        }
+    
+    def materialize_partial_criteria(self) -> Dict[str, List[str]]:
+        """Expand stored partial criteria tuples into lists."""
+        return {symbol: list(criteria) for symbol, criteria in self.partial_criteria.items()}
 
 
 class DiagnosticService:
@@ -286,13 +318,17 @@ class DiagnosticService:
         if signals:
             context.signals_by_symbol[symbol] = signals
         
-        # Record rejection reasons
-        for reason in rejection_reasons:
-            context.rejection_reasons[reason].append(symbol)
+        # Record rejection reasons as symbol table indices
+        if rejection_reasons:
+            symbol_index = context.symbol_index(symbol)
+            for reason in rejection_reasons:
+                context.rejection_reasons[sys.intern(reason)].append(symbol_index)
         
         # Record partial criteria
         if partial_criteria:
-            context.partial_criteria[symbol] = partial_criteria
+            context.partial_criteria[symbol] = tuple(
+                sys.intern(criterion) for criterion in partial_criteria
+            )
         
         logger.debug(f"Recorded processing result for {symbol}: "
                     f"{len(signals)} signals, {len(rejection_reasons)} rejections")
@@ -394,25 +430,20 @@ class DiagnosticService:
                 bottleneck_phase=bottleneck_phase
             )
             
-            # Create signal analysis
-            total_signals = sum(len(signals) for signals in context.signals_by_symbol.values())
-            
-            # Calculate confidence distribution
-            confidence_distribution = {"high": 0, "medium": 0, "low": 0}
-            for signals in context.signals_by_symbol.values():
-                for signal in signals:
-                    if signal.confidence >= 0.8:
-                        confidence_distribution["high"] += 1
-                    elif signal.confidence >= 0.6:
-                        confidence_distribution["medium"] += 1
-                    else:
-                        confidence_distribution["low"] += 1
+            # Create signal analysis with a vectorized confidence distribution
+            confidences = np.fromiter(
+                (
+                    signal.confidence
+                    for signals in context.signals_by_symbol.values()
+                    for signal in signals
+                ),
+                dtype=float
+            )
             
-            signal_analysis = SignalAnalysis(
-                signals_found=total_signals,
-                symbols_meeting_partial_criteria=dict(context.partial_criteria),
-                rejection_reasons=dict(context.rejection_reasons),
-                confidence_distribution=confidence_distribution
+            signal_analysis = SignalAnalysis.from_confidences(
+                confidences,
+                symbols_meeting_partial_criteria=context.materialize_partial_criteria(),
+                rejection_reasons=context.materialize_rejection_reasons()
             )
             
             # Calculate data quality metrics
@@ -475,7 +506,7 @@ class DiagnosticService:
             logger.info(f"Finalized diagnostics for scan {scan_id}: "
                        f"Quality score: {quality_score}, "
                        f"Success rate: {success_rate:.2%}, "
-                       f"Signals found: {total_signals}")
+                       f"Signals found: {signal_analysis.signals_found}")
             
             return enhanced_diagnostics
             
@@ -12,15 +12,18 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import pandas as pd
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
 from ..database import get_session
 from ..models.database_models import ScanResultDB
-from ..models.enhanced_diagnostics import ExportRequest, EnhancedScanDiagnostics
+from ..models.enhanced_diagnostics import ExportRequest
 from ..models.signals import Signal, AlgorithmSettings
 
 logger = logging.getLogger(__name__)
 
+# Scan rows fetched per round trip while streaming an export
+_EXPORT_BATCH_SIZE = 100
+
 
 @dataclass
 class ExportResult:
@@ -87,8 +90,18 @@ class ExportService:
         try:
             db = get_session()
             try:
-                # Build query
-                query = db.query(ScanResultDB).filter(
+                # Build query, skipping JSONB columns the export never reads
+                deferred_columns = [
+                    ScanResultDB.diagnostics,
+                    ScanResultDB.performance_metrics,
+                    ScanResultDB.signal_analysis,
+                ]
+                if not (export_request.include_diagnostics or export_request.include_errors):
+                    deferred_columns.append(ScanResultDB.enhanced_diagnostics)
+                
+                query = db.query(ScanResultDB).options(
+                    *[defer(column) for column in deferred_columns]
+                ).filter(
                     ScanResultDB.id.in_(export_request.scan_ids)
                 )
                 
@@ -101,12 +114,10 @@ class ExportService:
                 # Order by timestamp
                 query = query.order_by(ScanResultDB.timestamp)
                 
-                # Execute query
-                db_results = query.all()
-                
-                # Convert to export format
+                # Stream rows in batches so only one batch of ORM objects (and
+                # their JSONB payloads) is held while converting
                 export_data = []
-                for db_result in db_results:
+                for db_result in query.yield_per(_EXPORT_BATCH_SIZE):
                     scan_record = await self._convert_scan_for_export(db_result, export_request)
                     export_data.append(scan_record)
                 
@@ -179,61 +190,64 @@ class ExportService:
             except Exception as e:
                 logger.warning(f"Error converting settings for export: {e}")
         
+        # Read enhanced diagnostics straight from the stored dictionary; the
+        # export only needs counts and a few metrics, not the full model
+        enhanced_diag = None
+        if export_request.include_diagnostics or export_request.include_errors:
+            enhanced_diag = db_result.enhanced_diagnostics
+        
         # Include enhanced diagnostics if requested and available
-        if export_request.include_diagnostics and db_result.enhanced_diagnostics:
+        if export_request.include_diagnostics and enhanced_diag:
             try:
-                enhanced_diag = EnhancedScanDiagnostics.from_dict(db_result.enhanced_diagnostics)
-                
-                # Basic diagnostic info
-                scan_record['diagnostics'] = {
-                    'symbols_with_data_count': len(enhanced_diag.symbols_with_data),
-                    'symbols_without_data_count': len(enhanced_diag.symbols_without_data),
-                    'symbols_with_errors_count': len(enhanced_diag.symbols_with_errors),
-                    'data_fetch_time': enhanced_diag.data_fetch_time,
-                    'algorithm_time': enhanced_diag.algorithm_time,
-                    'total_data_points': sum(enhanced_diag.total_data_points.values())
-                }
-                
-                # Performance metrics
-                if enhanced_diag.performance_metrics:
-                    scan_record['performance_metrics'] = {
-                        'memory_usage_mb': enhanced_diag.performance_metrics.memory_usage_mb,
-                        'api_requests_made': enhanced_diag.performance_metrics.api_requests_made,
-                        'api_rate_limit_remaining': enhanced_diag.performance_metrics.api_rate_limit_remaining,
-                        'cache_hit_rate': enhanced_diag.performance_metrics.cache_hit_rate,
-                        'concurrent_requests': enhanced_diag.performance_metrics.concurrent_requests,
-                        'bottleneck_phase': enhanced_diag.performance_metrics.bottleneck_phase
-                    }
-                
-                # Signal analysis
-                if enhanced_diag.signal_analysis:
-                    scan_record['signal_analysis'] = {
-                        'signals_found': enhanced_diag.signal_analysis.signals_found,
-                        'rejection_reasons_count': len(enhanced_diag.signal_analysis.rejection_reasons),
-                        'partial_criteria_count': len(enhanced_diag.signal_analysis.symbols_meeting_partial_criteria)
-                    }
-                
-                # Data quality metrics
-                if enhanced_diag.data_quality_metrics:
-                    scan_record['data_quality_metrics'] = {
-                        'total_data_points': enhanced_diag.data_quality_metrics.total_data_points,
-                        'success_rate': enhanced_diag.data_quality_metrics.success_rate,
-                        'average_fetch_time': enhanced_diag.data_quality_metrics.average_fetch_time,
-                        'data_completeness': enhanced_diag.data_quality_metrics.data_completeness,
-                        'quality_score': enhanced_diag.data_quality_metrics.quality_score
+                performance_metrics = enhanced_diag['performance_metrics']
+                signal_analysis = enhanced_diag['signal_analysis']
+                data_quality_metrics = enhanced_diag['data_quality_metrics']
+                diagnostic_sections = {
+                    # Basic diagnostic info
+                    'diagnostics': {
+                        'symbols_with_data_count': len(enhanced_diag['symbols_with_data']),
+                        'symbols_without_data_count': len(enhanced_diag['symbols_without_data']),
+                        'symbols_with_errors_count': len(enhanced_diag['symbols_with_errors']),
+                        'data_fetch_time': enhanced_diag['data_fetch_time'],
+                        'algorithm_time': enhanced_diag['algorithm_time'],
+                        'total_data_points': sum(enhanced_diag['total_data_points'].values())
+                    },
+                    # Performance metrics
+                    'performance_metrics': {
+                        'memory_usage_mb': performance_metrics['memory_usage_mb'],
+                        'api_requests_made': performance_metrics['api_requests_made'],
+                        'api_rate_limit_remaining': performance_metrics['api_rate_limit_remaining'],
+                        'cache_hit_rate': performance_metrics['cache_hit_rate'],
+                        'concurrent_requests': performance_metrics['concurrent_requests'],
+                        'bottleneck_phase': performance_metrics['bottleneck_phase']
+                    },
+                    # Signal analysis
+                    'signal_analysis': {
+                        'signals_found': signal_analysis['signals_found'],
+                        'rejection_reasons_count': len(signal_analysis['rejection_reasons']),
+                        'partial_criteria_count': len(signal_analysis['symbols_meeting_partial_criteria'])
+                    },
+                    # Data quality metrics
+                    'data_quality_metrics': {
+                        'total_data_points': data_quality_metrics['total_data_points'],
+                        'success_rate': data_quality_metrics['success_rate'],
+                        'average_fetch_time': data_quality_metrics['average_fetch_time'],
+                        'data_completeness': data_quality_metrics['data_completeness'],
+                        'quality_score': data_quality_metrics['quality_score']
                     }
+                }
+                scan_record.update(diagnostic_sections)
                 
-            except Exception as e:
+            except (KeyError, TypeError, AttributeError) as e:
                 logger.warning(f"Error converting enhanced diagnostics for export: {e}")
         
         # Include error details if requested
-        if export_request.include_errors and db_result.enhanced_diagnostics:
+        if export_request.include_errors and enhanced_diag:
             try:
-                enhanced_diag = EnhancedScanDiagnostics.from_dict(db_result.enhanced_diagnostics)
-                if enhanced_diag.symbols_with_errors:
-                    scan_record['error_details'] = enhanced_diag.symbols_with_errors
-                if enhanced_diag.error_summary:
-                    scan_record['error_summary'] = enhanced_diag.error_summary
+                if enhanced_diag.get('symbols_with_errors'):
+                    scan_record['error_details'] = enhanced_diag['symbols_with_errors']
+                if enhanced_diag.get('error_summary'):
+                    scan_record['error_summary'] = enhanced_diag['error_summary']
             except Exception as e:
                 logger.warning(f"Error converting error details for export: {e}")
         
@@ -6,6 +6,7 @@ Combines data fetching and algorithm evaluation with batch processing and persis
 import logging
 import time
 import uuid
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
@@ -13,7 +14,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import asyncio
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import desc, func, select, and_, or_
+from sqlalchemy.dialects.postgresql import JSONB
 
 from ..database import get_session
 from ..models.database_models import ScanResultDB
@@ -24,6 +26,7 @@ from ..models.market_data import MarketData
 from .data_service import DataService
 from .algorithm_engine import AlgorithmEngine
 from .diagnostic_service import DiagnosticService
+from .comparison_service import invalidate_comparisons
 
 logger = logging.getLogger(__name__)
 
@@ -129,7 +132,7 @@ class ScannerService:
         symbols_without_data = []
         symbols_with_errors = {}
         total_data_points = {}
-        error_summary = {}
+        error_summary = Counter()
         scan_status = "completed"
         error_message = None
         
@@ -148,7 +151,7 @@ class ScannerService:
             except Exception as e:
                 logger.error(f"Error fetching current data: {e}")
                 current_data = {}
-                error_summary["data_fetch_error"] = error_summary.get("data_fetch_error", 0) + 1
+                error_summary["data_fetch_error"] += 1
             
             try:
                 # Fetch higher timeframe data
@@ -159,7 +162,7 @@ class ScannerService:
             except Exception as e:
                 logger.error(f"Error fetching HTF data: {e}")
                 htf_data = {}
-                error_summary["htf_fetch_error"] = error_summary.get("htf_fetch_error", 0) + 1
+                error_summary["htf_fetch_error"] += 1
             
             stats.data_fetch_time = time.time() - data_fetch_start
             
@@ -242,11 +245,11 @@ class ScannerService:
                     
                     # Categorize error types
                     if "insufficient data" in error_msg.lower():
-                        error_summary["insufficient_data"] = error_summary.get("insufficient_data", 0) + 1
+                        error_summary["insufficient_data"] += 1
                     elif "timeout" in error_msg.lower():
-                        error_summary["timeout"] = error_summary.get("timeout", 0) + 1
+                        error_summary["timeout"] += 1
                     else:
-                        error_summary["algorithm_error"] = error_summary.get("algorithm_error", 0) + 1
+                        error_summary["algorithm_error"] += 1
             
             stats.algorithm_time = time.time() - algorithm_start
             stats.execution_time = time.time() - start_time
@@ -283,7 +286,7 @@ class ScannerService:
                 data_fetch_time=stats.data_fetch_time,
                 algorithm_time=stats.algorithm_time,
                 total_data_points=total_data_points,
-                error_summary=error_summary
+                error_summary=dict(error_summary)
             )
             
             # Create scan result with enhanced diagnostics
@@ -332,7 +335,7 @@ class ScannerService:
                 data_fetch_time=stats.data_fetch_time,
                 algorithm_time=stats.algorithm_time,
                 total_data_points=total_data_points,
-                error_summary=error_summary
+                error_summary=dict(error_summary)
             )
             
             # Create scan result even for failed scans
@@ -565,6 +568,10 @@ class ScannerService:
                 signal_analysis_data = None
                 data_quality_score = None
                 diagnostics_data = None
+                symbols_count = len(scan_result.symbols_scanned)
+                success_rate = None
+                memory_usage_mb = None
+                api_requests_made = None
                 
                 if isinstance(scan_result, EnhancedScanResult):
                     # Enhanced scan result
@@ -572,6 +579,12 @@ class ScannerService:
                         enhanced_diagnostics_data = scan_result.enhanced_diagnostics.to_dict()
                         performance_metrics_data = scan_result.enhanced_diagnostics.performance_metrics.to_dict()
                         signal_analysis_data = scan_result.enhanced_diagnostics.signal_analysis.to_dict()
+                        
+                        # Summaries for scan comparisons
+                        symbols_with_data = len(scan_result.enhanced_diagnostics.symbols_with_data)
+                        success_rate = symbols_with_data / symbols_count if symbols_count > 0 else 0.0
+                        memory_usage_mb = performance_metrics_data['memory_usage_mb']
+                        api_requests_made = performance_metrics_data['api_requests_made']
                     
                     data_quality_score = scan_result.data_quality_score
                     
@@ -605,7 +618,13 @@ class ScannerService:
                     enhanced_diagnostics=enhanced_diagnostics_data,
                     performance_metrics=performance_metrics_data,
                     signal_analysis=signal_analysis_data,
-                    data_quality_score=data_quality_score
+                    data_quality_score=data_quality_score,
+                    # Comparison summaries
+                    symbols_count=symbols_count,
+                    signals_count=len(scan_result.signals_found),
+                    success_rate=success_rate,
+                    memory_usage_mb=memory_usage_mb,
+                    api_requests_made=api_requests_made
                 )
                 
                 db.add(db_scan_result)
@@ -779,6 +798,7 @@ class ScannerService:
                 db.commit()
                 
                 if result > 0:
+                    invalidate_comparisons(scan_id)
                     logger.info(f"Deleted scan result {scan_id}")
                     return True
                 else:
@@ -806,13 +826,18 @@ class ScannerService:
             db = get_session()
             try:
                 cutoff_date = datetime.now() - timedelta(days=days)
-                
-                # Get all scans in the time period
-                scans = db.query(ScanResultDB).filter(
-                    ScanResultDB.timestamp >= cutoff_date
-                ).all()
-                
-                if not scans:
+                in_window = ScanResultDB.timestamp >= cutoff_date
+                
+                # Totals in one aggregate row; the JSONB arrays are only
+                # measured, never transferred
+                total_scans, total_symbols, total_signals, avg_execution_time = db.query(
+                    func.count(ScanResultDB.id),
+                    func.coalesce(func.sum(func.jsonb_array_length(ScanResultDB.symbols_scanned)), 0),
+                    func.coalesce(func.sum(func.jsonb_array_length(ScanResultDB.signals_found)), 0),
+                    func.avg(ScanResultDB.execution_time)
+                ).filter(in_window).one()
+                
+                if not total_scans:
                     return {
                         "total_scans": 0,
                         "total_symbols_scanned": 0,
@@ -822,33 +847,28 @@ class ScannerService:
                         "most_active_symbols": []
                     }
                 
-                # Calculate statistics
-                total_scans = len(scans)
-                total_symbols = sum(len(scan.symbols_scanned) for scan in scans)
-                total_signals = sum(len(scan.signals_found) for scan in scans)
-                avg_execution_time = sum(float(scan.execution_time) for scan in scans) / total_scans
+                # One row per found signal for the signal type and symbol counts
+                found = select(
+                    func.jsonb_array_elements(ScanResultDB.signals_found, type_=JSONB).label('signal')
+                ).where(in_window).subquery()
+                signal_type = func.coalesce(found.c.signal['signal_type'].astext, 'unknown')
+                symbol = func.coalesce(found.c.signal['symbol'].astext, 'unknown')
+                count = func.count()
                 
                 # Count signals by type
-                signal_types = {}
-                symbol_counts = {}
-                
-                for scan in scans:
-                    for signal_dict in scan.signals_found:
-                        signal_type = signal_dict.get('signal_type', 'unknown')
-                        signal_types[signal_type] = signal_types.get(signal_type, 0) + 1
-                        
-                        symbol = signal_dict.get('symbol', 'unknown')
-                        symbol_counts[symbol] = symbol_counts.get(symbol, 0) + 1
+                signal_types = db.query(signal_type, count).group_by(signal_type).all()
                 
                 # Get most active symbols (top 10)
-                most_active = sorted(symbol_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+                most_active = db.query(symbol, count).group_by(symbol).order_by(
+                    desc(count)
+                ).limit(10).all()
                 
                 return {
                     "total_scans": total_scans,
-                    "total_symbols_scanned": total_symbols,
-                    "total_signals_found": total_signals,
-                    "average_execution_time": round(avg_execution_time, 3),
-                    "signals_by_type": signal_types,
+                    "total_symbols_scanned": int(total_symbols),
+                    "total_signals_found": int(total_signals),
+                    "average_execution_time": round(float(avg_execution_time), 3),
+                    "signals_by_type": dict(signal_types),
                     "most_active_symbols": [{"symbol": symbol, "count": count} for symbol, count in most_active]
                 }
                 
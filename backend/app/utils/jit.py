@@ -0,0 +1,26 @@
+"""
+Optional Numba JIT support.
+
+Numba is not a hard dependency. When it is missing, ``njit`` is a no-op
+decorator and ``prange`` is ``range``, so decorated functions run as plain
+Python with identical results.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback for ``numba.njit`` that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+__all__ = ["njit", "prange", "NUMBA_AVAILABLE"]
@@ -26,6 +26,9 @@ CREATE TABLE IF NOT EXISTS backtest_results (
     trades JSONB NOT NULL,
     performance JSONB NOT NULL,
     settings_used JSONB NOT NULL,
+    trade_count INTEGER,
+    win_rate DOUBLE PRECISION,
+    total_return DOUBLE PRECISION,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -50,6 +53,9 @@ CREATE TABLE IF NOT EXISTS trades (
 CREATE INDEX IF NOT EXISTS idx_scan_results_timestamp ON scan_results(timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_backtest_results_timestamp ON backtest_results(timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_backtest_results_date_range ON backtest_results(start_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_backtest_results_trade_count ON backtest_results(trade_count);
+CREATE INDEX IF NOT EXISTS idx_backtest_results_win_rate ON backtest_results(win_rate);
+CREATE INDEX IF NOT EXISTS idx_backtest_results_total_return ON backtest_results(total_return);
 CREATE INDEX IF NOT EXISTS idx_trades_backtest_id ON trades(backtest_id);
 CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol);
 CREATE INDEX IF NOT EXISTS idx_trades_entry_date ON trades(entry_date);
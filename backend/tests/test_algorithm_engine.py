@@ -3,13 +3,18 @@ Unit tests for the algorithm engine signal generation logic.
 Tests various market scenarios and edge cases.
 """
 
+import logging
+
 import pytest
-from datetime import datetime, timedelta
+from dataclasses import astuple
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
-from backend.app.services.algorithm_engine import AlgorithmEngine
+import numpy as np
+
+from backend.app.services.algorithm_engine import AlgorithmEngine, _SettingsCache, _decode_analysis
 from backend.app.models.market_data import MarketData, TechnicalIndicators
-from backend.app.models.signals import Signal, AlgorithmSettings
+from backend.app.models.signals import Signal, SignalArray, AlgorithmSettings
 from backend.app.indicators.technical_indicators import InsufficientDataError, IndicatorCalculationError
 
 
@@ -232,8 +237,10 @@ class TestEMATrends:
             atr=2.0, atr_long_line=98.2, atr_short_line=106.2
         )
         
-        historical_indicators = [previous, current]
-        result = self.engine._check_rising_emas(historical_indicators, self.settings)
+        result = self.engine._check_rising_emas(
+            current.ema5, previous.ema5, current.ema8, previous.ema8,
+            current.ema21, previous.ema21, self.settings
+        )
         assert result is True
     
     def test_rising_emas_insufficient_rise(self):
@@ -252,8 +259,10 @@ class TestEMATrends:
             atr=2.0, atr_long_line=97.0, atr_short_line=105.0
         )
         
-        historical_indicators = [previous, current]
-        result = self.engine._check_rising_emas(historical_indicators, self.settings)
+        result = self.engine._check_rising_emas(
+            current.ema5, previous.ema5, current.ema8, previous.ema8,
+            current.ema21, previous.ema21, self.settings
+        )
         assert result is False
     
     def test_falling_emas_valid(self):
@@ -272,8 +281,10 @@ class TestEMATrends:
             atr=2.0, atr_long_line=93.9, atr_short_line=101.9
         )
         
-        historical_indicators = [previous, current]
-        result = self.engine._check_falling_emas(historical_indicators, self.settings)
+        result = self.engine._check_falling_emas(
+            current.ema5, previous.ema5, current.ema8, previous.ema8,
+            current.ema21, previous.ema21, self.settings
+        )
         assert result is True
     
     def test_insufficient_historical_data(self):
@@ -283,11 +294,16 @@ class TestEMATrends:
             atr=2.0, atr_long_line=96.0, atr_short_line=104.0
         )]
         
-        result = self.engine._check_rising_emas(indicators, self.settings)
-        assert result is False
+        assert AlgorithmEngine._trend_emas(indicators) is None
         
-        result = self.engine._check_falling_emas(indicators, self.settings)
-        assert result is False
+        market_data = MarketData(
+            symbol="AAPL", timestamp=datetime.now(),
+            open=99.0, high=101.0, low=98.5, close=100.0, volume=1000000
+        )
+        self.engine.evaluate_long_conditions(
+            market_data, indicators[0], indicators, None, None, self.settings
+        )
+        assert "EMAs not rising sufficiently" in self.engine.get_last_analysis()['rejection_reasons']
 
 
 class TestFilters:
@@ -352,6 +368,33 @@ class TestFilters:
         result = self.engine._check_volatility_filter(indicators, self.settings)
         assert result is False
 
+    
+    def test_volatility_filter_zero_never_passes(self):
+        """Test a zero volatility filter fails instead of raising"""
+        indicators = TechnicalIndicators(
+            ema5=150.5, ema8=149.5, ema13=149.0, ema21=149.8, ema50=148.5,
+            atr=50.0, atr_long_line=147.0, atr_short_line=155.0
+        )
+        
+        settings = AlgorithmSettings(volatility_filter=0.0)
+        assert self.engine._check_volatility_filter(indicators, settings) is False
+    
+    def test_filters_accept_derived_settings(self):
+        """Test filters give the same result for precomputed settings"""
+        market_data = MarketData(
+            symbol="AAPL", timestamp=datetime.now(),
+            open=149.0, high=151.0, low=148.5, close=150.0, volume=1000000
+        )
+        indicators = TechnicalIndicators(
+            ema5=150.5, ema8=149.5, ema13=149.0, ema21=149.8, ema50=148.5,
+            atr=0.6, atr_long_line=147.0, atr_short_line=155.0
+        )
+        derived = _SettingsCache.of(self.settings)
+        
+        assert _SettingsCache.of(derived) is derived
+        assert self.engine._check_volatility_filter(indicators, derived) is False
+        assert self.engine._check_fomo_filter(market_data, indicators, derived) is \
+            self.engine._check_fomo_filter(market_data, indicators, self.settings)
 
 class TestHigherTimeframeConfirmation:
     """Test higher timeframe confirmation logic"""
@@ -647,6 +690,426 @@ class TestSignalGeneration:
         assert len(signals) == 0  # No valid signals
 
 
+class TestSeriesEvaluation:
+    """Test vectorized condition evaluation against the per-bar API"""
+    
+    def setup_method(self):
+        self.engine = AlgorithmEngine()
+        self.settings = AlgorithmSettings(
+            ema5_rising_threshold=0.001, ema8_rising_threshold=0.001,
+            ema21_rising_threshold=0.001, volatility_filter=1.0, fomo_filter=1.5
+        )
+    
+    @pytest.mark.parametrize("direction", ["long", "short"])
+    def test_series_matches_per_bar(self, direction):
+        """Test series results equal evaluate_*_conditions for every bar"""
+        rng = np.random.default_rng(7)
+        n = 200
+        close = 100 + rng.normal(0, 2, n)
+        open_ = close + rng.normal(0, 1, n)
+        ema5, ema8, ema21 = (close + rng.normal(0, 1.5, n) for _ in range(3))
+        ema5_prev, ema8_prev, ema21_prev = (e * (1 + rng.normal(0, 0.003, n)) for e in (ema5, ema8, ema21))
+        atr = rng.uniform(0.5, 3.0, n)
+        htf_close, htf_open, htf_ema5, htf_ema8 = (100 + rng.normal(0, 2, n) for _ in range(4))
+        
+        def indicators(i, e5, e8, e21):
+            return TechnicalIndicators(
+                ema5=e5[i], ema8=e8[i], ema13=e8[i], ema21=e21[i], ema50=e21[i], atr=atr[i],
+                atr_long_line=close[i] - 2 * atr[i], atr_short_line=close[i] + 2 * atr[i]
+            )
+        
+        series = getattr(self.engine, f"evaluate_{direction}_series")
+        per_bar = getattr(self.engine, f"evaluate_{direction}_conditions")
+        line = close - 2 * atr if direction == "long" else close + 2 * atr
+        valid, confidence = series(
+            close, open_, ema5, ema8, ema21, atr, line,
+            ema5_prev, ema8_prev, ema21_prev, self.settings,
+            htf_close=htf_close, htf_open=htf_open, htf_ema5=htf_ema5, htf_ema8=htf_ema8
+        )
+        
+        for i in range(n):
+            market_data = MarketData("AAPL", datetime(2024, 1, 1), open_[i], 0.0, 0.0, close[i], 0)
+            htf_market_data = MarketData("AAPL", datetime(2024, 1, 1), htf_open[i], 0.0, 0.0, htf_close[i], 0)
+            htf_indicators = TechnicalIndicators(
+                ema5=htf_ema5[i], ema8=htf_ema8[i], ema13=0.0, ema21=0.0, ema50=0.0,
+                atr=1.0, atr_long_line=0.0, atr_short_line=0.0
+            )
+            history = [indicators(i, ema5_prev, ema8_prev, ema21_prev), indicators(i, ema5, ema8, ema21)]
+            expected = per_bar(
+                market_data, history[-1], history, htf_market_data, htf_indicators, self.settings
+            )
+            assert (bool(valid[i]), confidence[i]) == expected
+    
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32])
+    @pytest.mark.parametrize("direction", ["long", "short"])
+    def test_kernel_path_matches_numpy_path(self, direction, dtype, monkeypatch):
+        """Test the loop kernels count conditions exactly like the NumPy path"""
+        from backend.app.services import algorithm_engine, _algorithm_kernels
+        
+        rng = np.random.default_rng(11)
+        n = 300
+        close = 100 + rng.normal(0, 2, n)
+        ema5, ema8, ema21 = (close + rng.normal(0, 1.5, n) for _ in range(3))
+        ema5_prev, ema8_prev, ema21_prev = (e * (1 + rng.normal(0, 0.003, n)) for e in (ema5, ema8, ema21))
+        ema8_prev[:5] = 0.0
+        atr = rng.uniform(0.5, 3.0, n)
+        line = close - 2 * atr if direction == "long" else close + 2 * atr
+        arrays = (close, close + rng.normal(0, 1, n), ema5, ema8, ema21, atr, line,
+                  ema5_prev, ema8_prev, ema21_prev)
+        args = tuple(a.astype(dtype) for a in arrays) + (self.settings,)
+        series = getattr(self.engine, f"evaluate_{direction}_series")
+        
+        expected = series(*args)
+        monkeypatch.setattr(algorithm_engine, "_aot_kernels", _algorithm_kernels)
+        actual = series(*args)
+        
+        assert np.array_equal(actual[0], expected[0])
+        assert np.array_equal(actual[1], expected[1])
+    
+    def test_float32_series_agrees_with_float64(self):
+        """Test float32 indicator series give the same signals as float64"""
+        rng = np.random.default_rng(3)
+        close = 100 + np.cumsum(rng.normal(0, 0.5, 500))
+        high = close + rng.uniform(0, 1, 500)
+        low = close - rng.uniform(0, 1, 500)
+        open_ = close + rng.normal(0, 0.5, 500)
+        
+        results = []
+        for dtype in (np.float64, np.float32):
+            s = self.engine.indicator_engine.calculate_all_indicators_series(high, low, close, dtype=dtype)
+            assert s['ema5'].dtype == dtype
+            results.append(self.engine.evaluate_long_series(
+                close[1:].astype(dtype), open_[1:].astype(dtype),
+                s['ema5'][1:], s['ema8'][1:], s['ema21'][1:], s['atr'][1:], s['atr_long_line'][1:],
+                s['ema5'][:-1], s['ema8'][:-1], s['ema21'][:-1], self.settings
+            ))
+        
+        assert np.array_equal(results[0][0], results[1][0])
+        assert np.allclose(results[0][1], results[1][1])
+    
+    def test_series_without_htf_uses_five_conditions(self):
+        """Test confidence is out of five conditions without HTF arrays"""
+        one = np.array([1.0])
+        valid, confidence = self.engine.evaluate_long_series(
+            one * 101, one * 100, one * 100, one * 100.5, one * 100.5, one * 2.0, one * 100.5,
+            one * 99, one * 99, one * 99, self.settings
+        )
+        
+        assert valid.tolist() == [True]
+        assert confidence.tolist() == [1.0]
+
+
+class TestDiagnosticsCollection:
+    """Test condition bitmask decoding for diagnostics"""
+    
+    def _evaluate(self, engine):
+        market_data = MarketData(
+            symbol="AAPL", timestamp=datetime.now(),
+            open=149.0, high=151.0, low=148.5, close=150.0, volume=1000000
+        )
+        indicators = TechnicalIndicators(
+            ema5=150.5, ema8=149.5, ema13=149.0, ema21=149.8, ema50=148.5,
+            atr=2.0, atr_long_line=147.0, atr_short_line=155.0
+        )
+        return engine.evaluate_long_conditions(
+            market_data, indicators, [indicators], None, None, AlgorithmSettings()
+        )
+    
+    def test_analysis_labels_follow_condition_order(self):
+        """Test passed and failed labels decode in evaluation order"""
+        engine = AlgorithmEngine()
+        valid, confidence = self._evaluate(engine)
+        
+        assert valid is False
+        assert confidence == 3 / 5
+        assert engine.get_last_analysis() == {
+            'signal_type': 'long',
+            'conditions_met': 3,
+            'total_conditions': 5,
+            'rejection_reasons': [
+                "EMA5 not below ATR long line",
+                "EMAs not rising sufficiently",
+                "No HTF data available",
+            ],
+            'partial_criteria': [
+                "Bullish polar formation",
+                "FOMO filter passed",
+                "Volatility filter passed",
+            ],
+            'confidence': 3 / 5,
+            'signal_valid': False
+        }
+    
+    def test_debug_log_lists_passed_checks(self, caplog):
+        """Test the debug line is only built when DEBUG is enabled"""
+        engine = AlgorithmEngine()
+        with caplog.at_level(logging.INFO, logger="backend.app.services.algorithm_engine"):
+            self._evaluate(engine)
+        assert not [r for r in caplog.records if r.levelno == logging.DEBUG]
+        
+        with caplog.at_level(logging.DEBUG, logger="backend.app.services.algorithm_engine"):
+            self._evaluate(engine)
+        messages = [r.getMessage() for r in caplog.records if r.levelno == logging.DEBUG]
+        assert messages == [
+            "Long checks passed for AAPL: Bullish polar formation, FOMO filter passed, Volatility filter passed"
+        ]
+    
+    def test_fast_path_rejects_without_analysis(self):
+        """Test disabling diagnostics stops at the first failed condition"""
+        engine = AlgorithmEngine(collect_diagnostics=False)
+        engine._check_rising_emas = Mock(return_value=True)
+        
+        assert self._evaluate(engine) == (False, 0.0)
+        assert engine.get_last_analysis() is None
+        engine._check_rising_emas.assert_not_called()  # EMA positioning failed first
+    
+    def test_fast_path_valid_signal_matches_eager(self):
+        """Test a valid signal gives the same result and analysis either way"""
+        market_data = MarketData(
+            symbol="AAPL", timestamp=datetime.now(),
+            open=149.0, high=151.0, low=148.5, close=150.0, volume=1000000
+        )
+        previous = TechnicalIndicators(
+            ema5=130.0, ema8=140.0, ema13=140.0, ema21=140.0, ema50=140.0,
+            atr=2.0, atr_long_line=146.0, atr_short_line=154.0
+        )
+        current = TechnicalIndicators(
+            ema5=140.0, ema8=149.5, ema13=149.0, ema21=149.8, ema50=148.5,
+            atr=2.0, atr_long_line=146.0, atr_short_line=154.0
+        )
+        results = []
+        for engine in (AlgorithmEngine(), AlgorithmEngine(collect_diagnostics=False)):
+            outcome = engine.evaluate_long_conditions(
+                market_data, current, [previous, current], None, None, AlgorithmSettings()
+            )
+            results.append((outcome, engine.get_last_analysis()))
+        
+        assert results[0] == results[1]
+        assert results[0][0] == (True, 1.0)
+    
+    def test_no_htf_variant_skips_htf_check(self):
+        """Test evaluation without HTF data never reaches the HTF check"""
+        engine = AlgorithmEngine()
+        engine._check_higher_timeframe_confirmation_long = Mock(return_value=True)
+        engine._evaluate_long_with_htf = Mock()
+        
+        self._evaluate(engine)
+        
+        engine._evaluate_long_with_htf.assert_not_called()
+        engine._check_higher_timeframe_confirmation_long.assert_not_called()
+        assert engine.get_last_analysis()['total_conditions'] == 5
+
+    def test_analysis_decoded_on_request(self):
+        """Test the analysis dictionary is built lazily and only once"""
+        engine = AlgorithmEngine()
+        
+        with patch('backend.app.services.algorithm_engine._decode_analysis',
+                   wraps=_decode_analysis) as decode:
+            self._evaluate(engine)
+            self._evaluate(engine)
+            decode.assert_not_called()
+            
+            first = engine.get_last_analysis()
+            assert engine.get_last_analysis() is first
+            decode.assert_called_once()
+
+class TestIndicatorStateCache:
+    """Test incremental indicator updates across generate_signals calls"""
+    
+    def _bars(self, count):
+        bars = []
+        price = 100.0
+        for i in range(count):
+            close = price * (1.01 if i % 3 else 0.995)
+            bars.append(MarketData(
+                symbol="AAPL", timestamp=datetime(2024, 1, 1) + timedelta(minutes=i),
+                open=price, high=max(price, close) + 0.5, low=min(price, close) - 0.5,
+                close=close, volume=1000
+            ))
+            price = close
+        return bars
+    
+    def _capture_indicators(self, engine):
+        captured = []
+        
+        def evaluate(market_data, indicators, historical_indicators, *args, **kwargs):
+            captured.append(list(historical_indicators))
+            return False, 0.0
+        
+        engine.evaluate_long_conditions = evaluate
+        engine.evaluate_short_conditions = Mock(return_value=(False, 0.0))
+        return captured
+    
+    def test_next_bar_and_repeated_tick_skip_full_recalculation(self):
+        """Test a history extended by the last bar reuses the cached state"""
+        bars = self._bars(80)
+        engine = AlgorithmEngine()
+        captured = self._capture_indicators(engine)
+        settings = AlgorithmSettings()
+        
+        series_spy = Mock(wraps=engine.indicator_engine.calculate_all_indicators_series)
+        engine.indicator_engine.calculate_all_indicators_series = series_spy
+        
+        # Next bar, then the same history with a new tick
+        calls = ((bars[60], bars[:60]), (bars[61], bars[:61]), (bars[62], bars[:61]))
+        expected = []
+        for market_data, history in calls:
+            engine.generate_signals(market_data, history, settings=settings)
+            reference = AlgorithmEngine()
+            reference_captured = self._capture_indicators(reference)
+            reference.generate_signals(market_data, history, settings=settings)
+            expected.extend(reference_captured)
+        
+        assert series_spy.call_count == 1
+        assert len(captured) == 3
+        assert captured == expected
+    
+    def test_indexed_generation_matches_sliced_history(self):
+        """Test generate_signals_indexed equals generate_signals on a slice"""
+        bars = self._bars(80)
+        engine = AlgorithmEngine()
+        captured = self._capture_indicators(engine)
+        reference = AlgorithmEngine()
+        expected = self._capture_indicators(reference)
+        
+        for index in range(55, 80):
+            engine.generate_signals_indexed(bars, index)
+            reference.generate_signals(bars[index], bars[:index])
+        
+        assert len(captured) == 25
+        assert captured == expected
+    
+    def test_indexed_htf_matches_sliced_htf_history(self):
+        """Test HTF bars passed by index give the sliced-history indicators incrementally"""
+        bars = self._bars(80)
+        htf_bars = self._bars(200)
+        
+        def capture_htf(engine):
+            captured = []
+            
+            def evaluate(market_data, indicators, historical_indicators, htf_market_data,
+                         htf_indicators, *args, **kwargs):
+                captured.append(htf_indicators)
+                return False, 0.0
+            
+            engine.evaluate_long_conditions = evaluate
+            engine.evaluate_short_conditions = Mock(return_value=(False, 0.0))
+            return captured
+        
+        engine = AlgorithmEngine()
+        captured = capture_htf(engine)
+        reference = AlgorithmEngine()
+        expected = capture_htf(reference)
+        series_spy = Mock(wraps=engine.indicator_engine.calculate_all_indicators_series)
+        engine.indicator_engine.calculate_all_indicators_series = series_spy
+        
+        # Several HTF bars per bar, each bar confirming with the last one and
+        # its history ending before the first one
+        for index in range(55, 80):
+            htf_index = 60 + 4 * (index - 55) + 3
+            htf_end = htf_index - 3
+            engine.generate_signals_indexed(
+                bars, index, htf_data=htf_bars, htf_index=htf_index, htf_end=htf_end
+            )
+            reference.generate_signals(
+                bars[index], bars[:index],
+                htf_market_data=htf_bars[htf_index], htf_historical_data=htf_bars[:htf_end]
+            )
+        
+        # One full pass per series; every later bar extends the cached states
+        assert series_spy.call_count == 2
+        assert len(captured) == 25
+        for actual, reference_indicators in zip(captured, expected):
+            assert astuple(actual) == pytest.approx(astuple(reference_indicators), rel=1e-12)
+    
+    def test_direction_agnostic_filters_evaluated_once(self):
+        """Test FOMO and volatility filters run once for both directions"""
+        bars = self._bars(80)
+        engine = AlgorithmEngine()
+        engine._check_fomo_filter = Mock(return_value=True)
+        engine._check_volatility_filter = Mock(return_value=False)
+        
+        engine.generate_signals(bars[60], bars[:60], settings=AlgorithmSettings())
+        
+        assert engine._check_fomo_filter.call_count == 1
+        assert engine._check_volatility_filter.call_count == 1
+        assert "Failed volatility filter" in engine.get_last_analysis()['rejection_reasons']
+    
+    def test_unrelated_history_recalculates(self):
+        """Test a history that does not match the cache is recomputed"""
+        bars = self._bars(80)
+        engine = AlgorithmEngine()
+        self._capture_indicators(engine)
+        series_spy = Mock(wraps=engine.indicator_engine.calculate_all_indicators_series)
+        engine.indicator_engine.calculate_all_indicators_series = series_spy
+        
+        engine.generate_signals(bars[60], bars[:60], settings=AlgorithmSettings())
+        engine.generate_signals(bars[70], bars[5:70], settings=AlgorithmSettings())
+        
+        assert series_spy.call_count == 2
+
+
+class TestSignalBatch:
+    """Test whole-history signal generation into a SignalArray"""
+    
+    def setup_method(self):
+        self.engine = AlgorithmEngine()
+        self.settings = AlgorithmSettings(
+            atr_multiplier=0.1, ema5_rising_threshold=0.0, ema8_rising_threshold=0.0,
+            ema21_rising_threshold=0.0, volatility_filter=100.0, fomo_filter=5.0
+        )
+    
+    def _history(self, n, tz=None):
+        rng = np.random.default_rng(5)
+        close = 100 + np.cumsum(rng.normal(0, 1, n))
+        open_ = close - rng.normal(0, 0.8, n)
+        return [
+            MarketData("AAPL", datetime(2024, 1, 1, tzinfo=tz) + timedelta(days=i), open_[i],
+                       max(open_[i], close[i]) + 0.5, min(open_[i], close[i]) - 0.5, close[i], 1000)
+            for i in range(n)
+        ]
+    
+    @pytest.mark.parametrize("tz", [None, timezone.utc])
+    def test_batch_matches_per_bar_generation(self, tz):
+        """Test the batch holds exactly the per-bar generate_signals results"""
+        data = self._history(200, tz)
+        expected = []
+        for i in range(len(data)):
+            expected.extend(self.engine.generate_signals(data[i], data[:i], settings=self.settings))
+        
+        batch = self.engine.generate_signals_batch(data, self.settings)
+        
+        assert len(batch) == len(expected) > 0
+        assert batch.confidences.dtype == np.float64
+        assert batch.confidences.tolist() == [signal.confidence for signal in expected]
+        assert set(batch.types.tolist()) == {SignalArray.LONG, SignalArray.SHORT}
+        assert batch.to_signals() == expected
+    
+    def test_to_signals_keeps_exact_confidences(self):
+        """Test materialized confidences equal the computed fractions"""
+        batch = SignalArray(
+            symbol="AAPL",
+            bar_indices=np.array([3], dtype=np.int64),
+            timestamps=np.array([0], dtype=np.int64),
+            prices=np.array([150.0]),
+            confidences=np.array([4]) / 5,
+            types=np.array([SignalArray.LONG], dtype=np.int8),
+            indicators={name: np.array([1.0]) for name in (
+                'ema5', 'ema8', 'ema13', 'ema21', 'ema50', 'atr', 'atr_long_line', 'atr_short_line'
+            )}
+        )
+        
+        assert batch.to_signals()[0].confidence == 0.8
+    
+    def test_batch_with_insufficient_data(self):
+        """Test short histories give an empty batch"""
+        batch = self.engine.generate_signals_batch(self._history(51), self.settings)
+        
+        assert len(batch) == 0
+        assert batch.to_signals() == []
+        assert len(self.engine.generate_signals_batch([], self.settings)) == 0
+
+
 class TestErrorHandling:
     """Test error handling in algorithm engine"""
     
@@ -674,6 +1137,37 @@ class TestErrorHandling:
         result = self.engine._check_polar_formation_short(market_data, indicators)
         assert result is False
     
+    def test_zero_previous_ema_fails_trend_checks(self):
+        """Test rising/falling checks reject a zero previous EMA without raising"""
+        previous = TechnicalIndicators(
+            ema5=0.0, ema8=149.5, ema13=149.0, ema21=148.5, ema50=148.0,
+            atr=2.0, atr_long_line=147.0, atr_short_line=155.0
+        )
+        current = TechnicalIndicators(
+            ema5=150.0, ema8=150.5, ema13=149.0, ema21=149.5, ema50=148.0,
+            atr=2.0, atr_long_line=147.0, atr_short_line=155.0
+        )
+        
+        emas = AlgorithmEngine._trend_emas([previous, current])
+        assert self.engine._check_rising_emas(*emas, self.settings) is False
+        assert self.engine._check_falling_emas(*emas, self.settings) is False
+    
+    def test_evaluate_conditions_records_predicate_errors(self):
+        """Test predicate errors surface once in the evaluate_* analysis"""
+        market_data = MarketData(
+            symbol="AAPL", timestamp=datetime.now(),
+            open=149.0, high=151.0, low=148.5, close=150.0, volume=1000000
+        )
+        
+        valid, confidence = self.engine.evaluate_long_conditions(
+            market_data, None, [], None, None, self.settings
+        )
+        
+        assert (valid, confidence) == (False, 0.0)
+        analysis = self.engine.get_last_analysis()
+        assert analysis['signal_valid'] is False
+        assert analysis['rejection_reasons'][0].startswith("Algorithm error:")
+    
     def test_signal_generation_error_handling(self):
         """Test error handling in signal generation"""
         market_data = MarketData(
@@ -349,6 +349,10 @@ class TestBacktestEndpoints:
         assert filters.min_trades == 1
         assert filters.min_win_rate == 0.5
         assert filters.limit == 25
+        assert mock_get_history.call_args.kwargs['include_trades'] is False
+        
+        client.get("/backtest/history?include_trades=true")
+        assert mock_get_history.call_args.kwargs['include_trades'] is True
 
 
 class TestSettingsEndpoints:
@@ -3,16 +3,23 @@ Unit tests for the backtest service.
 """
 import pytest
 import asyncio
+import statistics
+import threading
+import time
+import uuid
 from datetime import datetime, date, timedelta
 from unittest.mock import Mock, patch, AsyncMock
 from typing import List
 
-from backend.app.services.backtest_service import BacktestService, BacktestFilters, TradeSimulation
+import numpy as np
+
+from backend.app.services.backtest_service import BacktestService, BacktestFilters, TradeSimulation, _OpenPosition
 from backend.app.services.data_service import DataService
 from backend.app.services.algorithm_engine import AlgorithmEngine
 from backend.app.models.market_data import MarketData, TechnicalIndicators
 from backend.app.models.signals import Signal, AlgorithmSettings
 from backend.app.models.results import BacktestResult, Trade, PerformanceMetrics
+from backend.app.models.database_models import TradeDB
 
 
 @pytest.fixture
@@ -28,6 +35,18 @@ def mock_algorithm_engine():
     """Mock algorithm engine for testing."""
     engine = Mock(spec=AlgorithmEngine)
     engine.generate_signals = Mock()
+    
+    def generate_signals_indexed(data, index, htf_data=None, htf_index=-1, htf_end=None,
+                                 settings=None):
+        has_htf = htf_data is not None and htf_index >= 0
+        return engine.generate_signals(
+            market_data=data[index], historical_data=data[:index],
+            htf_market_data=htf_data[htf_index] if has_htf else None,
+            htf_historical_data=list(htf_data[:htf_end]) if has_htf else [],
+            settings=settings
+        )
+    
+    engine.generate_signals_indexed = Mock(side_effect=generate_signals_indexed)
     return engine
 
 
@@ -212,6 +231,196 @@ class TestBacktestService:
             assert len(result.trades) == 0
             assert result.performance.total_trades == 0
     
+    @pytest.mark.asyncio
+    async def test_run_backtest_fetches_timeframes_concurrently(self, mock_data_service,
+                                                                mock_algorithm_engine):
+        """Test the daily and higher timeframe fetches are in flight together."""
+        events = []
+        
+        async def fetch(symbols, start_date, end_date, interval="1d"):
+            events.append(('start', interval))
+            await asyncio.sleep(0)
+            events.append(('end', interval))
+            return {"AAPL": []}
+        
+        mock_data_service.fetch_historical_data.side_effect = fetch
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        
+        with patch.object(service, '_save_backtest_result', new_callable=AsyncMock):
+            await service.run_backtest(
+                ["AAPL"], date(2024, 1, 1), date(2024, 1, 31),
+                settings=AlgorithmSettings(higher_timeframe="4h")
+            )
+        
+        assert events[:2] == [('start', '1d'), ('start', '4h')]
+        assert len(events) == 4
+    
+    @pytest.mark.asyncio
+    async def test_run_backtest_symbols_concurrently_in_order(self, mock_data_service,
+                                                              mock_algorithm_engine,
+                                                              sample_historical_data):
+        """Test symbols run on the thread pool and trades keep symbol order."""
+        symbols = ["AAPL", "MSFT", "GOOGL"]
+        mock_data_service.fetch_historical_data.return_value = {
+            symbol: sample_historical_data for symbol in symbols
+        }
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        threads = set()
+        
+        def backtest_symbol(symbol, *args):
+            threads.add(threading.get_ident())
+            time.sleep(0.01 * (len(symbols) - symbols.index(symbol)))  # First symbol finishes last
+            return [Trade(symbol, datetime(2024, 1, 1), 1.0, datetime(2024, 1, 2), 1.0, "long", 0.0, 0.0)]
+        
+        with patch.object(service, '_backtest_symbol_sync', side_effect=backtest_symbol), \
+                patch.object(service, '_save_backtest_result', new_callable=AsyncMock):
+            result = await service.run_backtest(symbols, date(2024, 1, 1), date(2024, 4, 30))
+        
+        assert [trade.symbol for trade in result.trades] == symbols
+        assert threading.get_ident() not in threads
+    
+    @pytest.mark.asyncio
+    async def test_run_backtest_duplicate_symbols_run_once(self, mock_data_service,
+                                                           mock_algorithm_engine,
+                                                           sample_historical_data):
+        """Test a repeated symbol is backtested once, not in two concurrent threads."""
+        mock_data_service.fetch_historical_data.return_value = {
+            symbol: sample_historical_data for symbol in ["AAPL", "MSFT"]
+        }
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        
+        with patch.object(service, '_backtest_symbol_sync', return_value=[]) as backtest_symbol, \
+                patch.object(service, '_save_backtest_result', new_callable=AsyncMock):
+            result = await service.run_backtest(
+                ["AAPL", "aapl ", "MSFT", "AAPL"], date(2024, 1, 1), date(2024, 4, 30)
+            )
+        
+        assert [call.args[0] for call in backtest_symbol.call_args_list] == ["AAPL", "MSFT"]
+        assert result.symbols == ["AAPL", "MSFT"]
+    
+    @pytest.mark.asyncio
+    async def test_backtest_symbol_htf_history_before_current_date(self, mock_data_service,
+                                                                   mock_algorithm_engine,
+                                                                   sample_historical_data):
+        """Test each bar only sees HTF bars from earlier dates."""
+        htf_data = [
+            MarketData(
+                symbol="AAPL",
+                timestamp=datetime(2024, 1, 1) + timedelta(hours=4 * i),
+                open=150.0, high=152.0, low=149.0, close=151.0, volume=1000
+            ) for i in range(6 * 100)
+        ]
+        mock_algorithm_engine.generate_signals.return_value = []
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        
+        await service._backtest_symbol(
+            "AAPL", sample_historical_data, htf_data, AlgorithmSettings(), TradeSimulation()
+        )
+        
+        for call in mock_algorithm_engine.generate_signals.call_args_list:
+            current_date = call.kwargs['market_data'].timestamp.date()
+            expected = [d for d in htf_data if d.timestamp.date() < current_date]
+            assert call.kwargs['htf_historical_data'] == expected
+            assert call.kwargs['htf_market_data'].timestamp.date() == current_date
+        assert mock_algorithm_engine.generate_signals.call_count == 50
+    
+    @pytest.mark.asyncio
+    async def test_backtest_symbol_htf_forward_fills_coarser_bars(self, mock_data_service,
+                                                                  mock_algorithm_engine,
+                                                                  sample_historical_data):
+        """Test dates without an HTF bar reuse the latest earlier one."""
+        # Weekly bars, starting after the first daily bars
+        htf_data = [
+            MarketData(
+                symbol="AAPL",
+                timestamp=datetime(2024, 1, 3) + timedelta(weeks=i),
+                open=150.0, high=152.0, low=149.0, close=151.0, volume=1000
+            ) for i in range(20)
+        ]
+        mock_algorithm_engine.generate_signals.return_value = []
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        
+        await service._backtest_symbol(
+            "AAPL", sample_historical_data, htf_data, AlgorithmSettings(), TradeSimulation()
+        )
+        
+        calls = mock_algorithm_engine.generate_signals.call_args_list
+        assert len(calls) == 50
+        for call in calls:
+            current_date = call.kwargs['market_data'].timestamp.date()
+            expected = [d for d in htf_data if d.timestamp.date() <= current_date][-1]
+            assert call.kwargs['htf_market_data'] is expected
+            assert call.kwargs['htf_historical_data'] == htf_data[:htf_data.index(expected)]
+        
+        # Without any HTF bar at or before the date there is nothing to confirm with
+        mock_algorithm_engine.generate_signals.reset_mock()
+        await service._backtest_symbol(
+            "AAPL", sample_historical_data, htf_data[-1:], AlgorithmSettings(), TradeSimulation()
+        )
+        for call in mock_algorithm_engine.generate_signals.call_args_list:
+            if call.kwargs['market_data'].timestamp < htf_data[-1].timestamp:
+                assert call.kwargs['htf_market_data'] is None
+                assert call.kwargs['htf_historical_data'] == []
+    
+    @pytest.mark.asyncio
+    async def test_backtest_symbol_multi_day_htf_has_no_look_ahead(self, mock_data_service,
+                                                                  mock_algorithm_engine,
+                                                                  sample_historical_data):
+        """Test weekly bars only confirm once their week has closed."""
+        # Stamped at the start of each week but carrying that week's close
+        htf_data = [
+            MarketData(
+                symbol="AAPL",
+                timestamp=datetime(2024, 1, 1) + timedelta(weeks=i),
+                open=150.0, high=152.0, low=149.0, close=151.0, volume=1000
+            ) for i in range(20)
+        ]
+        mock_algorithm_engine.generate_signals.return_value = []
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        
+        await service._backtest_symbol(
+            "AAPL", sample_historical_data, htf_data,
+            AlgorithmSettings(higher_timeframe="1wk"), TradeSimulation()
+        )
+        
+        calls = mock_algorithm_engine.generate_signals.call_args_list
+        assert len(calls) == 50
+        for call in calls:
+            current = call.kwargs['market_data'].timestamp
+            completed = [d for d in htf_data if d.timestamp + timedelta(weeks=1) <= current]
+            # The latest week that ended by the bar's date, never the running one
+            assert call.kwargs['htf_market_data'] is completed[-1]
+            assert call.kwargs['htf_historical_data'] == completed[:-1]
+    
+    @pytest.mark.asyncio
+    async def test_backtest_symbol_without_htf_uses_signal_batch(self, mock_data_service):
+        """Test the vectorized batch gives the same trades as per-bar generation"""
+        rng = np.random.default_rng(5)
+        close = 100 + np.cumsum(rng.normal(0, 1, 250))
+        open_ = close - rng.normal(0, 0.8, 250)
+        data = [
+            MarketData("AAPL", datetime(2024, 1, 1) + timedelta(days=i), open_[i],
+                       max(open_[i], close[i]) + 0.5, min(open_[i], close[i]) - 0.5, close[i], 1000)
+            for i in range(250)
+        ]
+        settings = AlgorithmSettings(
+            atr_multiplier=0.1, ema5_rising_threshold=0.0, ema8_rising_threshold=0.0,
+            ema21_rising_threshold=0.0, volatility_filter=100.0, fomo_filter=5.0
+        )
+        
+        batch_engine = AlgorithmEngine(collect_diagnostics=False)
+        batch_engine.generate_signals_indexed = Mock(wraps=batch_engine.generate_signals_indexed)
+        batch_trades = await BacktestService(mock_data_service, batch_engine)._backtest_symbol(
+            "AAPL", data, [], settings, TradeSimulation()
+        )
+        per_bar_trades = await BacktestService(mock_data_service, AlgorithmEngine())._backtest_symbol(
+            "AAPL", data, [], settings, TradeSimulation()
+        )
+        
+        batch_engine.generate_signals_indexed.assert_not_called()
+        assert len(batch_trades) > 0
+        assert batch_trades == per_bar_trades
+    
     def test_calculate_performance_metrics_empty_trades(self, mock_data_service, mock_algorithm_engine):
         """Test performance metrics calculation with no trades."""
         service = BacktestService(mock_data_service, mock_algorithm_engine)
@@ -275,6 +484,39 @@ class TestBacktestService:
         assert abs(metrics.average_return - 0.0267) < 0.001  # Average pnl_percent: 0.0802 / 3
         assert metrics.max_drawdown >= 0.0
         assert metrics.sharpe_ratio != 0.0
+        
+        # Same figures as the standalone helpers
+        assert metrics.max_drawdown == pytest.approx(service._calculate_max_drawdown(trades))
+        assert metrics.sharpe_ratio == pytest.approx(
+            service._calculate_sharpe_ratio([t.pnl_percent for t in trades])
+        )
+    
+    def test_calculate_performance_metrics_uses_kernels(self, mock_data_service, mock_algorithm_engine):
+        """Test real backtest metrics run through the compiled drawdown and Sharpe kernels."""
+        from backend.app.models import results
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        trades = [
+            Trade(
+                symbol="AAPL",
+                entry_date=datetime(2024, 1, day),
+                entry_price=100.0,
+                exit_date=datetime(2024, 1, day + 1),
+                exit_price=100.0 * (1 + pnl_percent),
+                trade_type="long",
+                pnl=100.0 * pnl_percent,
+                pnl_percent=pnl_percent
+            )
+            for day, pnl_percent in ((1, 0.10), (3, -0.10), (5, -0.10))
+        ]
+        
+        with patch.object(results, 'NUMBA_AVAILABLE', True), \
+                patch.object(results, '_max_drawdown_kernel', wraps=results._max_drawdown_kernel) as drawdown, \
+                patch.object(results, '_sharpe_ratio_kernel', wraps=results._sharpe_ratio_kernel) as sharpe:
+            metrics = service.calculate_performance_metrics(trades)
+        
+        assert drawdown.call_args.args[0].tolist() == [0.10, -0.10, -0.10]
+        sharpe.assert_called_once()
+        assert metrics.max_drawdown == pytest.approx(0.20)
     
     def test_calculate_max_drawdown(self, mock_data_service, mock_algorithm_engine):
         """Test maximum drawdown calculation."""
@@ -340,6 +582,30 @@ class TestBacktestService:
         sharpe_zero_std = service._calculate_sharpe_ratio([0.05, 0.05, 0.05])
         assert sharpe_zero_std == 0.0
     
+    def test_calculate_sharpe_ratio_matches_statistics(self, mock_data_service, mock_algorithm_engine):
+        """Test the one-pass Sharpe ratio agrees with mean / sample stdev."""
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        returns = [0.05, -0.02, 0.031, 0.0, -0.047, 0.12, 0.008]
+        
+        expected = statistics.mean(returns) / statistics.stdev(returns)
+        assert service._calculate_sharpe_ratio(returns) == pytest.approx(expected, rel=1e-12)
+    
+    @pytest.mark.parametrize("numba_available", [True, False])
+    @pytest.mark.parametrize("returns,expected", [
+        ([], 0.0),
+        ([0.05], 0.0),
+        ([0.05, 0.05, 0.05], 0.0),
+        ([0.1] * 7, 0.0),
+        ([0.05, -0.02, 0.031], statistics.mean([0.05, -0.02, 0.031]) / statistics.stdev([0.05, -0.02, 0.031])),
+    ])
+    def test_calculate_sharpe_ratio_paths_agree(self, mock_data_service, mock_algorithm_engine,
+                                                numba_available, returns, expected):
+        """Test the Welford kernel and the NumPy fallback give the same ratio."""
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        
+        with patch('backend.app.models.results.NUMBA_AVAILABLE', numba_available):
+            assert service._calculate_sharpe_ratio(returns) == pytest.approx(expected, rel=1e-12)
+    
     def test_should_open_position(self, mock_data_service, mock_algorithm_engine):
         """Test position opening logic."""
         service = BacktestService(mock_data_service, mock_algorithm_engine)
@@ -389,11 +655,13 @@ class TestBacktestService:
         service = BacktestService(mock_data_service, mock_algorithm_engine)
         
         # Long position
-        long_position = {
-            'trade_type': 'long',
-            'entry_price': 150.0,
-            'entry_date': datetime.now()
-        }
+        long_position = _OpenPosition(
+            symbol='AAPL',
+            trade_type='long',
+            entry_date=datetime.now(),
+            entry_price=150.0,
+            signal_confidence=0.8
+        )
         
         # Short signal should close long position
         short_signal = Signal(
@@ -426,18 +694,23 @@ class TestBacktestService:
         
         simulation_config = TradeSimulation()
         
-        assert service._should_close_position(long_position, short_signal, market_data, simulation_config) == True
+        assert service._should_close_position(
+            long_position, short_signal, market_data.close,
+            simulation_config.stop_loss_percent, simulation_config.take_profit_percent
+        ) == True
     
     def test_should_close_position_stop_loss(self, mock_data_service, mock_algorithm_engine):
         """Test position closing on stop loss."""
         service = BacktestService(mock_data_service, mock_algorithm_engine)
         
         # Long position
-        long_position = {
-            'trade_type': 'long',
-            'entry_price': 150.0,
-            'entry_date': datetime.now()
-        }
+        long_position = _OpenPosition(
+            symbol='AAPL',
+            trade_type='long',
+            entry_date=datetime.now(),
+            entry_price=150.0,
+            signal_confidence=0.8
+        )
         
         # Neutral signal (no close signal)
         neutral_signal = Signal(
@@ -473,22 +746,59 @@ class TestBacktestService:
         simulation_config = TradeSimulation(stop_loss_percent=0.05)
         
         # Should close due to stop loss
-        assert service._should_close_position(long_position, neutral_signal, market_data, simulation_config) == True
+        assert service._should_close_position(
+            long_position, neutral_signal, market_data.close,
+            simulation_config.stop_loss_percent, simulation_config.take_profit_percent
+        ) == True
         
         # Should not close with higher stop loss
         simulation_config.stop_loss_percent = 0.10
-        assert service._should_close_position(long_position, neutral_signal, market_data, simulation_config) == False
+        assert service._should_close_position(
+            long_position, neutral_signal, market_data.close,
+            simulation_config.stop_loss_percent, simulation_config.take_profit_percent
+        ) == False
+    
+    @pytest.mark.parametrize("trade_type,price,stop_loss,take_profit,expected", [
+        ('long', 94.0, 0.05, None, True),
+        ('long', 96.0, 0.05, None, False),
+        ('long', 111.0, None, 0.10, True),
+        ('long', 109.0, None, 0.10, False),
+        ('short', 106.0, 0.05, None, True),
+        ('short', 104.0, 0.05, 0.10, False),
+        ('short', 89.0, None, 0.10, True),
+        ('short', 111.0, None, 0.10, False),
+        ('long', 50.0, None, None, False),
+    ])
+    def test_should_close_position_thresholds(self, mock_data_service, mock_algorithm_engine,
+                                              trade_type, price, stop_loss, take_profit, expected):
+        """Test stop loss and take profit for both position directions."""
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        position = _OpenPosition(
+            symbol='AAPL',
+            trade_type=trade_type,
+            entry_date=datetime(2024, 1, 1),
+            entry_price=100.0,
+            signal_confidence=0.8
+        )
+        # Same-direction signal, so only the price thresholds can close
+        signal = Mock(signal_type=trade_type)
+        
+        assert service._should_close_position(
+            position, signal, price, stop_loss, take_profit
+        ) == expected
     
     def test_should_close_position_timeout(self, mock_data_service, mock_algorithm_engine):
         """Test position closing on timeout."""
         service = BacktestService(mock_data_service, mock_algorithm_engine)
         
         # Position opened 10 days ago
-        old_position = {
-            'trade_type': 'long',
-            'entry_price': 150.0,
-            'entry_date': datetime.now() - timedelta(days=10)
-        }
+        old_position = _OpenPosition(
+            symbol='AAPL',
+            trade_type='long',
+            entry_date=datetime.now() - timedelta(days=10),
+            entry_price=150.0,
+            signal_confidence=0.8
+        )
         
         current_data = MarketData(
             symbol="AAPL",
@@ -504,11 +814,15 @@ class TestBacktestService:
         simulation_config = TradeSimulation(max_hold_days=5)
         
         # Should close due to timeout
-        assert service._should_close_position_timeout(old_position, current_data, simulation_config) == True
+        assert service._should_close_position_timeout(
+            old_position, current_data, simulation_config.max_hold_days
+        ) == True
         
         # Should not close with longer max hold
         simulation_config.max_hold_days = 15
-        assert service._should_close_position_timeout(old_position, current_data, simulation_config) == False
+        assert service._should_close_position_timeout(
+            old_position, current_data, simulation_config.max_hold_days
+        ) == False
     
     def test_open_position(self, mock_data_service, mock_algorithm_engine):
         """Test opening a new position."""
@@ -544,26 +858,28 @@ class TestBacktestService:
         
         simulation_config = TradeSimulation(entry_delay_minutes=5)
         
-        position = service._open_position(signal, market_data, simulation_config)
+        position = service._open_position(
+            signal, market_data, timedelta(minutes=simulation_config.entry_delay_minutes)
+        )
         
-        assert position['symbol'] == "AAPL"
-        assert position['trade_type'] == "long"
-        assert position['entry_price'] == 150.5
-        assert position['signal_confidence'] == 0.8
-        assert position['entry_date'] == market_data.timestamp + timedelta(minutes=5)
+        assert position.symbol == "AAPL"
+        assert position.trade_type == "long"
+        assert position.entry_price == 150.5
+        assert position.signal_confidence == 0.8
+        assert position.entry_date == market_data.timestamp + timedelta(minutes=5)
     
     def test_close_position(self, mock_data_service, mock_algorithm_engine):
         """Test closing a position."""
         service = BacktestService(mock_data_service, mock_algorithm_engine)
         
         # Long position
-        position = {
-            'symbol': 'AAPL',
-            'trade_type': 'long',
-            'entry_date': datetime(2024, 1, 1),
-            'entry_price': 150.0,
-            'signal_confidence': 0.8
-        }
+        position = _OpenPosition(
+            symbol='AAPL',
+            trade_type='long',
+            entry_date=datetime(2024, 1, 1),
+            entry_price=150.0,
+            signal_confidence=0.8
+        )
         
         market_data = MarketData(
             symbol="AAPL",
@@ -577,7 +893,7 @@ class TestBacktestService:
         
         simulation_config = TradeSimulation(commission_per_trade=1.0)
         
-        trade = service._close_position(position, market_data, simulation_config)
+        trade = service._close_position(position, market_data, simulation_config.commission_per_trade)
         
         assert isinstance(trade, Trade)
         assert trade.symbol == "AAPL"
@@ -593,13 +909,14 @@ class TestBacktestService:
         service = BacktestService(mock_data_service, mock_algorithm_engine)
         
         # Mock database query
-        with patch('backend.app.services.backtest_service.get_session') as mock_get_session:
+        with patch('backend.app.database.SessionLocal') as mock_get_session:
             mock_db = Mock()
             mock_get_session.return_value = mock_db
             
             # Mock query result
             mock_query = Mock()
             mock_db.query.return_value = mock_query
+            mock_query.options.return_value = mock_query
             mock_query.filter.return_value = mock_query
             mock_query.order_by.return_value = mock_query
             mock_query.offset.return_value = mock_query
@@ -621,6 +938,127 @@ class TestBacktestService:
             mock_db.query.assert_called_once()
             mock_query.filter.assert_called()
             mock_query.limit.assert_called_with(10)
+    
+    @pytest.mark.asyncio
+    async def test_backtest_history_filters_in_sql(self, mock_data_service, mock_algorithm_engine):
+        """Test trade count and win rate filters are pushed into the query."""
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        
+        with patch('backend.app.database.SessionLocal') as mock_get_session:
+            mock_db = Mock()
+            mock_get_session.return_value = mock_db
+            mock_query = Mock()
+            mock_db.query.return_value = mock_query
+            mock_query.options.return_value = mock_query
+            mock_query.filter.return_value = mock_query
+            mock_query.order_by.return_value = mock_query
+            mock_query.offset.return_value = mock_query
+            mock_query.limit.return_value = mock_query
+            mock_query.all.return_value = []
+            
+            await service.get_backtest_history(BacktestFilters(min_trades=5, min_win_rate=0.6))
+        
+        clauses = [str(c.args[0].compile(compile_kwargs={'literal_binds': True}))
+                   for c in mock_query.filter.call_args_list]
+        assert clauses == [
+            'backtest_results.trade_count >= 5',
+            'backtest_results.win_rate >= 0.6'
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_get_backtest_by_id_returns_saved_trades(self, mock_data_service, mock_algorithm_engine):
+        """Test trades come back exactly as saved, from the JSONB copy."""
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        backtest_id = uuid.uuid4()
+        # Saved in exit order across symbols, with more precision than Numeric(8,4)
+        saved = [
+            Trade("MSFT", datetime(2024, 1, 3), 200.0, datetime(2024, 1, 4), 201.23456, "long", 1.23456, 0.0061728),
+            Trade("AAPL", datetime(2024, 1, 2), 100.5, datetime(2024, 1, 5), 103.0, "long", 2.5, 0.024875621890547265),
+        ]
+        db_result = Mock(
+            id=backtest_id, timestamp=datetime(2024, 2, 1), start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31), symbols=["AAPL", "MSFT"],
+            trades=[trade.to_dict() for trade in saved],
+            performance=PerformanceMetrics.from_trades(saved).to_dict(),
+            settings_used=AlgorithmSettings().to_dict()
+        )
+        
+        with patch('backend.app.database.SessionLocal') as mock_session_local:
+            mock_db = Mock()
+            mock_session_local.return_value = mock_db
+            mock_db.query.return_value.filter.return_value.first.return_value = db_result
+            
+            result = await service.get_backtest_by_id(str(backtest_id))
+        
+        assert result.trades == saved
+        assert result.performance.total_return == PerformanceMetrics.from_trades(saved).total_return
+    
+    @pytest.mark.asyncio
+    async def test_delete_backtest_single_statement(self, mock_data_service, mock_algorithm_engine):
+        """Test deletion issues one DELETE and reports whether a row matched."""
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        backtest_id = str(uuid.uuid4())
+        
+        with patch('backend.app.database.SessionLocal') as mock_get_session:
+            mock_db = Mock()
+            mock_get_session.return_value = mock_db
+            mock_db.execute.return_value.rowcount = 1
+            
+            assert await service.delete_backtest(backtest_id) is True
+            
+            mock_db.execute.return_value.rowcount = 0
+            assert await service.delete_backtest(backtest_id) is False
+        
+        stmt = mock_db.execute.call_args.args[0]
+        assert str(stmt).startswith('DELETE FROM backtest_results')
+        assert stmt.compile().params == {'id_1': uuid.UUID(backtest_id)}
+        mock_db.query.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_save_backtest_result_bulk_inserts_trades(self, mock_data_service, mock_algorithm_engine):
+        """Test trades are saved with one bulk insert after the parent row."""
+        service = BacktestService(mock_data_service, mock_algorithm_engine)
+        trades = [
+            Trade(
+                symbol="AAPL",
+                entry_date=datetime(2024, 1, i),
+                entry_price=100.0,
+                exit_date=datetime(2024, 1, i + 1),
+                exit_price=101.0,
+                trade_type="long",
+                pnl=1.0,
+                pnl_percent=0.01
+            ) for i in range(1, 4)
+        ]
+        result = BacktestResult(
+            id=str(uuid.uuid4()),
+            timestamp=datetime(2024, 2, 1),
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            symbols=["AAPL"],
+            trades=trades,
+            performance=PerformanceMetrics.from_trades(trades),
+            settings_used=AlgorithmSettings()
+        )
+        
+        with patch('backend.app.database.SessionLocal') as mock_get_session:
+            mock_db = Mock()
+            mock_get_session.return_value = mock_db
+            
+            await service._save_backtest_result(result)
+        
+        saved = mock_db.add.call_args.args[0]
+        assert saved.trades == [trade.to_dict() for trade in trades]
+        assert saved.trade_count == 3
+        assert saved.win_rate == 1.0
+        assert saved.total_return == result.performance.total_return
+        mock_db.add.assert_called_once()
+        mock_db.bulk_insert_mappings.assert_called_once()
+        model, rows = mock_db.bulk_insert_mappings.call_args.args
+        assert model is TradeDB
+        assert [row['entry_date'] for row in rows] == [trade.entry_date for trade in trades]
+        assert all(row['backtest_id'] == uuid.UUID(result.id) for row in rows)
+        assert [c[0] for c in mock_db.method_calls][:4] == ['add', 'flush', 'bulk_insert_mappings', 'commit']
 
 
 class TestTradeSimulation:
@@ -4,6 +4,7 @@ Tests the complete backtesting workflow including data fetching and algorithm ev
 """
 import pytest
 import asyncio
+from collections import namedtuple
 from datetime import datetime, date, timedelta
 from unittest.mock import Mock, patch, AsyncMock
 from typing import List
@@ -29,6 +30,18 @@ def mock_algorithm_engine():
     """Mock algorithm engine for testing."""
     engine = Mock(spec=AlgorithmEngine)
     engine.generate_signals = Mock()
+    
+    def generate_signals_indexed(data, index, htf_data=None, htf_index=-1, htf_end=None,
+                                 settings=None):
+        has_htf = htf_data is not None and htf_index >= 0
+        return engine.generate_signals(
+            market_data=data[index], historical_data=data[:index],
+            htf_market_data=htf_data[htf_index] if has_htf else None,
+            htf_historical_data=list(htf_data[:htf_end]) if has_htf else [],
+            settings=settings
+        )
+    
+    engine.generate_signals_indexed = Mock(side_effect=generate_signals_indexed)
     return engine
 
 
@@ -454,7 +467,7 @@ class TestBacktestServiceIntegration:
         service = BacktestService(mock_data_service, mock_algorithm_engine)
         
         # Mock database query
-        with patch('backend.app.services.backtest_service.get_session') as mock_get_session:
+        with patch('backend.app.database.SessionLocal') as mock_get_session:
             mock_db = Mock()
             mock_get_session.return_value = mock_db
             
@@ -507,7 +520,7 @@ class TestBacktestServiceIntegration:
             
             # Test history retrieval
             filters = BacktestFilters(symbols=["AAPL"], limit=10)
-            results = await service.get_backtest_history(filters)
+            results = await service.get_backtest_history(filters, include_trades=True)
             
             # Verify results
             assert len(results) == 1
@@ -516,33 +529,37 @@ class TestBacktestServiceIntegration:
             assert result.symbols == ["AAPL"]
             assert len(result.trades) == 1
             assert isinstance(result.performance, PerformanceMetrics)
+            mock_query.options.assert_not_called()
+            
+            # The listing default skips the trades column entirely
+            mock_query.options.return_value = mock_query
+            results = await service.get_backtest_history(filters)
+            assert results[0].trades == []
+            mock_query.options.assert_called_once()
     
     async def test_backtest_statistics_integration(self, mock_data_service, mock_algorithm_engine):
         """Test backtest statistics calculation integration."""
         service = BacktestService(mock_data_service, mock_algorithm_engine)
         
         # Mock database query for statistics
-        with patch('backend.app.services.backtest_service.get_session') as mock_get_session:
+        with patch('backend.app.database.SessionLocal') as mock_get_session:
             mock_db = Mock()
             mock_get_session.return_value = mock_db
             
-            # Mock multiple backtest results
-            mock_backtests = []
-            for i in range(3):
-                mock_backtest = Mock()
-                mock_backtest.symbols = ["AAPL", "MSFT"][i % 2:i % 2 + 1]
-                mock_backtest.trades = [{"symbol": "AAPL", "pnl": 5.0}] * (i + 1)
-                mock_backtest.performance = {
-                    "total_trades": i + 1,
-                    "win_rate": 0.6 + i * 0.1,
-                    "total_return": 0.05 + i * 0.02
-                }
-                mock_backtests.append(mock_backtest)
-            
+            # Mock the aggregate rows the database returns
             mock_query = Mock()
             mock_db.query.return_value = mock_query
             mock_query.filter.return_value = mock_query
-            mock_query.all.return_value = mock_backtests
+            mock_query.one.return_value = (3, 6, 0.7, 0.07)
+            symbol_row = namedtuple(
+                'SymbolRow',
+                'symbol tests tests_with_return avg_return tested_rank return_rank'
+            )
+            mock_query.all.return_value = [
+                symbol_row("MSFT", 1, 1, 0.07, 2, 2),
+                symbol_row("TSLA", 1, 0, None, 3, 3),
+                symbol_row("AAPL", 2, 2, 0.07, 1, 1)
+            ]
             
             # Test statistics calculation
             stats = await service.get_backtest_statistics(days=30)
@@ -559,4 +576,13 @@ class TestBacktestServiceIntegration:
             assert stats["total_backtests"] == 3
             assert stats["total_trades"] == 6  # 1 + 2 + 3
             assert isinstance(stats["average_win_rate"], float)
-            assert isinstance(stats["average_return"], float)
\ No newline at end of file
+            assert isinstance(stats["average_return"], float)
+            assert stats["most_tested_symbols"] == [
+                {"symbol": "AAPL", "count": 2},
+                {"symbol": "MSFT", "count": 1},
+                {"symbol": "TSLA", "count": 1}
+            ]
+            assert stats["best_performing_symbols"] == [
+                {"symbol": "AAPL", "avg_return": 0.07, "tests": 2},
+                {"symbol": "MSFT", "avg_return": 0.07, "tests": 1}
+            ]
\ No newline at end of file
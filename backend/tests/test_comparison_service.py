@@ -0,0 +1,298 @@
+"""
+Tests for the scan comparison service.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from sqlalchemy.dialects import postgresql
+
+from app.services import comparison_service
+from app.services.comparison_service import ComparisonService, _ScanColumns
+
+
+def _mock_session(rows):
+    """Session whose column query returns the given rows."""
+    session = Mock()
+    query = session.query.return_value
+    query.join.return_value.order_by.return_value.all.return_value = rows
+    return session
+
+
+def _row(scan_id, execution_time, symbols, signals=0, quality=None, settings=None,
+         success_rate=None, memory_usage=None, api_requests=None,
+         symbols_with_data=None, symbol_statuses=None):
+    """Projected comparison row, as returned by the column query."""
+    return (
+        scan_id, execution_time, quality, symbols, len(symbols), signals,
+        success_rate, memory_usage, api_requests, settings, symbols_with_data,
+        [] if symbols_with_data is not None else None,
+        {} if symbols_with_data is not None else None,
+        symbol_statuses
+    )
+
+
+def _columns(count, **fields):
+    """Scan columns with empty defaults for the fields a test does not set."""
+    values = dict(
+        scan_ids=[f'scan-{i}' for i in range(1, count + 1)],
+        settings=[None] * count,
+        symbols_scanned=[[]] * count,
+        execution_time=np.zeros(count),
+        data_quality_score=np.zeros(count),
+        symbols_count=np.zeros(count, dtype=np.int64),
+        signals_found=np.zeros(count, dtype=np.int64),
+        success_rate=np.zeros(count),
+        memory_usage=np.zeros(count),
+        api_requests=np.zeros(count, dtype=np.int64),
+        symbols_with_data=[None] * count,
+        symbols_without_data=[None] * count,
+        symbols_with_errors=[None] * count,
+        symbol_statuses=[None] * count
+    )
+    values.update(fields)
+    return _ScanColumns(**values)
+
+
+@pytest.fixture(autouse=True)
+def _clear_comparison_cache():
+    """Each test starts without cached comparisons."""
+    comparison_service._comparison_cache.clear()
+    yield
+    comparison_service._comparison_cache.clear()
+
+
+class TestCompareScans:
+    """Test compare_scans over preloaded scan columns."""
+
+    @pytest.mark.asyncio
+    async def test_performance_trends_from_columns(self):
+        """Trends are built per scan in query order from the selected columns."""
+        rows = [
+            _row('scan-1', 10.0, ['AAPL', 'MSFT'], signals=2),
+            _row('scan-2', 20.0, ['AAPL', 'MSFT', 'GOOGL', 'TSLA'], signals=5, quality=0.9,
+                 settings={'atr_multiplier': 3.0}, success_rate=0.75, memory_usage=128.5, api_requests=7,
+                 symbols_with_data=['AAPL', 'MSFT', 'GOOGL']),
+        ]
+        session = _mock_session(rows)
+
+        with patch('app.services.comparison_service.get_session', return_value=session):
+            comparison = await ComparisonService().compare_scans(['scan-1', 'scan-2'])
+
+        assert comparison.scan_ids == ['scan-1', 'scan-2']
+        trends = comparison.performance_trends
+        assert trends['execution_time'] == [10.0, 20.0]
+        assert trends['data_quality_score'] == [0.0, 0.9]
+        assert trends['symbols_scanned_count'] == [2, 4]
+        assert trends['signals_found_count'] == [2, 5]
+        assert trends['success_rate'] == [0.0, 0.75]
+        assert trends['memory_usage'] == [0.0, 128.5]
+        assert trends['api_requests'] == [0, 7]
+        assert all(isinstance(count, int) for count in trends['signals_found_count'])
+        assert 'atr_multiplier' in comparison.settings_differences['scan-2']
+        assert comparison.symbol_status_changes['GOOGL'] == {'scan-1': 'not_scanned', 'scan-2': 'success'}
+        session.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_selects_summary_columns_not_payloads(self):
+        """Trends read summary columns; only status fields come from diagnostics."""
+        session = _mock_session([_row('scan-1', 10.0, ['AAPL'])])
+
+        with patch('app.services.comparison_service.get_session', return_value=session):
+            await ComparisonService().compare_scans(['scan-1', 'scan-2'])
+
+        selected = [
+            str(expression.compile(dialect=postgresql.dialect()))
+            for expression in session.query.call_args.args
+        ]
+        assert 'scan_results.enhanced_diagnostics' not in selected
+        assert 'scan_results.signals_found' not in selected
+        assert {
+            'scan_results.symbols_count', 'scan_results.signals_count', 'scan_results.success_rate',
+            'scan_results.memory_usage_mb', 'scan_results.api_requests_made'
+        } <= set(selected)
+        assert any('jsonb_object_agg' in sql and 'jsonb_each' in sql for sql in selected)
+
+    @pytest.mark.asyncio
+    async def test_joins_values_cte_of_distinct_ids(self):
+        """Scans are matched by joining a VALUES list rather than IN (...)."""
+        session = _mock_session([_row('scan-1', 10.0, ['AAPL'])])
+
+        with patch('app.services.comparison_service.get_session', return_value=session):
+            await ComparisonService().compare_scans(['scan-1', 'scan-2', 'scan-1'])
+
+        target, condition = session.query.return_value.join.call_args.args
+        sql = str(target.select().compile(dialect=postgresql.dialect()))
+        assert 'VALUES' in sql
+        assert target.select().compile().params == {'param_1': 'scan-1', 'param_2': 'scan-2'}
+        assert 'CAST(compared_ids.id AS UUID)' in str(condition.compile(dialect=postgresql.dialect()))
+        session.query.return_value.filter.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_trends_keep_query_order(self):
+        """Trends follow the timestamp order of the query, not scan ids."""
+        rows = [
+            _row('scan-c', 30.0, ['AAPL']),
+            _row('scan-a', 10.0, ['AAPL']),
+            _row('scan-b', 20.0, ['AAPL']),
+        ]
+        session = _mock_session(rows)
+
+        with patch('app.services.comparison_service.get_session', return_value=session):
+            comparison = await ComparisonService().compare_scans(['scan-a', 'scan-b', 'scan-c'])
+
+        assert comparison.scan_ids == ['scan-c', 'scan-a', 'scan-b']
+        assert comparison.performance_trends['execution_time'] == [30.0, 10.0, 20.0]
+        session.query.return_value.join.return_value.order_by.assert_called_once()
+
+    def test_symbol_status_changes(self):
+        """Only symbols whose status differs between scans are reported."""
+        # scan-1 has symbol details, scan-2 only legacy lists, scan-3 nothing
+        columns = _columns(
+            3,
+            symbols_scanned=[['AAPL', 'MSFT'], ['AAPL', 'MSFT', 'TSLA'], ['AAPL']],
+            symbols_with_data=[[], ['AAPL'], None],
+            symbols_without_data=[[], ['MSFT'], None],
+            symbols_with_errors=[{}, {'MSFT': 'timeout'}, None],
+            symbol_statuses=[{'AAPL': 'success', 'MSFT': 'error'}, None, None]
+        )
+
+        changes = ComparisonService()._analyze_symbol_status_changes(columns)
+
+        assert changes == {
+            'AAPL': {'scan-1': 'success', 'scan-2': 'success', 'scan-3': 'unknown'},
+            'MSFT': {'scan-1': 'error', 'scan-2': 'no_data', 'scan-3': 'not_scanned'},
+            'TSLA': {'scan-1': 'not_scanned', 'scan-2': 'unknown', 'scan-3': 'not_scanned'},
+        }
+
+    def test_identical_settings_are_not_parsed(self):
+        """Scans storing the baseline settings are skipped without parsing."""
+        baseline = {'atr_multiplier': 2.0}
+        columns = _columns(3, settings=[baseline, dict(baseline), {'atr_multiplier': 2.5}])
+
+        with patch(
+            'app.services.comparison_service._parse_settings',
+            wraps=comparison_service._parse_settings
+        ) as parse_settings:
+            differences = ComparisonService()._analyze_settings_differences(columns)
+
+        assert parse_settings.call_count == 2
+        assert list(differences) == ['scan-3']
+        assert differences['scan-3']['atr_multiplier'] == {
+            'baseline': 2.0, 'current': 2.5, 'change': '+25.00%'
+        }
+
+    def test_equal_setting_values_report_no_differences(self):
+        """Differently stored settings with equal compared values are skipped."""
+        columns = _columns(2, settings=[None, {'atr_multiplier': 2.0, 'fomo_filter': 1.0}])
+
+        differences = ComparisonService()._analyze_settings_differences(columns)
+
+        assert differences == {}
+
+    def test_generate_insights_from_trends(self):
+        """Percentage changes use first/last values, skipping unset scores."""
+        trends = {
+            'execution_time': [10.0, 5.0, 20.0],
+            'data_quality_score': [0.0, 0.5, 0.8],
+            'symbols_scanned_count': [4, 4, 4],
+            'signals_found_count': [2, 3, 5],
+            'success_rate': [0.5, 0.5, 0.75],
+            'memory_usage': [0.0, 0.0, 128.5],
+            'api_requests': [0, 0, 7]
+        }
+
+        insights = ComparisonService()._generate_insights(None, {}, trends)
+
+        assert insights == [
+            "Execution time increased by 100.0% from 10.00s to 20.00s",
+            "Data quality improved by 60.0% from 0.50 to 0.80",
+            "Signal generation increased significantly from 2 to 5",
+            "Symbol processing success rate improved by 25.0% from 50.0% to 75.0%",
+        ]
+
+    def test_generate_insights_zero_start(self):
+        """A zero first execution time reports no change instead of failing."""
+        trends = {
+            'execution_time': [0.0, 20.0],
+            'data_quality_score': [0.0, 0.0],
+            'symbols_scanned_count': [1, 1],
+            'signals_found_count': [0, 0],
+            'success_rate': [0.0, 0.0],
+            'memory_usage': [0.0, 0.0],
+            'api_requests': [0, 0]
+        }
+
+        insights = ComparisonService()._generate_insights(None, {}, trends)
+
+        assert insights == ["No significant trends or changes detected between scans"]
+
+    @pytest.mark.asyncio
+    async def test_insufficient_scans_returns_none(self):
+        """Fewer than two stored scans cannot be compared."""
+        session = _mock_session([_row('scan-1', 10.0, ['AAPL'])])
+
+        with patch('app.services.comparison_service.get_session', return_value=session):
+            comparison = await ComparisonService().compare_scans(['scan-1', 'scan-2'])
+
+        assert comparison is None
+
+    @pytest.mark.asyncio
+    async def test_repeated_comparison_served_from_cache(self):
+        """The same scans in any order reuse the stored comparison."""
+        session = _mock_session([_row('scan-1', 10.0, ['AAPL']), _row('scan-2', 20.0, ['AAPL'])])
+
+        with patch('app.services.comparison_service.get_session', return_value=session) as get_session:
+            first = await ComparisonService().compare_scans(['scan-1', 'scan-2'])
+            second = await ComparisonService().compare_scans(['scan-2', 'scan-1'])
+
+        assert second is first
+        get_session.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_insufficient_scans_not_cached(self):
+        """A missing comparison is looked up again on the next call."""
+        session = _mock_session([_row('scan-1', 10.0, ['AAPL'])])
+
+        with patch('app.services.comparison_service.get_session', return_value=session) as get_session:
+            await ComparisonService().compare_scans(['scan-1', 'scan-2'])
+            await ComparisonService().compare_scans(['scan-1', 'scan-2'])
+
+        assert get_session.call_count == 2
+
+    def test_invalidate_comparisons(self):
+        """Invalidating a scan drops only the comparisons that include it."""
+        comparison_service._comparison_cache[('scan-1', 'scan-2')] = Mock()
+        comparison_service._comparison_cache[('scan-2', 'scan-3')] = Mock()
+
+        comparison_service.invalidate_comparisons('scan-1')
+
+        assert list(comparison_service._comparison_cache) == [('scan-2', 'scan-3')]
+
+    def test_cache_evicts_least_recently_used(self):
+        """The cache is bounded and evicts its oldest entry first."""
+        with patch.object(comparison_service, '_COMPARISON_CACHE_SIZE', 2):
+            for index in range(3):
+                session = _mock_session([_row('a', 1.0, ['AAPL']), _row(f'b{index}', 2.0, ['AAPL'])])
+                with patch('app.services.comparison_service.get_session', return_value=session):
+                    asyncio.run(ComparisonService().compare_scans(['a', f'b{index}']))
+
+        assert list(comparison_service._comparison_cache) == [('a', 'b1'), ('a', 'b2')]
+
+
+class TestCalculateChange:
+    """Test formatting of individual setting changes."""
+
+    @pytest.mark.parametrize("baseline,current,expected", [
+        (2.0, 3.0, "+50.00%"),
+        (2.0, 1.0, "-50.00%"),
+        (2, 2.0, "no_change"),
+        (0, 1.5, "new_value"),
+        (0.0, 0, "no_change"),
+        ("4h", "1d", "changed_from_4h_to_1d"),
+        ("4h", "4h", "no_change"),
+        (None, 1.0, None),
+    ])
+    def test_calculate_change(self, baseline, current, expected):
+        assert ComparisonService()._calculate_change(baseline, current) == expected
@@ -4,11 +4,14 @@ Integration tests for the data service with mocked yfinance responses.
 import pytest
 import pandas as pd
 from datetime import datetime, date, timedelta
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 import asyncio
+import threading
+import time
 from typing import Dict, List
 
-from backend.app.services.data_service import DataService, DataCache
+from backend.app.services import data_service as data_service_module
+from backend.app.services.data_service import DataService, DataCache, RequestRateLimiter, RateLimitExceeded
 from backend.app.models.market_data import MarketData
 
 
@@ -33,16 +36,30 @@ class TestDataCache:
         
         test_data = {"symbol": "AAPL", "price": 150.0}
         
-        # Set data with negative TTL to force immediate expiration
+        # Set data with a past deadline to force immediate expiration
         cache._cache["test_key"] = CacheEntry(
             data=test_data,
-            timestamp=datetime.now(),
-            expires_at=datetime.now() - timedelta(minutes=1)  # Already expired
+            expires_at=time.monotonic() - 60  # Already expired
         )
         
         # Data should be expired
         retrieved_data = cache.get("test_key")
         assert retrieved_data is None
+        assert cache.size() == 0
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the cache stays within maxsize, evicting the oldest entry."""
+        cache = DataCache(maxsize=2)
+        
+        cache.set("key1", {"data": 1})
+        cache.set("key2", {"data": 2})
+        cache.get("key1")  # key2 is now least recently used
+        cache.set("key3", {"data": 3})
+        
+        assert cache.size() == 2
+        assert cache.get("key2") is None
+        assert cache.get("key1") == {"data": 1}
+        assert cache.get("key3") == {"data": 3}
     
     def test_cache_clear(self):
         """Test cache clearing functionality."""
@@ -58,9 +75,51 @@ class TestDataCache:
         assert cache.get("key1") is None
 
 
+class TestRequestRateLimiter:
+    """Test the multi-window request rate limiter."""
+    
+    def test_strictest_window_applies(self):
+        """Test that a request waits for every full window."""
+        limiter = RequestRateLimiter(((3, 60.0), (4, 3600.0)))
+        
+        with patch('time.monotonic', side_effect=[0.0, 1.0, 2.0, 3.0, 70.0]):
+            waits = [limiter._reserve(max_wait=float('inf')) for _ in range(5)]
+        
+        # The minute window delays the 4th request, the hour window the 5th
+        assert waits == pytest.approx([0.0, 0.0, 0.0, 57.0, 3530.0])
+    
+    def test_old_requests_leave_the_window(self):
+        """Test that requests older than the window no longer count."""
+        limiter = RequestRateLimiter(((1, 60.0),))
+        
+        with patch('time.monotonic', side_effect=[0.0, 61.0]):
+            assert limiter._reserve(max_wait=0.0) == 0.0
+            assert limiter._reserve(max_wait=0.0) == 0.0
+    
+    def test_fails_fast_beyond_max_wait(self):
+        """Test that a slot further away than max_wait raises without reserving it."""
+        limiter = RequestRateLimiter(((1, 3600.0),))
+        
+        with patch('time.monotonic', return_value=0.0):
+            limiter._reserve(max_wait=10.0)
+            with pytest.raises(RateLimitExceeded) as exc_info:
+                limiter._reserve(max_wait=10.0)
+            assert exc_info.value.retry_after == 3600.0
+            
+            # The refused request did not take a slot
+            assert limiter._reserve(max_wait=float('inf')) == 3600.0
+
+
 class TestDataService:
     """Test the data service functionality."""
     
+    @pytest.fixture(autouse=True)
+    def clear_rate_limits(self):
+        """Start each test with no recorded provider requests."""
+        data_service_module.yfinance_limiter.clear()
+        yield
+        data_service_module.yfinance_limiter.clear()
+    
     @pytest.fixture
     def data_service(self):
         """Create a data service instance for testing."""
@@ -121,6 +180,30 @@ class TestDataService:
         assert len(cleaned_data) == 1
         assert cleaned_data[0].open == 150.0
     
+    def test_clean_market_data_types_and_missing_values(self, data_service):
+        """Cleaned points hold Python scalars, and missing volumes become zero."""
+        dates = pd.date_range(start='2024-01-01 09:30:00', periods=3, freq='1h', tz='America/New_York')
+        frame = pd.DataFrame({
+            'Open': [150.0, 151.0, 152.0],
+            'High': [150.5, float('nan'), 152.5],
+            'Low': [149.5, 150.5, 151.5],
+            'Close': [150.2, 151.2, 152.2],
+            'Volume': [1000.0, 1100.0, float('nan')]
+        }, index=dates)
+        
+        cleaned_data = data_service._clean_market_data(frame, "aapl")
+        
+        assert [d.open for d in cleaned_data] == [150.0, 152.0]
+        assert [d.volume for d in cleaned_data] == [1000, 0]
+        assert all(d.symbol == "AAPL" for d in cleaned_data)
+        assert cleaned_data[1].timestamp == dates[2].to_pydatetime()
+        assert type(cleaned_data[0].timestamp) is datetime
+        assert type(cleaned_data[0].open) is float and type(cleaned_data[0].volume) is int
+    
+    def test_clean_market_data_missing_column(self, data_service, sample_yfinance_data):
+        """Frames without the OHLCV columns yield no data."""
+        assert data_service._clean_market_data(sample_yfinance_data.drop(columns=['Volume']), "AAPL") == []
+    
     @pytest.mark.asyncio
     async def test_fetch_current_data_success(self, data_service, sample_yfinance_data):
         """Test successful current data fetching."""
@@ -239,6 +322,34 @@ class TestDataService:
             assert len(result1["AAPL"]) == len(result2["AAPL"])
             assert result1["AAPL"][0].symbol == result2["AAPL"][0].symbol
     
+    @pytest.mark.asyncio
+    async def test_partial_cache_hit_fetches_only_misses(self, data_service, sample_yfinance_data):
+        """Cached symbols are served from memory while misses are fetched."""
+        with patch('yfinance.Ticker') as mock_ticker:
+            mock_ticker.return_value.history.return_value = sample_yfinance_data
+            await data_service.fetch_current_data(["AAPL"])
+        
+        batch = pd.concat({symbol: sample_yfinance_data for symbol in ["MSFT", "GOOGL"]}, axis=1)
+        with patch('yfinance.download', return_value=batch) as mock_download:
+            result = await data_service.fetch_current_data(["AAPL", "MSFT", "GOOGL"])
+        
+        assert mock_download.call_args.args == ("MSFT GOOGL",)
+        assert list(result) == ["AAPL", "MSFT", "GOOGL"]
+        assert all(len(data) == 5 for data in result.values())
+        assert data_service.cache.get("sym:GOOGL:1d:1h") is not None
+    
+    @pytest.mark.asyncio
+    async def test_empty_results_not_cached(self, data_service, sample_yfinance_data):
+        """Symbols without data are fetched again on the next call."""
+        with patch('yfinance.Ticker') as mock_ticker:
+            mock_ticker.return_value.history.side_effect = [pd.DataFrame(), sample_yfinance_data]
+            
+            first = await data_service.fetch_current_data(["AAPL"])
+            second = await data_service.fetch_current_data(["AAPL"])
+        
+        assert first["AAPL"] == []
+        assert len(second["AAPL"]) == 5
+    
     @pytest.mark.asyncio
     async def test_invalid_symbols_handling(self, data_service):
         """Test handling of invalid symbols."""
@@ -251,13 +362,17 @@ class TestDataService:
     @pytest.mark.asyncio
     async def test_multiple_symbols_fetch(self, data_service, sample_yfinance_data):
         """Test fetching data for multiple symbols."""
-        with patch('yfinance.Ticker') as mock_ticker:
-            mock_instance = Mock()
-            mock_instance.history.return_value = sample_yfinance_data
-            mock_ticker.return_value = mock_instance
-            
+        batch = pd.concat({symbol: sample_yfinance_data for symbol in ["AAPL", "MSFT", "GOOGL"]}, axis=1)
+        with patch('yfinance.download', return_value=batch) as mock_download, \
+                patch('yfinance.Ticker') as mock_ticker:
             result = await data_service.fetch_current_data(["AAPL", "MSFT", "GOOGL"])
             
+            # One batched request, no per-symbol history calls
+            mock_download.assert_called_once()
+            assert mock_download.call_args.args == ("AAPL MSFT GOOGL",)
+            assert mock_download.call_args.kwargs["group_by"] == "ticker"
+            mock_ticker.assert_not_called()
+            
             assert len(result) == 3
             assert "AAPL" in result
             assert "MSFT" in result
@@ -268,6 +383,26 @@ class TestDataService:
                 assert len(result[symbol]) == 5
                 assert all(d.symbol == symbol for d in result[symbol])
     
+    @pytest.mark.asyncio
+    async def test_multiple_symbols_partial_batch(self, data_service, sample_yfinance_data):
+        """Symbols missing or empty in the batch get no data."""
+        empty = sample_yfinance_data.astype(float) * float('nan')
+        batch = pd.concat({"AAPL": sample_yfinance_data, "MSFT": empty}, axis=1)
+        with patch('yfinance.download', return_value=batch):
+            result = await data_service.fetch_current_data(["AAPL", "MSFT", "GOOGL"])
+        
+        assert len(result["AAPL"]) == 5
+        assert result["MSFT"] == []
+        assert result["GOOGL"] == []
+    
+    @pytest.mark.asyncio
+    async def test_multiple_symbols_batch_failure(self, data_service):
+        """A failed batch download returns empty data for every symbol."""
+        with patch('yfinance.download', side_effect=Exception("API Error")):
+            result = await data_service.fetch_current_data(["AAPL", "MSFT"])
+        
+        assert result == {"AAPL": [], "MSFT": []}
+    
     def test_cache_stats(self, data_service):
         """Test cache statistics functionality."""
         stats = data_service.get_cache_stats()
@@ -292,22 +427,74 @@ class TestDataService:
     
     @pytest.mark.asyncio
     async def test_rate_limiting(self, data_service):
-        """Test that rate limiting is applied."""
-        with patch('time.sleep') as mock_sleep:
-            # Reset the last request time
-            data_service._last_request_time = 0
+        """Test that requests burst up to the limit, then wait for the window."""
+        limiter = RequestRateLimiter(((2, 1.0),))
+        with patch.object(data_service_module, 'yfinance_limiter', limiter), \
+                patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+                patch('time.monotonic', return_value=100.0):
+            # Requests within the limit do not wait
+            await data_service._rate_limit()
+            await data_service._rate_limit()
+            mock_sleep.assert_not_called()
+            
+            # Further requests wait for the oldest one to leave the window
+            await data_service._rate_limit()
+            await data_service._rate_limit()
+            await data_service._rate_limit()
+            
+            waits = [call.args[0] for call in mock_sleep.call_args_list]
+            assert waits == pytest.approx([1.0, 1.0, 2.0])
+    
+    @pytest.mark.asyncio
+    async def test_rate_limits_shared_between_services(self, sample_yfinance_data):
+        """Test that the limits hold across service instances and fail fast when reached."""
+        limiter = RequestRateLimiter(((1, 3600.0),))
+        with patch.object(data_service_module, 'yfinance_limiter', limiter), \
+                patch('yfinance.Ticker') as mock_ticker:
+            mock_ticker.return_value.history.return_value = sample_yfinance_data
+            
+            first = await DataService().fetch_current_data(["AAPL"])
+            second = await DataService().fetch_current_data(["MSFT"])
+        
+        assert len(first["AAPL"]) == 5
+        # The second service gives up instead of sleeping for an hour
+        assert second["MSFT"] == []
+        assert mock_ticker.return_value.history.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_historical_data_fetched_concurrently(self, data_service, sample_yfinance_data):
+        """Test that symbols are fetched in parallel, off the event loop."""
+        # Each request only returns once both are in flight
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def history(**kwargs):
+            barrier.wait()
+            return sample_yfinance_data
+        
+        with patch('yfinance.Ticker') as mock_ticker:
+            mock_ticker.return_value.history.side_effect = history
+            result = await data_service.fetch_historical_data(["AAPL", "MSFT"], date(2024, 1, 1), date(2024, 1, 2))
+        
+        assert list(result) == ["AAPL", "MSFT"]
+        assert all(len(data) == 5 for data in result.values())
+    
+    @pytest.mark.asyncio
+    async def test_historical_data_waits_then_reports_rate_limit(self, data_service, sample_yfinance_data):
+        """Test that backtest fetches wait for a request slot and report longer limits."""
+        limiter = RequestRateLimiter(((1, 30.0), (2, 3600.0)))
+        with patch.object(data_service_module, 'yfinance_limiter', limiter), \
+                patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+                patch('time.monotonic', return_value=100.0), \
+                patch('yfinance.Ticker') as mock_ticker:
+            mock_ticker.return_value.history.return_value = sample_yfinance_data
+            
+            result = await data_service.fetch_historical_data(["AAPL", "MSFT"], date(2024, 1, 1), date(2024, 1, 2))
+            assert [len(result[symbol]) for symbol in ["AAPL", "MSFT"]] == [5, 5]
+            assert mock_sleep.call_args.args[0] == pytest.approx(30.0)
             
-            # Mock time to simulate rapid successive calls
-            with patch('time.time', side_effect=[1.0, 1.05, 1.1, 1.15]):  # More values to avoid StopIteration
-                # First call should not sleep (no previous request)
-                data_service._rate_limit()
-                
-                # Second call too soon should sleep
-                data_service._rate_limit()
-                mock_sleep.assert_called_once()
-                # Should sleep for approximately 0.05 seconds (100ms - 50ms)
-                call_args = mock_sleep.call_args[0]
-                assert abs(call_args[0] - 0.05) < 0.01
+            # The hourly limit is reached: the caller sees the error, not empty data
+            with pytest.raises(RateLimitExceeded):
+                await data_service.fetch_historical_data(["GOOGL"], date(2024, 1, 1), date(2024, 1, 2))
     
     @pytest.mark.asyncio
     async def test_historical_data_invalid_date_range(self, data_service):
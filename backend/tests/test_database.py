@@ -6,11 +6,13 @@ since they require PostgreSQL with UUID extension.
 import pytest
 from datetime import datetime, date
 import uuid
+from unittest.mock import Mock, patch
 
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from app.database import _json_serializer, engine, session_scope
 from app.models.database_models import ScanResultDB, BacktestResultDB, TradeDB
 
 
@@ -271,4 +273,60 @@ class TestDatabaseModelsIntegration:
         assert 'symbols' in backtest_table.columns
         assert 'trades' in backtest_table.columns
         assert 'performance' in backtest_table.columns
-        assert 'settings_used' in backtest_table.columns
\ No newline at end of file
+        assert 'settings_used' in backtest_table.columns
+
+
+class TestSessionScope:
+    """Test the transactional session context manager."""
+    
+    def test_commits_and_closes(self):
+        """Test a clean exit commits once and closes the session."""
+        session = Mock()
+        with patch('app.database.SessionLocal', return_value=session):
+            with session_scope() as db:
+                assert db is session
+                db.add('row')
+        
+        assert [c[0] for c in session.method_calls] == ['add', 'commit', 'close']
+    
+    def test_rolls_back_on_error(self):
+        """Test an exception rolls back, closes, and propagates."""
+        session = Mock()
+        with patch('app.database.SessionLocal', return_value=session):
+            with pytest.raises(ValueError):
+                with session_scope():
+                    raise ValueError("boom")
+        
+        session.commit.assert_not_called()
+        session.rollback.assert_called_once()
+        session.close.assert_called_once()
+
+
+class TestJsonSerialization:
+    """Test the engine's JSON column codec."""
+    
+    def test_engine_uses_orjson_codec(self):
+        """Test JSON/JSONB columns encode and decode through orjson."""
+        import orjson
+        
+        assert engine.dialect._json_serializer is _json_serializer
+        assert engine.dialect._json_deserializer is orjson.loads
+    
+    def test_serializer_matches_stdlib_shape(self):
+        """Test encoded payloads decode to what the stdlib encoder would produce."""
+        import json
+        import numpy as np
+        
+        payload = {
+            "trades": [{"symbol": "AAPL", "entry_date": "2024-01-01T10:00:00", "pnl": 1.5}],
+            "win_rate": np.float64(0.5),
+            "total_trades": np.int64(2),
+            1: "non-string key"
+        }
+        
+        assert json.loads(_json_serializer(payload)) == {
+            "trades": [{"symbol": "AAPL", "entry_date": "2024-01-01T10:00:00", "pnl": 1.5}],
+            "win_rate": 0.5,
+            "total_trades": 2,
+            "1": "non-string key"
+        }
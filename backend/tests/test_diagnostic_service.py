@@ -0,0 +1,51 @@
+"""
+Unit tests for the diagnostic service.
+"""
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.diagnostic_service import DiagnosticService
+from app.models.signals import AlgorithmSettings
+
+
+class TestDiagnosticService:
+    """Test DiagnosticService signal analysis collection."""
+
+    @pytest.fixture
+    def diagnostic_service(self):
+        """Create a diagnostic service with an active scan."""
+        service = DiagnosticService()
+        service.start_scan_diagnostics("scan-1", AlgorithmSettings(), total_symbols=3)
+        return service
+
+    def test_rejection_reasons_grouped_by_reason(self, diagnostic_service):
+        """Test rejection reasons are grouped per reason in record order."""
+        diagnostic_service.record_symbol_processing_result(
+            "scan-1", "AAPL", [], ["Failed FOMO filter", "No HTF data available"], ["Rising EMAs"]
+        )
+        diagnostic_service.record_symbol_processing_result(
+            "scan-1", "MSFT", [], ["Failed FOMO filter"], []
+        )
+
+        diagnostics = diagnostic_service.finalize_scan_diagnostics("scan-1")
+        analysis = diagnostics.signal_analysis
+
+        assert analysis.rejection_reasons == {
+            "Failed FOMO filter": ["AAPL", "MSFT"],
+            "No HTF data available": ["AAPL"]
+        }
+        assert analysis.symbols_meeting_partial_criteria == {"AAPL": ["Rising EMAs"]}
+        assert analysis.confidence_distribution == {"low": 0, "medium": 0, "high": 0}
+
+    def test_symbol_table_stores_each_symbol_once(self, diagnostic_service):
+        """Test symbols rejected for several reasons share one table entry."""
+        diagnostic_service.record_symbol_processing_result(
+            "scan-1", "AAPL", [], ["Failed FOMO filter", "Failed volatility filter"], []
+        )
+
+        context = diagnostic_service._contexts["scan-1"]
+        assert context.symbol_table == ["AAPL"]
+        assert list(context.rejection_reasons["Failed volatility filter"]) == [0]
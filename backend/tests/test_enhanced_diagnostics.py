@@ -143,6 +143,22 @@ class TestSignalAnalysis:
         assert restored.signals_found == analysis.signals_found
         assert restored.symbols_meeting_partial_criteria == analysis.symbols_meeting_partial_criteria
 
+    def test_signal_analysis_from_confidences(self):
+        """Test confidence bucketing from an array of confidences."""
+        analysis = SignalAnalysis.from_confidences(
+            [0.1, 0.59, 0.6, 0.79, 0.8, 0.95],
+            symbols_meeting_partial_criteria={},
+            rejection_reasons={"fomo_filter": ["MSFT"]}
+        )
+
+        assert analysis.signals_found == 6
+        assert analysis.confidence_distribution == {"low": 2, "medium": 2, "high": 2}
+        assert analysis.rejection_reasons == {"fomo_filter": ["MSFT"]}
+
+        empty = SignalAnalysis.from_confidences([], {}, {})
+        assert empty.signals_found == 0
+        assert empty.confidence_distribution == {"low": 0, "medium": 0, "high": 0}
+
 
 class TestDataQualityMetrics:
     """Test DataQualityMetrics model."""
@@ -277,6 +293,11 @@ class TestEnhancedScanDiagnostics:
         assert "AAPL" in restored.symbol_details
         assert restored.symbol_details["AAPL"].symbol == "AAPL"
 
+        # Streaming output matches a one-shot encoding of the full dict
+        chunks = list(diagnostics.iter_json())
+        assert len(chunks) > 1
+        assert "".join(chunks) == json.dumps(diagnostics.to_dict())
+
 
 class TestEnhancedScanResult:
     """Test EnhancedScanResult model."""
@@ -326,6 +347,10 @@ class TestEnhancedScanResult:
         assert result.enhanced_diagnostics is not None
         assert result.enhanced_diagnostics.data_quality_metrics.quality_score == 0.95
 
+        # Direct dataclass encoding matches the to_dict representation
+        assert json.loads(result.to_json_bytes()) == result.to_dict()
+        assert EnhancedScanResult.from_json(result.to_json()) == result
+
 
 class TestScanComparison:
     """Test ScanComparison model."""
@@ -408,4 +433,56 @@ class TestHistoryFilters:
         data_dict = filters.to_dict()
         restored = HistoryFilters.from_dict(data_dict)
         assert restored.scan_status == filters.scan_status
-        assert restored.min_quality_score == filters.min_quality_score
\ No newline at end of file
+        assert restored.min_quality_score == filters.min_quality_score
+
+
+class TestFastSerializable:
+    """Test code-generated to_dict/from_dict methods."""
+    
+    def test_export_request_round_trip(self):
+        """Test datetime fields are converted to and from ISO strings."""
+        request = ExportRequest(
+            scan_ids=["scan-1"],
+            format="json",
+            date_range_start=datetime(2024, 1, 1)
+        )
+        
+        data_dict = request.to_dict()
+        assert data_dict["date_range_start"] == "2024-01-01T00:00:00"
+        assert data_dict["date_range_end"] is None
+        assert ExportRequest.from_dict(data_dict) == request
+    
+    def test_to_dict_does_not_alias_containers(self):
+        """Test serialized containers are copies of the instance state."""
+        analysis = SignalAnalysis(
+            signals_found=0,
+            symbols_meeting_partial_criteria={},
+            rejection_reasons={"fomo_filter": ["MSFT"]},
+            confidence_distribution={}
+        )
+        
+        data_dict = analysis.to_dict()
+        data_dict["rejection_reasons"]["fomo_filter"].append("TSLA")
+        assert analysis.rejection_reasons == {"fomo_filter": ["MSFT"]}
+    
+    def test_from_dict_uses_field_defaults(self):
+        """Test missing keys fall back to dataclass defaults."""
+        filters = HistoryFilters.from_dict({"min_symbols": 5})
+        assert filters.min_symbols == 5
+        assert filters.date_range_start is None
+    
+    def test_from_dict_rejects_unknown_and_missing_keys(self):
+        """Test bad input raises TypeError like the constructor does."""
+        with pytest.raises(TypeError, match="unexpected keyword argument 'min_symbol'"):
+            HistoryFilters.from_dict({"min_symbol": 5})
+        with pytest.raises(TypeError, match="'format'"):
+            ExportRequest.from_dict({"scan_ids": ["scan-1"]})
+        with pytest.raises(TypeError):
+            ExportRequest(scan_ids=["scan-1"])
+    
+    def test_from_dict_parses_iso_timestamps(self):
+        """Test naive, fractional and offset timestamps parse like fromisoformat."""
+        for value in ["2024-01-01T10:00:00", "2024-01-01T10:00:00.123456", "2024-01-01T10:00:00+00:00"]:
+            filters = HistoryFilters.from_dict({"date_range_start": value})
+            assert filters.date_range_start == datetime.fromisoformat(value)
+            assert filters.date_range_start.tzinfo == datetime.fromisoformat(value).tzinfo
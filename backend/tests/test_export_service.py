@@ -0,0 +1,126 @@
+"""
+Tests for the scan export service.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models.database_models import ScanResultDB
+from app.models.enhanced_diagnostics import (
+    DataQualityMetrics,
+    EnhancedScanDiagnostics,
+    ExportRequest,
+    PerformanceMetrics,
+    SignalAnalysis,
+    SymbolDiagnostic
+)
+from app.models.signals import AlgorithmSettings
+from app.services.export_service import ExportService
+
+
+def _enhanced_diagnostics() -> EnhancedScanDiagnostics:
+    return EnhancedScanDiagnostics(
+        symbols_with_data=["AAPL"],
+        symbols_without_data=["MSFT"],
+        symbols_with_errors={"TSLA": "timeout"},
+        data_fetch_time=1.2,
+        algorithm_time=0.3,
+        total_data_points={"AAPL": 390, "MSFT": 0},
+        error_summary={"timeout": 1},
+        symbol_details={
+            "AAPL": SymbolDiagnostic(
+                symbol="AAPL",
+                status="success",
+                data_points_1m=390,
+                data_points_15m=26,
+                timeframe_coverage={"1m": True, "15m": True},
+                error_message=None,
+                fetch_time=1.2,
+                processing_time=0.3
+            )
+        },
+        performance_metrics=PerformanceMetrics(
+            memory_usage_mb=256.5,
+            api_requests_made=3,
+            api_rate_limit_remaining=997,
+            cache_hit_rate=0.5,
+            concurrent_requests=2,
+            bottleneck_phase="data_fetch"
+        ),
+        signal_analysis=SignalAnalysis(
+            signals_found=0,
+            symbols_meeting_partial_criteria={"AAPL": ["ema_rising"]},
+            rejection_reasons={"no_htf": ["AAPL"]},
+            confidence_distribution={}
+        ),
+        data_quality_metrics=DataQualityMetrics(
+            total_data_points=390,
+            success_rate=0.33,
+            average_fetch_time=1.2,
+            data_completeness=0.5,
+            quality_score=0.6
+        ),
+        settings_snapshot=AlgorithmSettings()
+    )
+
+
+class TestConvertScanForExport:
+    """Test conversion of stored scans to export records."""
+
+    @pytest.mark.asyncio
+    async def test_diagnostics_read_from_stored_dict(self):
+        """Diagnostics sections match the stored enhanced diagnostics."""
+        db_result = ScanResultDB(
+            id=uuid.uuid4(),
+            timestamp=datetime(2024, 1, 2, 10, 0),
+            symbols_scanned=["AAPL", "MSFT", "TSLA"],
+            signals_found=[],
+            settings_used=AlgorithmSettings().to_dict(),
+            execution_time=2.5,
+            scan_status="partial",
+            enhanced_diagnostics=_enhanced_diagnostics().to_dict()
+        )
+        request = ExportRequest(scan_ids=[str(db_result.id)], format="json")
+
+        record = await ExportService()._convert_scan_for_export(db_result, request)
+
+        assert record['diagnostics'] == {
+            'symbols_with_data_count': 1,
+            'symbols_without_data_count': 1,
+            'symbols_with_errors_count': 1,
+            'data_fetch_time': 1.2,
+            'algorithm_time': 0.3,
+            'total_data_points': 390
+        }
+        assert record['performance_metrics']['memory_usage_mb'] == 256.5
+        assert record['performance_metrics']['bottleneck_phase'] == "data_fetch"
+        assert record['signal_analysis'] == {
+            'signals_found': 0,
+            'rejection_reasons_count': 1,
+            'partial_criteria_count': 1
+        }
+        assert record['data_quality_metrics']['quality_score'] == 0.6
+        assert record['error_details'] == {"TSLA": "timeout"}
+        assert record['error_summary'] == {"timeout": 1}
+
+    @pytest.mark.asyncio
+    async def test_incomplete_diagnostics_are_skipped(self):
+        """A stored payload missing sections exports without diagnostics."""
+        db_result = ScanResultDB(
+            id=uuid.uuid4(),
+            timestamp=datetime(2024, 1, 2, 10, 0),
+            symbols_scanned=["AAPL"],
+            signals_found=[],
+            settings_used=None,
+            execution_time=1.0,
+            scan_status="completed",
+            enhanced_diagnostics={"symbols_with_errors": {"AAPL": "timeout"}}
+        )
+        request = ExportRequest(scan_ids=[str(db_result.id)], format="json")
+
+        record = await ExportService()._convert_scan_for_export(db_result, request)
+
+        assert 'diagnostics' not in record
+        assert 'performance_metrics' not in record
+        assert record['error_details'] == {"AAPL": "timeout"}
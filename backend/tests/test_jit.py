@@ -0,0 +1,30 @@
+"""
+Unit tests for the optional Numba JIT shim.
+"""
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.jit import njit, prange, NUMBA_AVAILABLE
+
+
+@pytest.mark.skipif(NUMBA_AVAILABLE, reason="Fallback shim is only used without numba")
+class TestJitFallback:
+    """Test the no-op decorator used when numba is missing."""
+
+    def test_bare_decorator_returns_function(self):
+        """Test @njit without arguments leaves the function unchanged."""
+        def add(a, b):
+            return a + b
+
+        assert njit(add) is add
+
+    def test_decorator_with_options_returns_function(self):
+        """Test @njit(cache=True) leaves the function unchanged."""
+        def add(a, b):
+            return a + b
+
+        assert njit(cache=True)(add) is add
+        assert prange is range
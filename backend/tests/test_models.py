@@ -2,16 +2,18 @@
 Unit tests for data models.
 """
 import pytest
+from unittest.mock import patch
 from datetime import datetime, date
 from decimal import Decimal
 import json
+import numpy as np
 
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from app.models import (
-    MarketData, TechnicalIndicators, Signal, AlgorithmSettings,
+    MarketData, MarketDataBuffer, TechnicalIndicators, Signal, AlgorithmSettings,
     ScanResult, BacktestResult, Trade, PerformanceMetrics
 )
 
@@ -62,6 +64,73 @@ class TestMarketData:
         restored_from_json = MarketData.from_json(json_str)
         assert restored_from_json.symbol == data.symbol
 
+    
+    def test_market_data_uses_slots(self):
+        """Test MarketData stores fields in slots and still pickles."""
+        import pickle
+        
+        data = MarketData(
+            symbol="AAPL",
+            timestamp=datetime(2024, 1, 1, 10, 0, 0),
+            open=150.0, high=155.0, low=149.0, close=154.0, volume=1000000
+        )
+        assert not hasattr(data, '__dict__')
+        assert pickle.loads(pickle.dumps(data)) == data
+
+class TestMarketDataBuffer:
+    """Test MarketDataBuffer struct-of-arrays history."""
+    
+    @staticmethod
+    def _bars(count, start=0):
+        return [
+            MarketData(
+                symbol="AAPL",
+                timestamp=datetime(2024, 1, 1, 10, start + i),
+                open=100.0 + i, high=101.0 + i, low=99.0 + i, close=100.5 + i,
+                volume=1000
+            )
+            for i in range(count)
+        ]
+    
+    def test_sync_extends_and_rewrites_last_bar(self):
+        """Test syncing a longer history appends and refreshes the last cached bar."""
+        bars = self._bars(5)
+        buffer = MarketDataBuffer(capacity=2)
+        buffer.sync(bars[:3])
+        
+        bars[2].close = 50.0  # Partial bar updated after the first sync
+        buffer.sync(bars)
+        
+        assert len(buffer) == 5
+        assert buffer.closes[:5].tolist() == [b.close for b in bars]
+        assert buffer.highs[:5].tolist() == [b.high for b in bars]
+        assert buffer.timestamps == [b.timestamp for b in bars]
+    
+    def test_sync_rebuilds_on_different_history(self):
+        """Test a history that does not extend the buffer replaces it."""
+        buffer = MarketDataBuffer()
+        buffer.sync(self._bars(4))
+        
+        shifted = self._bars(3, start=1)
+        buffer.sync(shifted)
+        
+        assert len(buffer) == 3
+        assert buffer.lows[:3].tolist() == [b.low for b in shifted]
+        assert buffer.timestamps == [b.timestamp for b in shifted]
+    
+    def test_sync_prefix_count(self):
+        """Test syncing a prefix by count matches syncing the sliced list."""
+        bars = self._bars(6)
+        buffer = MarketDataBuffer()
+        buffer.sync(bars, 3)
+        assert buffer.timestamps == [b.timestamp for b in bars[:3]]
+        
+        buffer.sync(bars, 5)
+        
+        assert len(buffer) == 5
+        assert buffer.closes[:5].tolist() == [b.close for b in bars[:5]]
+        assert buffer.timestamps == [b.timestamp for b in bars[:5]]
+
 
 class TestTechnicalIndicators:
     """Test TechnicalIndicators model."""
@@ -217,6 +286,21 @@ class TestTrade:
         restored = Trade.from_json(json_str)
         assert restored.symbol == trade.symbol
         assert restored.entry_date == trade.entry_date
+    
+    def test_trade_serialization_numpy_values(self):
+        """Test Trade JSON serialization of NumPy scalar prices and returns."""
+        trade = Trade(
+            symbol="AAPL",
+            entry_date=datetime(2024, 1, 1, 10, 0, 0),
+            entry_price=np.float64(150.0),
+            exit_date=datetime(2024, 1, 2, 10, 0, 0),
+            exit_price=np.float64(155.0),
+            trade_type="long",
+            pnl=np.float64(5.0),
+            pnl_percent=np.float32(0.5)
+        )
+        
+        assert json.loads(trade.to_json()) == trade.to_dict()
 
 
 class TestPerformanceMetrics:
@@ -272,6 +356,15 @@ class TestScanResult:
         assert len(scan_result.symbols_scanned) == 3
         assert len(scan_result.signals_found) == 1
         assert scan_result.execution_time == 2.5
+        
+        # Native dataclass encoding matches the to_dict representation
+        assert json.loads(scan_result.to_json()) == scan_result.to_dict()
+        assert ScanResult.from_json(scan_result.to_json()) == scan_result
+        
+        # Confidences and prices computed with NumPy stay serializable
+        signal.confidence = np.float64(0.85)
+        signal.price = np.float32(154.0)
+        assert json.loads(scan_result.to_json())['signals_found'][0]['confidence'] == 0.85
 
 
 class TestBacktestResult:
@@ -314,4 +407,171 @@ class TestBacktestResult:
         
         assert backtest_result.id == "test-backtest-1"
         assert len(backtest_result.trades) == 1
-        assert backtest_result.performance.win_rate == 1.0
\ No newline at end of file
+        assert backtest_result.performance.win_rate == 1.0    
+    def test_backtest_result_serialization(self):
+        """Test BacktestResult JSON serialization round trip."""
+        trade = Trade(
+            symbol="AAPL",
+            entry_date=datetime(2024, 1, 1, 10, 0, 0),
+            entry_price=150.0,
+            exit_date=datetime(2024, 1, 2, 10, 0, 0),
+            exit_price=155.0,
+            trade_type="long",
+            pnl=5.0,
+            pnl_percent=3.33
+        )
+        metrics = PerformanceMetrics(
+            total_trades=1,
+            winning_trades=1,
+            losing_trades=0,
+            win_rate=1.0,
+            total_return=3.33,
+            average_return=3.33,
+            max_drawdown=0.0,
+            sharpe_ratio=2.0
+        )
+        backtest_result = BacktestResult(
+            id="test-backtest-1",
+            timestamp=datetime(2024, 1, 1, 10, 0, 0),
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            symbols=["AAPL"],
+            trades=[trade],
+            performance=metrics,
+            settings_used=AlgorithmSettings()
+        )
+        
+        json_str = backtest_result.to_json()
+        assert isinstance(json_str, str)
+        assert BacktestResult.from_json(json_str) == backtest_result
+
+        data = backtest_result.to_dict()
+        snapshot = json.dumps(data, sort_keys=True)
+        restored = BacktestResult.from_dict(data)
+        assert restored == backtest_result
+        assert isinstance(restored.trades[0], Trade)
+        assert json.dumps(data, sort_keys=True) == snapshot  # input is not mutated
+
+        # Bytes encoding matches to_dict plus the equity curve, including
+        # NumPy scalars in metrics
+        backtest_result.performance.sharpe_ratio = np.float64(2.0)
+        encoded = {**data, 'performance': {**data['performance'], 'equity_curve': []}}
+        assert json.loads(backtest_result.to_json_bytes()) == encoded
+        assert json.loads(BacktestResult.list_to_json_bytes([backtest_result])) == [encoded]
+
+        # Chunked streaming output is byte-identical, with and without trades
+        backtest_result.trades = [trade] * 5
+        assert b"".join(backtest_result.iter_json_bytes(trades_per_chunk=2)) == backtest_result.to_json_bytes()
+        backtest_result.trades = []
+        assert b"".join(backtest_result.iter_json_bytes()) == backtest_result.to_json_bytes()
+
+    def test_performance_metrics_from_trades(self):
+        """Test vectorized metrics over trade column arrays."""
+        def make_trade(day, pnl_percent):
+            return Trade(
+                symbol="AAPL",
+                entry_date=datetime(2024, 1, day, 10, 0, 0),
+                entry_price=100.0,
+                exit_date=datetime(2024, 1, day, 15, 0, 0),
+                exit_price=100.0 + pnl_percent,
+                trade_type="long",
+                pnl=pnl_percent,
+                pnl_percent=pnl_percent
+            )
+
+        # Given out of exit order: cumulative path is 2, 5, 1, 2
+        trades = [make_trade(3, -4.0), make_trade(1, 2.0), make_trade(4, 1.0), make_trade(2, 3.0)]
+        arrays = Trade.to_arrays(trades)
+        assert arrays['pnl'].tolist() == [-4.0, 2.0, 1.0, 3.0]
+        assert arrays['exit_date'].dtype.kind == 'M'
+
+        metrics = PerformanceMetrics.from_trades(trades)
+        assert metrics.total_trades == 4
+        assert metrics.winning_trades == 3
+        assert metrics.losing_trades == 1
+        assert metrics.win_rate == 0.75
+        assert metrics.total_return == 2.0
+        assert metrics.average_return == 0.5
+        assert metrics.max_drawdown == 4.0
+        assert metrics.sharpe_ratio == pytest.approx(0.5 / np.std([-4.0, 2.0, 1.0, 3.0], ddof=1))
+
+        assert metrics.equity_curve.tolist() == [2.0, 5.0, 1.0, 2.0]
+        assert PerformanceMetrics.from_trades([]).total_trades == 0
+
+        # A single trade takes the short path with the same results
+        for pnl_percent in (0.05, -0.03, 0.0):
+            trade = make_trade(1, pnl_percent)
+            single = PerformanceMetrics.from_trades([trade])
+            general = PerformanceMetrics.from_trades([trade, trade])
+            assert single.winning_trades == general.winning_trades // 2
+            assert single.losing_trades == general.losing_trades // 2
+            assert single.win_rate == general.win_rate
+            assert single.total_return == pnl_percent
+            assert single.max_drawdown == max(0.0, -pnl_percent)
+            assert single.sharpe_ratio == 0.0
+            assert single.equity_curve.tolist() == [pnl_percent]
+
+        # Identical returns have no spread, not a rounding-error one
+        flat = PerformanceMetrics.from_trades([make_trade(day, 0.05) for day in range(1, 4)])
+        assert flat.sharpe_ratio == 0.0
+
+        # The equity curve is only written by the JSON encoder, from the
+        # array, and restored as one
+        assert json.loads(metrics.to_json())["equity_curve"] == [2.0, 5.0, 1.0, 2.0]
+        restored = PerformanceMetrics.from_json(metrics.to_json())
+        assert isinstance(restored.equity_curve, np.ndarray)
+        assert restored.equity_curve.tolist() == [2.0, 5.0, 1.0, 2.0]
+        stored = metrics.to_dict()
+        assert 'equity_curve' not in stored
+        assert PerformanceMetrics.from_dict(stored).equity_curve.size == 0
+
+    @pytest.mark.parametrize("numba_available", [True, False])
+    def test_performance_metrics_kernel_paths_agree(self, numba_available):
+        """Test the compiled loops and the NumPy fallback give the same metrics."""
+        returns = [0.05, -0.02, 0.031, 0.0, -0.047, 0.12, 0.008]
+        trades = [
+            Trade(
+                symbol="AAPL",
+                entry_date=datetime(2024, 1, day, 10, 0, 0),
+                entry_price=100.0,
+                exit_date=datetime(2024, 1, day, 15, 0, 0),
+                exit_price=100.0,
+                trade_type="long",
+                pnl=pnl_percent,
+                pnl_percent=pnl_percent
+            )
+            for day, pnl_percent in enumerate(returns, start=1)
+        ]
+
+        with patch('app.models.results.NUMBA_AVAILABLE', numba_available):
+            metrics = PerformanceMetrics.from_trades(trades)
+
+        cumulative = np.cumsum(returns)
+        expected_drawdown = (np.maximum.accumulate(np.maximum(cumulative, 0.0)) - cumulative).max()
+        assert metrics.max_drawdown == pytest.approx(expected_drawdown, rel=1e-12)
+        assert metrics.sharpe_ratio == pytest.approx(
+            np.mean(returns) / np.std(returns, ddof=1), rel=1e-12
+        )
+
+    def test_result_models_use_slots(self):
+        """Test slotted result models still copy and pickle cleanly."""
+        import copy
+        import pickle
+
+        trade = Trade(
+            symbol="AAPL",
+            entry_date=datetime(2024, 1, 1, 10, 0, 0),
+            entry_price=150.0,
+            exit_date=datetime(2024, 1, 2, 10, 0, 0),
+            exit_price=155.0,
+            trade_type="long",
+            pnl=5.0,
+            pnl_percent=3.33
+        )
+        assert not hasattr(trade, '__dict__')
+        with pytest.raises(AttributeError):
+            trade.notes = "not a field"
+
+        assert pickle.loads(pickle.dumps(trade)) == trade
+        assert copy.deepcopy(trade) == trade
+        assert Trade.from_json(trade.to_json()) == trade
@@ -0,0 +1,141 @@
+"""
+Unit tests for monitoring and metrics collection.
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import monitoring
+from app.monitoring import MetricsCollector, get_system_snapshot, get_health_status
+
+
+@pytest.fixture
+def mock_psutil():
+    """Patch psutil with fixed readings and reset the cached snapshot."""
+    with patch.object(monitoring, "psutil") as psutil_mock, \
+            patch.object(monitoring, "_system_snapshot", None):
+        psutil_mock.cpu_percent.return_value = 12.5
+        psutil_mock.virtual_memory.return_value = Mock(total=1000, available=400, percent=60.0)
+        psutil_mock.disk_usage.return_value = Mock(total=2000, used=500, free=1500, percent=25.0)
+        yield psutil_mock
+
+
+class TestSystemSnapshot:
+    """Test the cached system resource snapshot."""
+
+    def test_snapshot_cached_within_ttl(self, mock_psutil):
+        """Test psutil is only queried once per TTL window."""
+        first = get_system_snapshot()
+        second = get_system_snapshot()
+
+        assert first is second
+        assert mock_psutil.virtual_memory.call_count == 1
+        assert first.memory_percent == 60.0
+        assert first.disk_used == 500
+
+    def test_snapshot_refreshed_after_expiry(self, mock_psutil):
+        """Test an expired snapshot is re-read."""
+        first = get_system_snapshot()
+        first.expires_at = 0.0
+
+        second = get_system_snapshot()
+        assert second is not first
+        assert mock_psutil.virtual_memory.call_count == 2
+
+    def test_metrics_and_health_share_snapshot(self, mock_psutil):
+        """Test metrics and health checks reuse the same psutil reading."""
+        with patch.object(monitoring, "metrics_collector", MetricsCollector()):
+            metrics = monitoring.metrics_collector.get_metrics()
+            health = get_health_status()
+
+        assert metrics["system"]["cpu_percent"] == 12.5
+        assert metrics["system"]["disk"]["percent"] == 25.0
+        assert health["status"] == "healthy"
+        assert health["checks"]["memory_usage"] == 60.0
+        assert mock_psutil.virtual_memory.call_count == 1
+
+
+class TestMetricsCollector:
+    """Test request counters."""
+
+    def test_record_request_from_threads(self):
+        """Test concurrent recording loses no updates."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        collector = MetricsCollector()
+
+        def record(i):
+            collector.record_request(0.001, 500 if i % 4 == 0 else 200)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(record, range(2000)))
+
+        assert collector.get_counts() == (2000, 500, pytest.approx(2.0))
+        assert isinstance(collector.error_count, int)
+
+    def test_uptime_uses_monotonic_clock(self, mock_psutil):
+        """Test uptime is measured from the monotonic start time."""
+        collector = MetricsCollector()
+        with patch.object(monitoring.time, "monotonic", return_value=collector._start_monotonic + 42.0):
+            metrics = collector.get_metrics()
+
+        assert metrics["uptime_seconds"] == pytest.approx(42.0)
+
+    def test_metrics_cached_for_snapshot_window(self, mock_psutil):
+        """Test metrics are reused within the TTL and recomputed after it."""
+        collector = MetricsCollector()
+        collector.record_request(0.2, 200)
+        collector.record_request(0.4, 500)
+
+        first = collector.get_metrics()
+        assert first["requests"]["error_rate"] == 0.5
+        assert first["requests"]["avg_duration"] == pytest.approx(0.3)
+
+        collector.record_request(0.3, 200)
+        assert collector.get_metrics() is first
+
+        collector._metrics_cache = (0.0, first)
+        assert collector.get_metrics()["requests"]["total"] == 3
+
+    def test_metrics_without_requests(self, mock_psutil):
+        """Test rates are zero before any request is recorded."""
+        requests = MetricsCollector().get_metrics()["requests"]
+        assert requests["error_rate"] == 0.0
+        assert requests["avg_duration"] == 0.0
+
+
+class TestMetricsMiddleware:
+    """Test the ASGI metrics middleware."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client for a small app wrapped in the middleware."""
+        from fastapi import FastAPI, HTTPException
+        from fastapi.testclient import TestClient
+
+        app = FastAPI()
+        app.add_middleware(monitoring.MetricsMiddleware)
+
+        @app.get("/ok")
+        async def ok():
+            return {"status": "ok"}
+
+        @app.get("/missing")
+        async def missing():
+            raise HTTPException(status_code=404)
+
+        return TestClient(app)
+
+    def test_records_status_codes(self, client):
+        """Test requests and error responses are counted."""
+        collector = MetricsCollector()
+        with patch.object(monitoring, "metrics_collector", collector):
+            assert client.get("/ok").status_code == 200
+            assert client.get("/missing").status_code == 404
+
+        assert collector.request_count == 2
+        assert collector.error_count == 1
+        assert collector.request_duration_sum > 0
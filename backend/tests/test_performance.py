@@ -31,7 +31,7 @@ class TestPerformance:
     @pytest.fixture
     def backtest_service(self):
         """Create backtest service instance."""
-        with patch('app.services.backtest_service.get_session'):
+        with patch('app.services.backtest_service.session_scope'):
             return BacktestService()
     
     @pytest.fixture
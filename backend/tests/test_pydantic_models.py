@@ -20,6 +20,7 @@ from app.models.pydantic_models import (
     ScanComparisonModel,
     ExportRequestModel,
     HistoryFiltersModel,
+    construct_trusted,
     SymbolStatus,
     ScanStatus,
     ExportFormat
@@ -323,6 +324,27 @@ class TestEnhancedScanResultModel:
         
         with pytest.raises(ValidationError):
             EnhancedScanResultModel(**data)
+    
+    def test_construct_trusted_matches_validated_model(self):
+        """Test trusted construction builds nested models without validation."""
+        data = {
+            "id": "test-scan-1",
+            "timestamp": datetime(2024, 1, 1, 10, 0, 0),
+            "symbols_scanned": ["AAPL"],
+            "signals_found": [],
+            "settings_used": {"atr_multiplier": 2.0, "higher_timeframe": "4h"},
+            "execution_time": 2.5,
+            "scan_status": "completed",
+            "data_quality_score": 0.95
+        }
+        
+        model = construct_trusted(EnhancedScanResultModel, data)
+        assert isinstance(model.settings_used, AlgorithmSettingsModel)
+        assert model.model_dump() == EnhancedScanResultModel(**data).model_dump()
+        
+        # No validation is performed on trusted data
+        data["execution_time"] = -1.0
+        assert construct_trusted(EnhancedScanResultModel, data).execution_time == -1.0
 
 
 class TestExportRequestModel:
@@ -4,7 +4,9 @@ Tests the complete scanning workflow including data fetching and algorithm evalu
 """
 import pytest
 import asyncio
+import uuid
 from datetime import datetime, timedelta
+from decimal import Decimal
 from unittest.mock import Mock, patch, AsyncMock
 from typing import List
 
@@ -14,6 +16,13 @@ from app.services.algorithm_engine import AlgorithmEngine
 from app.models.market_data import MarketData
 from app.models.signals import Signal, AlgorithmSettings
 from app.models.results import ScanResult
+from app.models.enhanced_diagnostics import (
+    DataQualityMetrics,
+    EnhancedScanDiagnostics,
+    EnhancedScanResult,
+    PerformanceMetrics,
+    SignalAnalysis
+)
 
 
 @pytest.fixture
@@ -315,19 +324,16 @@ class TestScannerServiceIntegration:
             mock_db = Mock()
             mock_get_session.return_value = mock_db
             
-            # Mock query result with sample data
-            mock_scan = Mock()
-            mock_scan.symbols_scanned = ["AAPL", "MSFT"]
-            mock_scan.signals_found = [
-                {"signal_type": "long", "symbol": "AAPL"},
-                {"signal_type": "short", "symbol": "MSFT"}
-            ]
-            mock_scan.execution_time = 1.5
-            
+            # Mock the aggregate rows the database returns
             mock_query = Mock()
             mock_db.query.return_value = mock_query
-            mock_query.filter.return_value = mock_query
-            mock_query.all.return_value = [mock_scan]
+            for method in ('filter', 'group_by', 'order_by', 'limit'):
+                getattr(mock_query, method).return_value = mock_query
+            mock_query.one.return_value = (1, 2, 2, Decimal("1.500"))
+            mock_query.all.side_effect = [
+                [("long", 1), ("short", 1)],
+                [("AAPL", 1), ("MSFT", 1)]
+            ]
             
             stats = await scanner.get_scan_statistics(days=30)
             
@@ -344,6 +350,74 @@ class TestScannerServiceIntegration:
             assert stats["total_symbols_scanned"] == 2
             assert stats["total_signals_found"] == 2
             assert stats["average_execution_time"] == 1.5
+            assert stats["signals_by_type"] == {"long": 1, "short": 1}
+            assert stats["most_active_symbols"] == [
+                {"symbol": "AAPL", "count": 1},
+                {"symbol": "MSFT", "count": 1}
+            ]
+    
+    async def test_save_scan_result_summary_columns(self, mock_data_service, mock_algorithm_engine):
+        """Test comparison summaries are stored with the scan."""
+        scanner = ScannerService(
+            data_service=mock_data_service,
+            algorithm_engine=mock_algorithm_engine
+        )
+        settings = AlgorithmSettings()
+        enhanced_diagnostics = EnhancedScanDiagnostics(
+            symbols_with_data=["AAPL", "MSFT", "GOOGL"],
+            symbols_without_data=["TSLA"],
+            symbols_with_errors={},
+            data_fetch_time=1.0,
+            algorithm_time=0.5,
+            total_data_points={"AAPL": 100, "MSFT": 100, "GOOGL": 100, "TSLA": 0},
+            error_summary={},
+            symbol_details={},
+            performance_metrics=PerformanceMetrics(
+                memory_usage_mb=128.5,
+                api_requests_made=8,
+                api_rate_limit_remaining=100,
+                cache_hit_rate=0.5,
+                concurrent_requests=4,
+                bottleneck_phase=None
+            ),
+            signal_analysis=SignalAnalysis(
+                signals_found=0,
+                symbols_meeting_partial_criteria={},
+                rejection_reasons={},
+                confidence_distribution={}
+            ),
+            data_quality_metrics=DataQualityMetrics(
+                total_data_points=300,
+                success_rate=0.75,
+                average_fetch_time=0.25,
+                data_completeness=0.75,
+                quality_score=0.8
+            ),
+            settings_snapshot=settings
+        )
+        scan_result = EnhancedScanResult(
+            id=str(uuid.uuid4()),
+            timestamp=datetime.now(),
+            symbols_scanned=["AAPL", "MSFT", "GOOGL", "TSLA"],
+            signals_found=[],
+            settings_used=settings,
+            execution_time=1.5,
+            enhanced_diagnostics=enhanced_diagnostics,
+            data_quality_score=0.8
+        )
+        
+        with patch('app.services.scanner_service.get_session') as mock_get_session:
+            mock_db = Mock()
+            mock_get_session.return_value = mock_db
+            
+            await scanner._save_scan_result(scan_result)
+        
+        saved = mock_db.add.call_args.args[0]
+        assert saved.symbols_count == 4
+        assert saved.signals_count == 0
+        assert saved.success_rate == 0.75
+        assert saved.memory_usage_mb == 128.5
+        assert saved.api_requests_made == 8
 
 
 @pytest.mark.asyncio
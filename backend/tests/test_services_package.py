@@ -0,0 +1,32 @@
+"""
+Tests for the lazily-importing services package.
+"""
+import importlib
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import services
+
+
+class TestServicesPackage:
+    """Test lazy service exports."""
+
+    def test_lazy_map_matches_all(self):
+        """Test every exported name has exactly one lazy import entry."""
+        assert len(services.__all__) == len(set(services.__all__))
+        assert set(services.__all__) == set(services._LAZY_IMPORTS)
+
+    def test_exports_resolve_to_defining_module(self):
+        """Test each export resolves to the class in its own submodule."""
+        for name, module_name in services._LAZY_IMPORTS.items():
+            module = importlib.import_module(f"app.services.{module_name}")
+            assert getattr(services, name) is getattr(module, name)
+
+    def test_unknown_attribute(self):
+        """Test unknown names raise AttributeError."""
+        with pytest.raises(AttributeError):
+            services.NotAService
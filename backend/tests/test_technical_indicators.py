@@ -279,6 +279,61 @@ class TestTechnicalIndicatorEngine:
         assert (current_close - indicators_3x.atr_long_line) > (current_close - indicators_2x.atr_long_line)
         assert (indicators_3x.atr_short_line - current_close) > (indicators_2x.atr_short_line - current_close)
 
+    
+    def test_indicator_series_matches_prefix_calculation(self):
+        """Test each bar of the series equals a full calculation on its prefix"""
+        series = self.engine.calculate_all_indicators_series(
+            self.sample_highs, self.sample_lows, self.sample_closes, 2.0
+        )
+        
+        assert all(len(column) == 100 for column in series.values())
+        for end in (51, 75, 100):
+            expected = self.engine.calculate_all_indicators(
+                self.sample_highs[:end], self.sample_lows[:end], self.sample_closes[:end], 2.0
+            )
+            actual = self.engine.indicators_at(series, end - 1, self.sample_closes[end - 1])
+            assert actual == expected
+    
+    def test_indicator_series_validation(self):
+        """Test series calculation validates inputs like the scalar path"""
+        with pytest.raises(InsufficientDataError):
+            self.engine.calculate_all_indicators_series([1.0] * 10, [1.0] * 10, [1.0] * 10)
+        
+        with pytest.raises(IndicatorCalculationError):
+            self.engine.calculate_all_indicators_series([1.0] * 60, [1.0] * 60, [1.0] * 59)
+        
+        series = self.engine.calculate_all_indicators_series(
+            self.sample_highs, self.sample_lows, self.sample_closes
+        )
+        with pytest.raises(IndicatorCalculationError):
+            self.engine.indicators_at(series, 0, self.sample_closes[0])  # No ATR for first bar
+    
+    def test_indicator_series_float32(self):
+        """Test float32 output stays within float32 precision of float64"""
+        expected = self.engine.calculate_all_indicators_series(
+            self.sample_highs, self.sample_lows, self.sample_closes
+        )
+        actual = self.engine.calculate_all_indicators_series(
+            self.sample_highs, self.sample_lows, self.sample_closes, dtype=np.float32
+        )
+        
+        for name, column in actual.items():
+            assert column.dtype == np.float32
+            assert np.allclose(column, expected[name], rtol=1e-5, equal_nan=True)
+    
+    def test_advance_state_matches_series(self):
+        """Test extending a state bar by bar reproduces the series values"""
+        series = self.engine.calculate_all_indicators_series(
+            self.sample_highs, self.sample_lows, self.sample_closes, 2.0
+        )
+        
+        state = self.engine.state_at(series, 60, self.sample_closes[60])
+        for index in range(61, 100):
+            state = self.engine.advance_state(
+                state, self.sample_highs[index], self.sample_lows[index], self.sample_closes[index]
+            )
+            expected = self.engine.indicators_at(series, index, self.sample_closes[index])
+            assert self.engine.indicators_from_state(state, 2.0) == expected
 
 class TestTechnicalIndicatorsDataClass:
     """Test the TechnicalIndicators dataclass"""